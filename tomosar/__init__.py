@@ -1,4 +1,4 @@
-from .core import ImageInfo, SliceInfo, TomoInfo, TomoScene, TomoScenes, regroup, tomoload
+from .core import ImageInfo, SliceInfo, SliceTable, TomoInfo, TomoScene, TomoScenes, regroup, tomoload
 from .config import Settings
 from .binaries import crx2rnx, ubx2rnx, merge_rnx, merge_eph, rnx2rtkp, ppp, build_vrt, generate_raster, resource
 from .version import __version__, __version_tuple__, __commit_id__
\ No newline at end of file
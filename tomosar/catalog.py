@@ -0,0 +1,267 @@
+# Imports
+import os
+import sqlite3
+import pandas as pd
+from pathlib import Path
+from datetime import datetime, time
+
+from .config import CATALOG_PATH
+from .core import ImageInfo, SliceInfo, parse_filenames
+from .scanning import DirectoryScanner, DirectoryListing, timestamp
+
+# Columns holding the parsed ImageInfo metadata of each slice
+SLICE_COLUMNS = ImageInfo.METADATA_PARAMETERS
+
+# ImageInfo fields that are never used for filtering
+_UNFILTERED = ['linuxTime', 'image', 'profile', '_paths']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS directories (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime INTEGER
+);
+CREATE INDEX IF NOT EXISTS directories_parent ON directories(parent);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    directory TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    mtime INTEGER,
+    size INTEGER,
+    date TEXT,
+    spiral INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_directory ON files(directory);
+CREATE INDEX IF NOT EXISTS files_kind ON files(kind);
+CREATE TABLE IF NOT EXISTS slices (
+    path TEXT PRIMARY KEY,
+    directory TEXT NOT NULL,
+    filename TEXT, folder TEXT, date TEXT, spiral INTEGER, band TEXT,
+    width REAL, res REAL, linuxTime INTEGER, smo REAL, hoff REAL, depth REAL,
+    roff REAL, ham REAL, refr REAL, lat REAL, lon REAL, DC REAL, DL REAL,
+    HC REAL, HV REAL, thresh REAL, squint REAL, text TEXT
+);
+CREATE INDEX IF NOT EXISTS slices_directory ON slices(directory);
+CREATE INDEX IF NOT EXISTS slices_date ON slices(date, spiral);
+CREATE INDEX IF NOT EXISTS slices_band ON slices(band);
+CREATE INDEX IF NOT EXISTS slices_tomogram ON slices(width, res, lat, lon);
+"""
+
+class SliceCatalog:
+    """
+    Persistent on-disk index of slice, moco_cut and flight_info files.
+
+    Directories are keyed by path and mtime, and files by path, mtime and size, so that a refresh
+    only lists directories that changed since the last scan and only parses new or modified files.
+    Queries (including ImageInfo filters) are answered with indexed SQL instead of re-parsing.
+    """
+    def __init__(self, path: str | Path = CATALOG_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.executescript(_SCHEMA)
+        self.scanner = DirectoryScanner()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> 'SliceCatalog':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def refresh(self, paths: str | Path | list[str | Path], recursive: bool = True,
+                npar: int = os.cpu_count()) -> tuple[int, int]:
+        """
+        Incrementally updates the catalog for all directory trees in paths (or only the directories if not recursive).
+        Returns the number of directories rescanned and the number of files (re-)parsed.
+        """
+        # Known directory mtimes and subdirectories let the scanner skip unchanged listings
+        mtimes = {}
+        children = {}
+        for path, parent, mtime in self.connection.execute("SELECT path, parent, mtime FROM directories"):
+            if mtime is not None:
+                mtimes[path] = mtime
+            if parent is not None:
+                children.setdefault(parent, []).append(path)
+
+        rescanned = 0
+        parsed = 0
+        self.scanner = DirectoryScanner(npar=npar, mtimes=mtimes, children=children)
+        with self.connection:
+            for listing in self.scanner.scan(paths, recursive=recursive):
+                if listing.mtime is None:
+                    self._forget(listing.path)
+                elif not listing.unchanged:
+                    rescanned += 1
+                    parsed += self._update_directory(listing)
+        return rescanned, parsed
+
+    def _update_directory(self, listing: DirectoryListing) -> int:
+        cur = self.connection.cursor()
+        directory = listing.path
+        found = listing.files
+
+        # Drop removed files and subdirectories
+        known = {p: (m, s) for p, m, s in cur.execute("SELECT path, mtime, size FROM files WHERE directory = ?", (directory,))}
+        removed = [(p,) for p in known if p not in found]
+        cur.executemany("DELETE FROM files WHERE path = ?", removed)
+        cur.executemany("DELETE FROM slices WHERE path = ?", removed)
+        old_subdirs = [r[0] for r in cur.execute("SELECT path FROM directories WHERE parent = ?", (directory,))]
+        for old in set(old_subdirs) - set(listing.subdirs):
+            self._forget(old)
+        # Register new subdirectories as unscanned
+        cur.executemany("INSERT OR IGNORE INTO directories (path, parent, mtime) VALUES (?, ?, NULL)",
+                        [(d, directory) for d in listing.subdirs])
+
+        # Parse new and modified files
+        changed = [p for p, (kind, m, s) in found.items() if known.get(p) != (m, s)]
+        for p in changed:
+            kind, m, s = found[p]
+            stamp = timestamp(os.path.basename(p), kind) if kind != 'slice' else None
+            cur.execute("INSERT OR REPLACE INTO files (path, directory, kind, mtime, size, date, spiral) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (p, directory, kind, m, s,
+                         stamp[0].isoformat(sep=' ') if stamp else None,
+                         stamp[1] if stamp else None))
+        slice_paths = [p for p in changed if found[p][0] == 'slice']
+        cur.executemany("DELETE FROM slices WHERE path = ?", [(p,) for p in slice_paths])
+        if slice_paths:
+            table = parse_filenames(slice_paths)
+            cur.executemany(f"INSERT INTO slices (path, directory, {', '.join(SLICE_COLUMNS)}) "
+                            f"VALUES (?, ?, {', '.join('?' * len(SLICE_COLUMNS))})",
+                            _to_rows(table, directory))
+
+        # A directory refreshed as a scan root has no parent in its listing, but keeps the one stored for it
+        cur.execute("INSERT INTO directories (path, parent, mtime) VALUES (?, ?, ?) "
+                    "ON CONFLICT(path) DO UPDATE SET mtime = excluded.mtime, "
+                    "parent = COALESCE(excluded.parent, directories.parent)",
+                    (directory, listing.parent, listing.mtime))
+        return len(changed)
+
+    def _forget(self, directory: str) -> None:
+        """Removes a directory tree from the catalog."""
+        prefix = directory.rstrip(os.sep) + os.sep
+        n = len(prefix)
+        cur = self.connection.cursor()
+        cur.execute("DELETE FROM directories WHERE path = ? OR substr(path, 1, ?) = ?", (directory, n, prefix))
+        cur.execute("DELETE FROM files WHERE directory = ? OR substr(directory, 1, ?) = ?", (directory, n, prefix))
+        cur.execute("DELETE FROM slices WHERE directory = ? OR substr(directory, 1, ?) = ?", (directory, n, prefix))
+
+    def query(self, paths: str | Path | list[str | Path] | None = None, filter: ImageInfo = None,
+              recursive: bool = True) -> SliceInfo:
+        """
+        Returns the catalogued slices below paths (or in paths only if not recursive) matching filter.
+        """
+        where, params = _path_clause(paths, recursive)
+        if filter:
+            total = self.connection.execute(f"SELECT COUNT(*) FROM slices{_where(where)}", params).fetchone()[0]
+            filter_where, filter_params = _filter_clauses(filter)
+            where += filter_where
+            params += filter_params
+        table = pd.read_sql_query(f"SELECT {', '.join(SLICE_COLUMNS)} FROM slices{_where(where)} ORDER BY path",
+                                  self.connection, params=params, parse_dates=["date"])
+        slice_info = SliceInfo.from_table(table)
+        if filter:
+            print(f"{total - len(slice_info)} slices filtered.")
+        return slice_info
+
+    def moco_cuts(self, paths: str | Path | list[str | Path] | None = None) -> dict[tuple[datetime, int], Path]:
+        """Returns catalogued moco cuts below paths keyed by (timestamp, spiral ID)."""
+        where, params = _path_clause(paths, True, column='directory')
+        where.append("kind = 'moco_cut' AND date IS NOT NULL")
+        rows = self.connection.execute(f"SELECT path, date, spiral FROM files{_where(where)} ORDER BY path", params)
+        return {(datetime.fromisoformat(date), spiral): Path(path) for path, date, spiral in rows}
+
+    def flight_infos(self, paths: str | Path | list[str | Path] | None = None) -> dict[datetime, Path]:
+        """Returns catalogued flight info files below paths keyed by timestamp."""
+        where, params = _path_clause(paths, True, column='directory')
+        where.append("kind = 'flight_info' AND date IS NOT NULL")
+        rows = self.connection.execute(f"SELECT path, date FROM files{_where(where)} ORDER BY path", params)
+        return {datetime.fromisoformat(date): Path(path) for path, date in rows}
+
+    def search(self, paths: str | Path | list[str | Path], filter: ImageInfo = None,
+               refresh: bool = True, npar: int = os.cpu_count()) -> tuple[SliceInfo, dict, dict]:
+        """
+        Refreshes the catalog (unless refresh is False) and returns the same (SliceInfo, flight_infos, moco_cuts)
+        triple as forging.recursive_search.
+        """
+        if refresh:
+            rescanned, parsed = self.refresh(paths, npar=npar)
+            print(f"Catalog refreshed: {rescanned} directories rescanned, {parsed} files parsed.")
+            print(f"Scanned {self.scanner.stats}.")
+        return self.query(paths, filter=filter), self.flight_infos(paths), self.moco_cuts(paths)
+
+# Helper functions
+def _as_paths(paths: str | Path | list[str | Path] | None) -> list[Path]:
+    if paths is None:
+        return []
+    if isinstance(paths, (str, Path)):
+        paths = [paths]
+    return [Path(p).resolve() for p in paths]
+
+def _where(clauses: list[str]) -> str:
+    return " WHERE " + " AND ".join(clauses) if clauses else ""
+
+def _path_clause(paths, recursive: bool, column: str = 'directory') -> tuple[list[str], list]:
+    paths = _as_paths(paths)
+    if not paths:
+        return [], []
+    clauses = []
+    params = []
+    for p in paths:
+        if p.is_file():
+            clauses.append("path = ?")
+            params.append(str(p))
+            continue
+        clauses.append(f"{column} = ?")
+        params.append(str(p))
+        if recursive:
+            prefix = str(p).rstrip(os.sep) + os.sep
+            clauses.append(f"substr({column}, 1, ?) = ?")
+            params.extend([len(prefix), prefix])
+    return ["(" + " OR ".join(clauses) + ")"], params
+
+def _filter_clauses(filter: ImageInfo) -> tuple[list[str], list]:
+    """
+    Translates an ImageInfo filter into SQL conditions with the same semantics as ImageInfo.__eq__:
+    falsy values (in the filter or in the slice) are not compared, dates are compared by date and/or time,
+    and a list of bands matches any of the bands.
+    """
+    clauses = []
+    params = []
+    for key in SLICE_COLUMNS:
+        if key in _UNFILTERED:
+            continue
+        value = filter.get(key)
+        if not value:
+            continue
+        if key == 'date':
+            conditions = []
+            if value.year > 2000:
+                conditions.append("substr(date, 1, 10) = ?")
+                params.append(value.date().isoformat())
+            if value.time() != time(0, 0, 0, 0):
+                conditions.append("substr(date, 12, 8) = ?")
+                params.append(value.time().isoformat(timespec='seconds'))
+            if conditions:
+                clauses.append(f"(date IS NULL OR ({' AND '.join(conditions)}))")
+            continue
+        if key == 'band' and not isinstance(value, str):
+            condition = f"band IN ({', '.join('?' * len(value))})"
+            params.extend(value)
+        elif key == 'folder':
+            condition = "folder = ?"
+            params.append(str(Path(value)))
+        else:
+            condition = f"{key} = ?"
+            params.append(value)
+        clauses.append(f"({key} IS NULL OR {key} IN (0, '') OR {condition})")
+    return clauses, params
+
+def _to_rows(table: pd.DataFrame, directory: str) -> list[tuple]:
+    """Converts a parse_filenames table into catalog rows."""
+    table = table.astype(object).where(table.notna(), None)
+    table['date'] = [d.isoformat(sep=' ') if d is not None else None for d in table['date']]
+    paths = [os.path.join(folder, filename) for folder, filename in zip(table['folder'], table['filename'])]
+    return [(path, directory, *row) for path, row in zip(paths, table[SLICE_COLUMNS].itertuples(index=False, name=None))]
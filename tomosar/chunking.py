@@ -0,0 +1,69 @@
+# Imports
+import tempfile
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Iterator
+import numpy as np
+
+from .config import get_memory_budget
+
+@dataclass(frozen=True)
+class Tile:
+    """
+    A (y, x) tile of a tomogram: the core it produces and the region it reads, i.e. the core grown by
+    the halo and clipped to the image.
+    """
+    core: tuple[slice, slice]
+    region: tuple[slice, slice]
+
+    @property
+    def inner(self) -> tuple[slice, slice]:
+        """The core relative to the region."""
+        return tuple(slice(c.start - r.start, c.stop - r.start) for c, r in zip(self.core, self.region))
+
+def allocate(shape: tuple[int, ...], dtype: np.dtype, scratch: str | Path | None = None) -> np.ndarray:
+    """
+    Allocates an uninitialized array, as a memory-mapped temporary file in the scratch folder if given.
+    The file is removed as soon as the array is garbage collected.
+    """
+    if scratch is None:
+        return np.empty(shape, dtype=dtype)
+    Path(scratch).mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryFile(dir=scratch, prefix="tomogram_", suffix=".scratch") as file:
+        return np.memmap(file, dtype=dtype, mode='w+', shape=shape)
+
+def is_out_of_core(array: np.ndarray | None, budget: int | None = None) -> bool:
+    """Whether an array is memory-mapped or larger than the memory budget, and should be processed in chunks."""
+    if array is None:
+        return False
+    return isinstance(array, np.memmap) or array.nbytes > (budget or get_memory_budget())
+
+def tile_shape(shape: tuple[int, ...], bytes_per_pixel: float, halo: int = 0, align: int = 1,
+               budget: int | None = None) -> tuple[int, int]:
+    """
+    Returns the largest square (y, x) tile, a multiple of align, whose region (tile and halo) fits in the
+    memory budget at bytes_per_pixel, i.e. the working set of one (y, x) pixel over all heights.
+    """
+    H, W = shape[-2:]
+    budget = budget or get_memory_budget()
+    side = int(np.sqrt(budget / max(bytes_per_pixel, 1))) - 2 * halo
+    side = max(side // align, 1) * align
+    return min(side, -(-H // align) * align), min(side, -(-W // align) * align)
+
+def tiles(shape: tuple[int, ...], tile: tuple[int, int], halo: int = 0) -> Iterator[Tile]:
+    """Iterates over the (y, x) tiles of an image of the given shape in row-major order."""
+    H, W = shape[-2:]
+    th, tw = tile
+    for y0 in range(0, H, th):
+        for x0 in range(0, W, tw):
+            y1, x1 = min(y0 + th, H), min(x0 + tw, W)
+            yield Tile(core=(slice(y0, y1), slice(x0, x1)),
+                       region=(slice(max(y0 - halo, 0), min(y1 + halo, H)), slice(max(x0 - halo, 0), min(x1 + halo, W))))
+
+def height_chunks(shape: tuple[int, ...], bytes_per_voxel: float, budget: int | None = None) -> Iterator[slice]:
+    """Iterates over chunks of whole slices (along the first axis) that fit in the memory budget."""
+    N = shape[0]
+    budget = budget or get_memory_budget()
+    step = max(int(budget // max(bytes_per_voxel * np.prod(shape[1:]), 1)), 1)
+    for n in range(0, N, step):
+        yield slice(n, min(n + step, N))
@@ -6,6 +6,30 @@ PACKAGE_PATH = Path(__file__).resolve().parent
 PROJECT_PATH = PACKAGE_PATH.parent
 LOCAL = PROJECT_PATH / ".local"
 SETTINGS_PATH = LOCAL / "settings.json"
+CATALOG_PATH = LOCAL / "slice_catalog.sqlite"
+MASK_CACHE_PATH = LOCAL / "mask_cache"
+
+# Working precisions of the processing chain as (complex dtype, real dtype)
+PRECISIONS = {
+    "single": ("complex64", "float32"),
+    "double": ("complex128", "float64"),
+}
+_PRECISION = None # Overrides the PRECISION setting for the current process (see set_precision)
+_MEMORY_BUDGET = None # Overrides the MEMORY_BUDGET setting for the current process (see set_memory_budget)
+
+# Percentile estimators (see quantiles.quantile)
+QUANTILE_METHODS = ("exact", "histogram", "sampled")
+_QUANTILE_METHOD = None # Overrides the QUANTILE_METHOD setting for the current process (see set_quantile_method)
+
+# GeoTIFF compressions of saved tomograms (see Tomograms.save)
+TOMOGRAM_COMPRESSIONS = ("none", "deflate", "zstd", "lzw")
+_TOMOGRAM_COMPRESSION = None # Overrides the TOMOGRAM_COMPRESSION setting for the current process (see set_tomogram_compression)
+
+# Storage of saved tomograms: GeoTIFF, native .npy cubes (memory-mapped when loaded), or both (see Tomograms.save)
+TOMOGRAM_STORAGES = ("geotiff", "native", "both")
+_TOMOGRAM_STORAGE = None # Overrides the TOMOGRAM_STORAGE setting for the current process (see set_tomogram_storage)
+_TOMOGRAM_CACHE = None # Overrides the TOMOGRAM_CACHE setting for the current process (see set_tomogram_cache)
+_SETTINGS = None # Settings read once per process by the getters of processing settings (see cached_settings)
 
 # Frequency parameters
 class Frequencies:
@@ -203,6 +227,34 @@ class Settings:
     @property
     def RADAR(self):
         return self.data["RADAR"]
+
+    @property
+    def PRECISION(self) -> str:
+        return self.data.get("PRECISION", DEFAULT["PRECISION"])
+
+    @property
+    def MEMORY_BUDGET(self) -> int:
+        return self.data.get("MEMORY_BUDGET", DEFAULT["MEMORY_BUDGET"])
+
+    @property
+    def QUANTILE_METHOD(self) -> str:
+        return self.data.get("QUANTILE_METHOD", DEFAULT["QUANTILE_METHOD"])
+
+    @property
+    def TOMOGRAM_COMPRESSION(self) -> str:
+        return self.data.get("TOMOGRAM_COMPRESSION", DEFAULT["TOMOGRAM_COMPRESSION"])
+
+    @property
+    def TOMOGRAM_OVERVIEWS(self) -> bool:
+        return self.data.get("TOMOGRAM_OVERVIEWS", DEFAULT["TOMOGRAM_OVERVIEWS"])
+
+    @property
+    def TOMOGRAM_STORAGE(self) -> str:
+        return self.data.get("TOMOGRAM_STORAGE", DEFAULT["TOMOGRAM_STORAGE"])
+
+    @property
+    def TOMOGRAM_CACHE(self) -> int:
+        return self.data.get("TOMOGRAM_CACHE", DEFAULT["TOMOGRAM_CACHE"])
     
     def __setattr__(self, key: str, value) -> None:
         if key == "data":
@@ -229,15 +281,24 @@ class Settings:
         print(json.dumps(self.data, indent=4))
 
     def save(self) -> None:
+        global _SETTINGS
         LOCAL.mkdir(exist_ok=True)
         with open(SETTINGS_PATH, "w") as file:
             json.dump(self.data, file, indent=4)
+        _SETTINGS = None
 
     def reset(self) -> None:
         self.data = DEFAULT
 
 DEFAULT = {
     "VERBOSE": False,
+    "PRECISION": "single",
+    "MEMORY_BUDGET": 4096,
+    "QUANTILE_METHOD": "exact",
+    "TOMOGRAM_COMPRESSION": "deflate",
+    "TOMOGRAM_OVERVIEWS": False,
+    "TOMOGRAM_STORAGE": "geotiff",
+    "TOMOGRAM_CACHE": 0,
     "MOCOREF_LONGITUDE": "Longitude",
     "MOCOREF_LATITUDE": "Latitude",
     "MOCOREF_HEIGHT": "Ellipsoidal height",
@@ -312,7 +373,104 @@ DEFAULT = {
     }
 }
 
+def cached_settings() -> Settings:
+    """
+    Returns the settings as read on the first call in the current process, so that the getters of processing
+    settings do no file I/O in processing loops. Saving settings (Settings.save, save_default) reads them anew.
+    """
+    global _SETTINGS
+    if _SETTINGS is None:
+        _SETTINGS = Settings()
+    return _SETTINGS
+
+def set_precision(precision: str | None) -> None:
+    """
+    Sets the working precision ('single' or 'double') for the current process, overriding the PRECISION setting.
+    None restores the setting.
+    """
+    global _PRECISION
+    if precision is not None and precision not in PRECISIONS:
+        raise ValueError(f"Precision must be one of {', '.join(PRECISIONS)}.")
+    _PRECISION = precision
+
+def get_precision() -> str:
+    """Returns the working precision of the current process."""
+    return _PRECISION or cached_settings().PRECISION
+
+def set_memory_budget(budget: int | None) -> None:
+    """
+    Sets the memory budget (in MiB) of out-of-core processing for the current process, overriding the
+    MEMORY_BUDGET setting. None restores the setting.
+    """
+    global _MEMORY_BUDGET
+    if budget is not None and int(budget) <= 0:
+        raise ValueError("Memory budget must be a positive number of MiB.")
+    _MEMORY_BUDGET = int(budget) if budget is not None else None
+
+def get_memory_budget() -> int:
+    """Returns the memory budget of the current process in bytes."""
+    return int(_MEMORY_BUDGET or cached_settings().MEMORY_BUDGET) * 2**20
+
+def set_quantile_method(method: str | None) -> None:
+    """
+    Sets the percentile estimator ('exact', 'histogram' or 'sampled') for the current process, overriding the
+    QUANTILE_METHOD setting. None restores the setting.
+    """
+    global _QUANTILE_METHOD
+    if method is not None and method not in QUANTILE_METHODS:
+        raise ValueError(f"Quantile method must be one of {', '.join(QUANTILE_METHODS)}.")
+    _QUANTILE_METHOD = method
+
+def get_quantile_method() -> str:
+    """Returns the percentile estimator of the current process."""
+    return _QUANTILE_METHOD or cached_settings().QUANTILE_METHOD
+
+def set_tomogram_compression(compression: str | None) -> None:
+    """
+    Sets the GeoTIFF compression ('none', 'deflate', 'zstd' or 'lzw') of saved tomograms for the current process,
+    overriding the TOMOGRAM_COMPRESSION setting. None restores the setting.
+    """
+    global _TOMOGRAM_COMPRESSION
+    if compression is not None and compression not in TOMOGRAM_COMPRESSIONS:
+        raise ValueError(f"Tomogram compression must be one of {', '.join(TOMOGRAM_COMPRESSIONS)}.")
+    _TOMOGRAM_COMPRESSION = compression
+
+def get_tomogram_compression() -> str:
+    """Returns the GeoTIFF compression of saved tomograms of the current process."""
+    return _TOMOGRAM_COMPRESSION or cached_settings().TOMOGRAM_COMPRESSION
+
+def set_tomogram_storage(storage: str | None) -> None:
+    """
+    Sets the storage of saved tomograms ('geotiff', 'native' or 'both') for the current process, overriding the
+    TOMOGRAM_STORAGE setting. None restores the setting.
+    """
+    global _TOMOGRAM_STORAGE
+    if storage is not None and storage not in TOMOGRAM_STORAGES:
+        raise ValueError(f"Tomogram storage must be one of {', '.join(TOMOGRAM_STORAGES)}.")
+    _TOMOGRAM_STORAGE = storage
+
+def get_tomogram_storage() -> str:
+    """Returns the storage of saved tomograms of the current process."""
+    return _TOMOGRAM_STORAGE or cached_settings().TOMOGRAM_STORAGE
+
+def set_tomogram_cache(budget: int | None) -> None:
+    """
+    Sets the memory budget (in MiB, 0 for none) of lazily loaded tomograms for the current process, overriding
+    the TOMOGRAM_CACHE setting. None restores the setting.
+    """
+    global _TOMOGRAM_CACHE
+    if budget is not None and int(budget) < 0:
+        raise ValueError("Tomogram cache budget must be a non-negative number of MiB.")
+    _TOMOGRAM_CACHE = int(budget) if budget is not None else None
+
+def get_tomogram_cache() -> int:
+    """Returns the memory budget of lazily loaded tomograms of the current process in bytes (0 for none)."""
+    budget = _TOMOGRAM_CACHE if _TOMOGRAM_CACHE is not None else cached_settings().TOMOGRAM_CACHE
+    return int(budget) * 2**20
+
 def save_default() -> None:
+    global _SETTINGS
     LOCAL.mkdir(exist_ok=True)
     with open(SETTINGS_PATH, "w") as file:
-        json.dump(DEFAULT, file, indent=4)
\ No newline at end of file
+        json.dump(DEFAULT, file, indent=4)
+    _SETTINGS = None
\ No newline at end of file
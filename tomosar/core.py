@@ -4,30 +4,52 @@ import os
 import re
 import socket
 import shutil
+import hashlib
+import threading
+import weakref
+import struct
+import zipfile
+import tempfile
 from pathlib import Path
 from datetime import datetime, date, time
-from typing import Dict, ClassVar
+from typing import Dict, ClassVar, Callable
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import numpy as np
 import pandas as pd
 import geopandas as gpd
-from dataclasses import dataclass, field, fields
+from dataclasses import dataclass, field, fields, replace
 import rasterio
 from rasterio.profiles import Profile
 from rasterio.transform import Affine
+from rasterio.windows import Window
 from rasterio.features import rasterize
+from rasterio.enums import Resampling
+from rasterio.crs import CRS
+from rasterio.errors import WindowError
+from scipy.ndimage import find_objects
 import json
-from collections import defaultdict
+import itertools
+from collections import defaultdict, OrderedDict
+from functools import partial
 import copy
 
-from .utils import warn, collect_statistics, estimaterr, apply_variable_descriptions, parse_datetime_string
-from .processing import multilook, filter
+from .utils import warn, collect_statistics, collect_label_statistics, estimaterr, apply_variable_descriptions, parse_datetime_string
+from .processing import (multilook, filter, chunked_multilook, chunked_filter, chunked_intensity,
+                         working_dtypes, as_looks, point_targets, mmse_estimate, FilterPool)
 from .apperture import SARModel
-from .config import Settings
+from .config import (Settings, MASK_CACHE_PATH, TOMOGRAM_COMPRESSIONS, TOMOGRAM_STORAGES, get_memory_budget,
+                     get_quantile_method, get_tomogram_compression, get_tomogram_storage, get_tomogram_cache)
+from .images import ImageHandle
+from .chunking import allocate, is_out_of_core, height_chunks
+from .quantiles import quantile
 
 ### Custom classes
-@dataclass
+@dataclass(slots=True)
 class ImageInfo:
+    """
+    Metadata of a single slice. Pixel data is not held by the record but behind a lazy ImageHandle
+    (read on first access of .image and shared, reference counted, between copies).
+    """
     filename: str 
     folder: str = "."
     date: datetime | None = None
@@ -51,13 +73,16 @@ class ImageInfo:
     thresh: float | None = 10.0
     squint: float | None = 0.0
     text: str | None = None
-    image: np.ndarray | None = None
-    profile: Profile | None = None
     _paths: list[Path] = field(default_factory=list, repr=False)
+    _handle: ImageHandle | None = field(default=None, repr=False)
     
 
     PAIR_PARAMETERS: ClassVar[list[str]] = ['date', 'width', 'res', 'smo', 'ham', 'hoff',
                   'depth', 'refr', 'lat', 'lon', 'DC', 'DL', 'HC', 'HV', 'thresh', 'squint']
+    # Class level constant listing the metadata parsed from a slice filename
+    METADATA_PARAMETERS: ClassVar[list[str]] = ['filename', 'folder', 'date', 'spiral', 'band', 'width', 'res',
+                  'linuxTime', 'smo', 'hoff', 'depth', 'roff', 'ham', 'refr', 'lat', 'lon', 'DC', 'DL', 'HC', 'HV',
+                  'thresh', 'squint', 'text']
     
     @property
     def is_pair(self):
@@ -77,6 +102,31 @@ class ImageInfo:
     @property
     def height(self):
         return self.hoff - abs(self.depth)
+
+    @property
+    def handle(self) -> ImageHandle | None:
+        return self._handle
+
+    @property
+    def image(self) -> np.ndarray | tuple | None:
+        return self._handle.image if self._handle is not None else None
+
+    @image.setter
+    def image(self, image: np.ndarray | tuple | None) -> None:
+        # The profile is kept from the file header, without reading the image it replaces
+        profile = self._handle.describe() if self._handle is not None else None
+        self._handle = ImageHandle.from_array(image, profile) if image is not None or profile is not None else None
+
+    @property
+    def profile(self) -> Profile | None:
+        return self._handle.profile if self._handle is not None else None
+
+    @profile.setter
+    def profile(self, profile: Profile | None) -> None:
+        if self._handle is None:
+            self._handle = ImageHandle.from_array(None, profile)
+        else:
+            self._handle.profile = profile
     
     @property
     def path(self):
@@ -112,7 +162,7 @@ class ImageInfo:
 
         if self.profile != other.profile:
             raise ValueError("Image profiles do not match.")
-        if self.image and other.image:
+        if self.image is not None and other.image is not None:
             r = np.sqrt(np.abs(self.image)**2 + np.abs(other.image)**2)
             phase = np.angle(self.image) - np.angle(other.image)
             composed.image = r * np.exp(phase * 1j)
@@ -123,73 +173,60 @@ class ImageInfo:
         return composed
     
     def copy(self) -> 'ImageInfo':
-        new_info = ImageInfo(self.folder, self.filename)
-        new_info.date = self.date
-        new_info.spiral = self.spiral
-        new_info.band = self.band
-        new_info.width = self.width
-        new_info.res = self.res
-        new_info.linuxTime = self.linuxTime
-        new_info.smo = self.smo
-        new_info.hoff = self.hoff
-        new_info.depth = self.depth
-        new_info.roff = self.roff
-        new_info.ham = self.ham
-        new_info.refr = self.refr
-        new_info.lat = self.lat
-        new_info.lon = self.lon
-        new_info.DC = self.DC
-        new_info.DL = self.DL
-        new_info.HC = self.HC
-        new_info.HV = self.HV
-        new_info.thresh = self.thresh
-        new_info.squint = self.squint
-        new_info.text = self.text
-        if isinstance(self.image, np.ndarray):
-            new_info.image = self.image.copy()
-        else:
-            new_info.image = None
-        new_info.profile = self.profile.copy()
-        return new_info
+        # The copy shares the image through a new handle on the same source instead of duplicating it
+        handle = self._handle.copy() if self._handle is not None else None
+        return replace(self, _paths=list(self._paths), _handle=handle)
 
     def get(self, key: str):
         return getattr(self, key, None)
 
-    def read(self, db0: float = 1):
-        import rasterio
-        
-        db0 = db0 * self.res**2
-        if isinstance(self.path, Path):
-            try:
-                with rasterio.open(self.path) as src:
-                    if src.profile.count == 2:
-                        real = src.read(1)
-                        imag = src.read(2)
-                        self.image = (real + 1j * imag) / db0
-                        self.profile = src.profile
-                    else:
-                        self.image = src.read()
-                        self.profile = src.profile
-            except Exception as e:
-                print(f"Error reading {self.filename}: {e}")
-        elif len(self.path) == 2:
-            try:
-                with rasterio.open(self.path[0]) as src:
-                    real = src.read(1)
-                    imag = src.read(2)
-                    image1 = (real + 1j * imag) / db0
-                    self.profile = src.profile
-            except Exception as e:
-                print(f"Error reading {self.filename}: {e}")
-            try:
-                with rasterio.open(self.path[1]) as src:
-                    real = src.read(1)
-                    imag = src.read(2)
-                    image2 = (real + 1j * imag) / db0
-            except Exception as e:
-                print(f"Error reading {self.filename}: {e}")
-            self.image = (image1, image2)
-        
+    @classmethod
+    def from_record(cls, record: dict) -> 'ImageInfo':
+        """
+        Creates an ImageInfo from a row of a parse_filenames table (or any mapping of metadata parameters).
+        """
+        values = {}
+        for key in cls.METADATA_PARAMETERS:
+            value = record.get(key)
+            if value is None or (not isinstance(value, str) and pd.isna(value)):
+                continue
+            if key == 'folder':
+                value = Path(value)
+            elif key == 'date':
+                value = pd.Timestamp(value).to_pydatetime()
+            elif key in ['spiral', 'linuxTime']:
+                value = int(value)
+            elif isinstance(value, np.floating):
+                value = float(value)
+            values[key] = value
+        return cls(**values)
+
+    def read(self, db0: float = 1, lazy: bool = False, window: Window | tuple | None = None,
+             bounds: tuple[float, float, float, float] | None = None, out_shape: tuple[int, int] | None = None,
+             out: np.ndarray | None = None):
+        """
+        Attaches an ImageHandle on the slice file(s), scaled by db0 per square meter.
+        A region of interest can be given as a pixel window or as bounds (left, bottom, right, top) in the
+        slice CRS, and out_shape (height, width) gives a decimated read of the region.
+        The image is read immediately unless lazy is set, in which case it is read on first access.
+        Complex slices are read into out (a complex array, e.g. a slot of a tomogram) if given.
+        A region outside the slice raises a WindowError.
+        """
+        path = self.path
+        if path is None or (not isinstance(path, Path) and len(path) != 2):
+            return self
+        try:
+            self._handle = ImageHandle(path, window=window, bounds=bounds, out_shape=out_shape,
+                                       scale=db0 * self.res**2)
+            if not lazy or out is not None:
+                self._handle.load(out=out)
+        except WindowError:
+            self._handle = None
+            raise
+        except Exception as e:
+            self._handle = None
+            print(f"Error reading {self.filename}: {e}")
+
         return self
 
     def generate_filename(self) -> str:
@@ -266,6 +303,8 @@ class ImageInfo:
         if not isinstance(other, ImageInfo):
             return False
         for f in fields(self):
+            if f.name == '_handle':
+                continue # Pixel data is not compared
             val1 = self.get(f.name)
             val2 = other.get(f.name)
             if not val1 or not val2:
@@ -300,8 +339,10 @@ class ImageInfo:
 
     def __bool__(self):
         for f in fields(self):
+            if f.name == '_handle':
+                continue
             value = self.get(f.name)
-            if f.name == 'date' and value.year < 2000:
+            if f.name == 'date' and value is not None and value.year < 2000:
                 continue # Skip dates before year 2k
             if value:
                 return True
@@ -320,22 +361,74 @@ class SliceInfo:
         self.slices.append(item)
         return self
     
-    def read(self, db0, npar: int = os.cpu_count()) -> 'SliceInfo':
+    def read(self, db0, npar: int = os.cpu_count(), window: Window | tuple | None = None,
+             bounds: tuple[float, float, float, float] | None = None,
+             out_shape: tuple[int, int] | None = None, out: np.ndarray | list[np.ndarray] | None = None) -> 'SliceInfo':
+        """
+        Reads the slices in parallel (see ImageInfo.read). If out is an (N, H, W) complex array (or a list
+        of N views), slice i is read directly into out[i], so that no separate stack copy is needed.
+        """
         from concurrent.futures import ThreadPoolExecutor, as_completed
         from tqdm import tqdm
 
         desc = f"Reading: "
         read_slices = SliceInfo()
+        region = dict(window=window, bounds=bounds, out_shape=out_shape)
+        if out is not None and len(out) != len(self):
+            raise ValueError(f"Output array has {len(out)} slots for {len(self)} slices.")
 
         with ThreadPoolExecutor(max_workers=npar) as executor:
-            futures = [executor.submit(slice.read, db0) for slice in self.slices if not slice.image]
+            if out is not None:
+                futures = [executor.submit(slice.read, db0, out=slot, **region) for slice, slot in zip(self.slices, out)]
+            else:
+                futures = [executor.submit(slice.read, db0, **region) for slice in self.slices
+                           if slice.handle is None or not slice.handle.loaded or not slice.handle.matches(**region)]
 
             for future in tqdm(as_completed(futures), total=len(self), desc=desc, unit='files', leave=False):
                 try:
                     read_slices.append(future.result())
+                except WindowError:
+                    raise
                 except Exception as e:
                     print(f"Error reading file: {e}")
         return read_slices
+
+    def assemble(self, db0: float = 1, npar: int = os.cpu_count(), window: Window | tuple | None = None,
+                 bounds: tuple[float, float, float, float] | None = None, out_shape: tuple[int, int] | None = None,
+                 scratch: str | Path | None = None) -> np.ndarray:
+        """
+        Assembles the slices, in their current order, into an (N, H, W) complex tomogram (in the working precision) that is allocated once
+        (as a memory-mapped file in the scratch folder if given) and read into directly. Slices that already hold
+        an image are copied into their slot, and afterwards every slice refers to its slot so that per-slice
+        arrays are freed. Composite (paired) or single-band slices are read and stacked instead.
+        """
+        region = dict(window=window, bounds=bounds, out_shape=out_shape)
+        loaded = [s.handle is not None and s.handle.loaded and s.handle.matches(**region) for s in self]
+        first = self[0]
+        if loaded[0]:
+            image = first.image
+            complex_slices = isinstance(image, np.ndarray) and np.iscomplexobj(image)
+            shape = image.shape
+        else:
+            handle = ImageHandle(first.path, scale=db0 * first.res**2, **region) if isinstance(first.path, Path) else None
+            profile = handle.describe() if handle is not None else None
+            complex_slices = profile is not None and profile['count'] == 2
+            shape = (profile['height'], profile['width']) if profile is not None else None
+        if not complex_slices or any(not isinstance(s.path, Path) for s in self):
+            self.read(db0, npar=npar, **region)
+            return np.stack([s.image for s in self], axis=0)
+
+        tomogram = allocate((len(self), *shape), dtype=working_dtypes()[0], scratch=scratch)
+        pending = []
+        for i, (s, is_loaded) in enumerate(zip(self, loaded)):
+            if is_loaded:
+                tomogram[i] = s.image
+                s.image = tomogram[i]
+            else:
+                pending.append(i)
+        if pending:
+            SliceInfo([self[i] for i in pending]).read(db0, npar=npar, out=[tomogram[i] for i in pending], **region)
+        return tomogram
     
     def extend(self, other: 'SliceInfo') -> 'SliceInfo':
         if not isinstance(other, SliceInfo):
@@ -447,6 +540,13 @@ class SliceInfo:
         print(f"{len(self) - len(filtered_slices)} slices filtered.")
         self.slices = filtered_slices
 
+    @classmethod
+    def from_table(cls, table: pd.DataFrame) -> 'SliceInfo':
+        """
+        Creates a columnar SliceTable from a parse_filenames table.
+        """
+        return SliceTable(table)
+
     @classmethod
     def scan(self, path: str|Path = '.', filter: ImageInfo = None, 
              read: bool = False, npar: int = os.cpu_count) -> 'SliceInfo':
@@ -476,36 +576,323 @@ class SliceInfo:
             return False
         return all(slice in other.slices for slice in self.slices) and len(self.slices) == len(other.slices)
 
+class SliceTable(SliceInfo):
+    """
+    Columnar SliceInfo backed by a table with one row per slice and one column per ImageInfo metadata parameter
+    (as returned by parse_filenames).
+
+    Grouping, sorting, de-duplication and filtering are vectorized over the columns. ImageInfo row views are only
+    created when a slice is accessed, and are cached so that images read into them persist across groups.
+    """
+    def __init__(self, table: pd.DataFrame | None = None, rows: list[ImageInfo | None] | None = None):
+        if table is None:
+            table = pd.DataFrame(columns=ImageInfo.METADATA_PARAMETERS)
+        self._table = table.reset_index(drop=True)
+        self._index = None      # Row positions in _table when this is a view of another SliceTable
+        self._rows = list(rows) if rows is not None else [None] * len(self._table)
+
+    @property
+    def table(self) -> pd.DataFrame:
+        if self._index is not None:
+            self._table = self._table.iloc[self._index].reset_index(drop=True)
+            self._index = None
+        return self._table
+
+    @table.setter
+    def table(self, table: pd.DataFrame) -> None:
+        self._table = table
+        self._index = None
+
+    @property
+    def slices(self) -> list[ImageInfo]:
+        return [self._row(i) for i in range(len(self))]
+
+    @slices.setter
+    def slices(self, slices: list[ImageInfo]) -> None:
+        self.table = _metadata_table(slices)
+        self._rows = list(slices)
+
+    def _row(self, i: int) -> ImageInfo:
+        if self._rows[i] is None:
+            position = i if self._index is None else self._index[i]
+            self._rows[i] = ImageInfo.from_record(self._table.iloc[position].to_dict())
+        return self._rows[i]
+
+    def _take(self, idx) -> 'SliceTable':
+        # Takes are views until their table is needed, so that splitting into many groups stays cheap
+        idx = np.asarray(idx, dtype=int)
+        taken = SliceTable.__new__(SliceTable)
+        taken._table = self._table
+        taken._index = idx if self._index is None else self._index[idx]
+        taken._rows = [self._rows[i] for i in idx]
+        return taken
+
+    def _column(self, key: str) -> pd.Series | None:
+        if key in self.table.columns:
+            return self.table[key]
+        if key == 'height':
+            return self.table['hoff'] - self.table['depth'].abs()
+        return None
+
+    def append(self, item: ImageInfo) -> 'SliceTable':
+        self.table = pd.concat([self.table, _metadata_table([item])], ignore_index=True)
+        self._rows.append(item)
+        return self
+
+    def extend(self, other: SliceInfo) -> 'SliceTable':
+        if not isinstance(other, SliceInfo):
+            raise TypeError("Can only extend with another SliceInfo instance.")
+        if not isinstance(other, SliceTable):
+            other = SliceTable.from_slices(other.slices)
+        self.table = pd.concat([self.table, other.table], ignore_index=True)
+        self._rows.extend(other._rows)
+        return self
+
+    def copy(self) -> 'SliceTable':
+        return SliceTable(self.table.copy(), self._rows)
+
+    def unique(self) -> 'SliceTable':
+        keys = ['date', 'spiral', 'band', 'width', 'res', 'smo', 'hoff', 'depth', 'refr', 'lat', 'lon',
+                'DC', 'DL', 'HC', 'HV', 'thresh', 'squint']
+        return self._take(np.flatnonzero(~self.table.duplicated(subset=keys).to_numpy()))
+
+    def group(self, key: str | list[str], list: bool = False) -> Dict[str, 'SliceTable'] | list['SliceTable']:
+        keys = [key] if isinstance(key, str) else key
+        if not len(self):
+            return [] if list else defaultdict(SliceTable)
+        grouped = defaultdict(SliceTable)
+        for group_key, idx in self._groups(keys):
+            grouped[group_key[0] if len(keys) == 1 else group_key] = self._take(idx)
+
+        if list:
+            grouped = [g for g in grouped.values()]
+        return grouped
+
+    def _groups(self, keys: list[str], min_size: int = 1):
+        """
+        Yields (key tuple, row positions) of the groups of at least min_size slices, in order of first appearance
+        like the list-based SliceInfo.group.
+        """
+        frame = pd.DataFrame({k: self._column(k) for k in keys})
+        codes = frame.groupby(keys, sort=False, dropna=False).ngroup().to_numpy()
+        order = np.argsort(codes, kind='stable')
+        starts = np.flatnonzero(np.r_[True, np.diff(codes[order]) != 0])
+        ends = np.r_[starts[1:], len(order)]
+        large = (ends - starts) >= min_size
+        starts, ends = starts[large], ends[large]
+
+        first = frame.iloc[order[starts]]
+        group_keys = zip(*(_values(first[k]) for k in keys))
+        for group_key, start, end in zip(group_keys, starts, ends):
+            yield group_key, order[start:end]
+
+    def tomograms(self) -> list['SliceTable']:
+        if not len(self):
+            return []
+        return [self._take(idx) for _, idx in self._groups(self.TOMOGRAM_PARAMETERS, min_size=2)]
+
+    def categorize(self) -> Dict[str, 'SliceTable']:
+        hoff = self.table['hoff'].to_numpy(dtype=float)
+        depth = self.table['depth'].to_numpy(dtype=float)
+        thresh = self.table['thresh'].to_numpy(dtype=float)
+        masks = {'sub': hoff == 0,
+                 'sup': (hoff >= 0) & (depth == 0) & (thresh == 10),
+                 'canopy': (hoff > 0) & (thresh == 10)}
+        # Categories in order of first appearance, like the list-based SliceInfo.categorize
+        first = {cat: np.argmax(mask) for cat, mask in masks.items() if mask.any()}
+        categories = defaultdict(SliceTable)
+        for cat in sorted(first, key=first.get):
+            categories[cat] = self._take(np.flatnonzero(masks[cat]))
+        return categories
+
+    def sort(self, key: str) -> np.ndarray:
+        values = self._column(key)
+        if values is None or not pd.api.types.is_numeric_dtype(values):
+            raise Exception(f"Key {key} cannot be sorted.")
+        idx = np.argsort(values.to_numpy(dtype=float), kind='stable')
+        self.table = self.table.iloc[idx].reset_index(drop=True)
+        self._rows = [self._rows[i] for i in idx]
+        return idx
+
+    def get(self, key: str):
+        column = self._column(key)
+        if column is None:
+            return super().get(key)
+        if pd.api.types.is_numeric_dtype(column) and not column.isna().any():
+            values = column.to_numpy(dtype=getattr(column.dtype, 'numpy_dtype', column.dtype))
+        elif key == 'folder':
+            values = [Path(v) if v is not None else None for v in _values(column)]
+        else:
+            values = _values(column)
+        return values if len(values) > 1 else values[0] if len(values) else None
+
+    def filter(self, filter: ImageInfo):
+        mask = _filter_mask(self.table, filter)
+        print(f"{len(self) - int(mask.sum())} slices filtered.")
+        kept = self._take(np.flatnonzero(mask))
+        self.table = kept.table
+        self._rows = kept._rows
+
+    @classmethod
+    def from_slices(cls, slices: list[ImageInfo]) -> 'SliceTable':
+        """
+        Creates a SliceTable from existing ImageInfo objects (which become its row views).
+        """
+        return cls(_metadata_table(slices), slices)
+
+    def __getitem__(self, index):
+        if isinstance(index, (list, np.ndarray)) and np.asarray(index).dtype == bool:
+            return self._take(np.flatnonzero(index))
+        if isinstance(index, slice):
+            return [self._row(i) for i in range(len(self))[index]]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("SliceTable index out of range")
+        return self._row(index)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        return (self._row(i) for i in range(len(self)))
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __repr__(self):
+        return f"SliceTable({len(self)} slices)"
+
+@dataclass(frozen=True, eq=False)
+class BitMask:
+    """
+    A boolean (H, W) mask stored as its bounding box (row_start, row_stop, col_start, col_stop) and the
+    bit-packed (row-major) pixels within it. Converts to the full boolean array with np.asarray.
+    """
+    shape: tuple[int, int]
+    bbox: tuple[int, int, int, int]
+    bits: np.ndarray = field(repr=False)
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> BitMask:
+        """Packs a full boolean (H, W) array."""
+        array = np.asarray(array, dtype=bool)
+        rows, cols = np.flatnonzero(array.any(axis=1)), np.flatnonzero(array.any(axis=0))
+        if not rows.size:
+            return cls(shape=tuple(array.shape), bbox=(0, 0, 0, 0), bits=np.zeros(0, dtype=np.uint8))
+        r0, r1, c0, c1 = int(rows[0]), int(rows[-1]) + 1, int(cols[0]), int(cols[-1]) + 1
+        return cls(shape=tuple(array.shape), bbox=(r0, r1, c0, c1), bits=np.packbits(array[r0:r1, c0:c1]))
+
+    @classmethod
+    def from_crop(cls, shape: tuple[int, int], window: tuple[slice, slice], crop: np.ndarray) -> BitMask:
+        """Packs the crop of an (H, W) mask at a window (e.g. from scipy.ndimage.find_objects) that bounds it."""
+        bbox = (window[0].start, window[0].stop, window[1].start, window[1].stop)
+        return cls(shape=tuple(int(n) for n in shape), bbox=tuple(int(n) for n in bbox),
+                   bits=np.packbits(np.asarray(crop, dtype=bool)))
+
+    @property
+    def window(self) -> tuple[slice, slice]:
+        """The bounding box as (row, column) slices."""
+        return slice(self.bbox[0], self.bbox[1]), slice(self.bbox[2], self.bbox[3])
+
+    @property
+    def crop(self) -> np.ndarray:
+        """The boolean pixels within the bounding box."""
+        h, w = self.bbox[1] - self.bbox[0], self.bbox[3] - self.bbox[2]
+        return np.unpackbits(self.bits, count=h * w).reshape(h, w).view(bool)
+
+    @property
+    def indices(self) -> np.ndarray:
+        """Flat (row-major) indices of the pixels in the full (H, W) mask."""
+        rows, cols = np.nonzero(self.crop)
+        return (rows + self.bbox[0]) * self.shape[1] + cols + self.bbox[2]
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+    def any(self) -> bool:
+        return bool(self.bits.any())
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        array = np.zeros(self.shape, dtype=bool)
+        array[self.window] = self.crop
+        return array if dtype is None else array.astype(dtype)
+
+    def __invert__(self) -> np.ndarray:
+        return ~np.asarray(self)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, BitMask):
+            return NotImplemented
+        return self.shape == other.shape and self.bbox == other.bbox and np.array_equal(self.bits, other.bits)
+
 @dataclass
 class Mask:
     name: str = ""
     id: int = 0
-    mask: np.ndarray = field(default=None, repr=False)
-    multilooked: np.ndarray = field(default=None, repr=False)
+    mask: BitMask = field(default=None, repr=False)
+    multilooked: BitMask = field(default=None, repr=False)
     metadata: dict = field(default_factory=dict)
 
+    def __post_init__(self):
+        # Masks are stored bit-packed within their bounding box
+        if self.mask is not None and not isinstance(self.mask, BitMask):
+            self.mask = BitMask.from_array(self.mask)
+        if self.multilooked is not None and not isinstance(self.multilooked, BitMask):
+            self.multilooked = BitMask.from_array(self.multilooked)
+
     def copy(self) -> 'Mask':
-        new_mask = Mask(name=self.name)
-        new_mask.mask = self.mask.copy() if self.mask is not None else None
-        return new_mask
-    
-    def apply(self, tomogram: np.ndarray, multilooked: bool = False) -> np.ndarray:
-        masked_tomogram = tomogram.copy()
-        if multilooked:
-            mask = np.broadcast_to(self.multilooked[np.newaxis, :, :], tomogram.shape)
-        else:
-            mask = np.broadcast_to(self.mask[np.newaxis, :, :], tomogram.shape)
-        if np.iscomplexobj(tomogram):
-            masked_tomogram[~mask] = np.nan + np.nan*1j
-        else:
-            masked_tomogram[~mask] = np.nan
+        # Bit masks are immutable and shared between copies
+        return Mask(name=self.name, id=self.id, mask=self.mask, multilooked=self.multilooked,
+                    metadata=copy.deepcopy(self.metadata))
+    
+    def gather(self, tomogram: np.ndarray, multilooked: bool = False, budget: int | None = None) -> np.ndarray:
+        """
+        Returns the (N, n_pixels) pixels of an (N, H, W) tomogram inside the mask, in row-major order. Only the
+        bounding box of the mask is read, in chunks of slices for out-of-core tomograms.
+        """
+        bits = self.multilooked if multilooked else self.mask
+        window, local = bits.window, np.flatnonzero(bits.crop)
+        N = tomogram.shape[0]
+        pixels = np.empty((N, local.size), dtype=tomogram.dtype)
+        box = (N, bits.bbox[1] - bits.bbox[0], bits.bbox[3] - bits.bbox[2])
+        for chunk in height_chunks(box, bytes_per_voxel=2 * tomogram.itemsize, budget=budget):
+            block = np.asarray(tomogram[(chunk, *window)])
+            pixels[chunk] = np.take(block.reshape(block.shape[0], -1), local, axis=1)
+        return pixels
+
+    def view(self, tomogram: np.ndarray, multilooked: bool = False) -> np.ma.MaskedArray:
+        """
+        Returns a lazy masked view of the bounding box of the mask in an (N, H, W) tomogram: no pixels are
+        copied (or read, for memory-mapped tomograms) until used, and pixels outside the mask are masked.
+        """
+        bits = self.multilooked if multilooked else self.mask
+        data = tomogram[(slice(None), *bits.window)]
+        return np.ma.MaskedArray(data, mask=np.broadcast_to(~bits.crop, data.shape))
 
+    def apply(self, tomogram: np.ndarray, multilooked: bool = False, scratch: str | Path | None = None) -> np.ndarray:
+        """
+        Returns a copy of the tomogram with NaN outside the mask, filled with NaN and then with the gathered
+        pixels of the mask (see gather). Out-of-core tomograms are masked chunk by chunk into an array
+        memory-mapped in the scratch folder if given.
+        """
+        bits = self.multilooked if multilooked else self.mask
+        fill = np.nan + np.nan*1j if np.iscomplexobj(tomogram) else np.nan
+        indices = bits.indices
+        masked_tomogram = allocate(tomogram.shape, dtype=tomogram.dtype,
+                                   scratch=scratch if is_out_of_core(tomogram) else None)
+        for chunk in height_chunks(tomogram.shape, bytes_per_voxel=2 * tomogram.itemsize):
+            block = masked_tomogram[chunk].reshape(chunk.stop - chunk.start, -1)
+            block.fill(fill)
+            block[:, indices] = self.gather(tomogram[chunk], multilooked=multilooked)
         return masked_tomogram
 
 class Masks:
     def __init__(self, parent: TomoInfo = None, masks: dict[str,list[Mask]] = defaultdict[list]):
         self.parent: TomoInfo = parent
         self.masks: dict[str,list[Mask]] = masks
+        self._pixels: dict[str, tuple[np.ndarray, dict[tuple[str, int], np.ndarray]]] = {}
             
     def keys(self):
         return self.masks.keys()
@@ -516,12 +903,14 @@ class Masks:
     def items(self):
         return self.masks.items()
     
-    def update(self, mask_dir: str = ""):
+    def update(self, mask_dir: str = "", collect: bool = True):
         if self.parent.tomograms.profile is None:
             raise ValueError("Tomograms profile must be set before updating masks.")
         self.masks = get_masks(raster_profile=self.parent.tomograms.profile,
-                                multilooked_profile=self.parent.multilook.profile, mask_dir=mask_dir)
-        self.parent.stats.collect('masked')
+                                multilooked_profile=self.parent.multilook.profile, user_mask=mask_dir)
+        self.clear_cache()
+        if collect:
+            self.parent.stats.collect('masked')
 
     def add_masks(self, key: str, masks: Mask | list[Mask]):
         if isinstance(masks, Mask):
@@ -538,6 +927,56 @@ class Masks:
 
     def read(self, path: str|Path) -> Masks:
         self.masks = restore_cache(path)     
+        self.clear_cache()
+
+    def pixels(self, mask: Mask, layer: str) -> np.ndarray:
+        """
+        Returns the gathered (N, n_pixels) pixels of a mask in the tomogram of a layer ('raw', 'multilooked' or
+        'filtered'), see Mask.gather. Gathered pixels are cached per layer (by mask name and id) until the
+        tomogram of the layer is replaced.
+        """
+        tomogram = self.parent.tomograms.get(layer)
+        if tomogram is None:
+            raise ValueError(f"No {layer} tomogram data available.")
+        source, cache = self._pixels.get(layer, (None, None))
+        if source is not tomogram:
+            cache = {}
+            self._pixels[layer] = (tomogram, cache)
+        key = (mask.name, mask.id)
+        if key not in cache:
+            cache[key] = mask.gather(tomogram, multilooked=(layer == 'multilooked'))
+        return cache[key]
+
+    def statistics(self, mask: Mask, layer: str) -> pd.DataFrame:
+        """Statistics (as collect_statistics with circ=False) of the cached gathered pixels of a mask in a layer."""
+        pixels = self.pixels(mask, layer)
+        bits = mask.multilooked if layer == 'multilooked' else mask.mask
+        return collect_statistics(pixels, height=self.parent.tomograms.height,
+                                  excluded=bits.shape[0] * bits.shape[1] - pixels.shape[1])
+
+    def clear_cache(self) -> None:
+        """Drops the cached gathered pixels."""
+        self._pixels = {}
+
+    def labels(self, multilooked: bool = False) -> list[tuple[np.ndarray, list[Mask]]]:
+        """
+        Packs all masks into label images of non-overlapping masks. Returns (labels, masks) pairs where labels
+        is an (H, W) image in which the pixels of masks[i] are i + 1 (and 0 is background). Each mask goes to
+        the first label image it does not overlap.
+        """
+        groups = []
+        for mask in itertools.chain.from_iterable(self.masks.values()):
+            bits = mask.multilooked if multilooked else mask.mask
+            window, crop = bits.window, bits.crop
+            for labels, members in groups:
+                if not labels[window][crop].any():
+                    break
+            else:
+                labels, members = np.zeros(bits.shape, dtype=np.int32), []
+                groups.append((labels, members))
+            members.append(mask)
+            labels[window][crop] = len(members)
+        return groups
 
     def copy(self) -> Masks:
         new_masks = Masks()
@@ -575,31 +1014,178 @@ class Masks:
     def __bool__(self):
         return bool(self.masks)
 
+class TomogramCache:
+    """
+    The tomogram layers of all loaded scenes that were read lazily (see Tomograms.defer), least recently used
+    first. When they take more memory than the budget (in bytes, by default the TOMOGRAM_CACHE setting, 0 for no
+    limit), the least recently used layers are dropped, to be read again on their next access. Memory-mapped
+    layers take no budget.
+    """
+    def __init__(self, budget: int | None = None):
+        self.budget = budget
+        self._layers: OrderedDict[tuple[int, str], tuple[weakref.ref, int]] = OrderedDict()
+        self._lock = threading.RLock()
+
+    @property
+    def nbytes(self) -> int:
+        """Memory taken by the lazily read layers in bytes."""
+        with self._lock:
+            return sum(nbytes for _, nbytes in self._layers.values())
+
+    def add(self, tomograms: Tomograms, layer: str, array: np.ndarray) -> None:
+        """Accounts for a layer that was just read, and drops least recently used layers beyond the budget."""
+        key = (id(tomograms), layer)
+        nbytes = 0 if isinstance(array, np.memmap) else array.nbytes
+        with self._lock:
+            self._layers[key] = (weakref.ref(tomograms, lambda _, key=key: self.discard(*key)), nbytes)
+            self._evict(keep=key)
+
+    def touch(self, tomograms: Tomograms, layer: str) -> None:
+        """Marks a layer as most recently used."""
+        with self._lock:
+            key = (id(tomograms), layer)
+            if key in self._layers:
+                self._layers.move_to_end(key)
+
+    def discard(self, tomograms: Tomograms | int, layer: str) -> None:
+        """Stops accounting for a layer (e.g. that was replaced), without dropping it."""
+        with self._lock:
+            self._layers.pop((tomograms if isinstance(tomograms, int) else id(tomograms), layer), None)
+
+    def clear(self) -> None:
+        """Drops all lazily read layers."""
+        with self._lock:
+            for key in list(self._layers):
+                self._drop(key)
+
+    def _evict(self, keep: tuple[int, str]) -> None:
+        budget = self.budget if self.budget is not None else get_tomogram_cache()
+        if not budget:
+            return
+        total = self.nbytes
+        for key in list(self._layers):
+            if total <= budget:
+                break
+            if key != keep:
+                total -= self._drop(key)
+
+    def _drop(self, key: tuple[int, str]) -> int:
+        ref, nbytes = self._layers.pop(key)
+        tomograms = ref()
+        if tomograms is not None:
+            tomograms._drop(key[1])
+        return nbytes
+
+# Lazily read tomogram layers of all scenes
+tomogram_cache = TomogramCache()
+
+class DeferredLayer:
+    """
+    A tomogram layer of Tomograms: an array (or None), or a reader of it (see Tomograms.defer) that is called on
+    first access, with the layer accounted for in the tomogram cache from then on.
+    """
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, tomograms: Tomograms | None, owner=None) -> np.ndarray | None:
+        if tomograms is None:
+            return None     # Default of the dataclass field
+        array = vars(tomograms).get(self.name)
+        if self.name not in tomograms._readers:
+            return array
+        if array is None:
+            with tomograms._lock:
+                array = vars(tomograms).get(self.name)
+                if array is None:
+                    array = tomograms._readers[self.name]()
+                    vars(tomograms)[self.name] = array
+                    tomogram_cache.add(tomograms, self.name, array)
+        tomogram_cache.touch(tomograms, self.name)
+        return array
+
+    def __set__(self, tomograms: Tomograms, value: np.ndarray | None) -> None:
+        tomograms._readers.pop(self.name, None)
+        tomogram_cache.discard(tomograms, self.name)
+        vars(tomograms)[self.name] = value
+
 @dataclass
 class Tomograms:
-    raw: np.ndarray | None = field(default=None, repr=False)
-    multilooked: np.ndarray | None = field(default=None, repr=False)
-    filtered: np.ndarray | None = field(default=None, repr=False)
+    _readers: dict[str, Callable[[], np.ndarray]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False, compare=False)
+    # Layers default to None (see DeferredLayer.__get__)
+    raw: np.ndarray | None = DeferredLayer()
+    multilooked: np.ndarray | None = DeferredLayer()
+    filtered: np.ndarray | None = DeferredLayer()
     profile: Profile | None = field(default=None, repr=False)
     height: list[float] = field(default_factory=list)
+    scratch: Path | None = field(default=None, repr=False) # Folder of memory-mapped out-of-core products
+    _intensity: np.ndarray | None = field(default=None, init=False, repr=False, compare=False)
+    _intensity_source: weakref.ref | None = field(default=None, init=False, repr=False, compare=False)
+
+    LAYERS: ClassVar[list[str]] = ['raw', 'multilooked', 'filtered']
+
+    @property
+    def intensity(self) -> np.ndarray | None:
+        """
+        Linear intensity of the raw tomogram in the real working dtype, shared by multilooking and filtering.
+        It is computed once per raw tomogram, chunk by chunk into a single buffer (memory-mapped in the scratch
+        folder if set), and recomputed if the raw tomogram is replaced. The raw tomogram is referenced weakly, so
+        that replacing or dropping it frees it.
+        """
+        raw = self.raw
+        if raw is None:
+            return None
+        if self._intensity is None or self._intensity_source is None or self._intensity_source() is not raw:
+            self._intensity = None
+            self._intensity = chunked_intensity(raw, scratch=self.scratch)
+            self._intensity_source = weakref.ref(raw)
+        return self._intensity
+
+    @intensity.setter
+    def intensity(self, value: np.ndarray | None) -> None:
+        """Sets (or with None drops) the cached intensity of the current raw tomogram."""
+        self._intensity = value
+        self._intensity_source = weakref.ref(self.raw) if value is not None and self.raw is not None else None
+
+    def defer(self, layer: str, reader: Callable[[], np.ndarray]) -> None:
+        """Sets a layer to be read by reader on its first access (see TomogramCache)."""
+        if layer not in self.LAYERS:
+            raise ValueError(f"The different layers are {', '.join(self.LAYERS)}.")
+        setattr(self, layer, None)
+        self._readers[layer] = reader
+
+    def deferred(self, layer: str) -> bool:
+        """Whether a layer is yet to be read (or was dropped from the tomogram cache)."""
+        return layer in self._readers and vars(self).get(layer) is None
+
+    def _drop(self, layer: str) -> None:
+        # Only layers that can be read again are dropped, and the intensity of the raw tomogram with it
+        if layer in self._readers:
+            vars(self)[layer] = None
+            if layer == 'raw':
+                self.intensity = None
 
     def __repr__(self):
-        return f"Tomograms(raw={self.raw is not None}, multilooked={self.multilooked is not None}, filtered={self.filtered is not None})"
+        def state(layer):
+            return 'deferred' if self.deferred(layer) else vars(self).get(layer) is not None
+        return f"Tomograms(raw={state('raw')}, multilooked={state('multilooked')}, filtered={state('filtered')})"
     
     @classmethod
-    def load(cls, path: str|Path) -> 'Tomograms':
+    def load(cls, path: str|Path, lazy: bool = False) -> 'Tomograms':
         """
         Create a Tomograms instance from a directory containing tomogram files.
+        Tomograms saved natively (<layer>_tomogram.npy) are memory-mapped read-only, so that only the slices and
+        areas that are used are read, and others are read from their GeoTIFFs. If lazy, only the profile is read
+        and every layer is read on its first access (see Tomograms.defer).
         Path validation is delegated to TomoScene.load, and this method should only be called from there.
         """
         path = Path(path)
 
-        raw_path = path / 'raw_tomogram.tif'
-        multilooked_path = path / 'multilooked_tomogram.tif'
-        filtered_path = path / 'filtered_tomogram.tif'
+        native_paths = {layer: path / f'{layer}_tomogram.npy' for layer in cls.LAYERS}
+        geotiff_paths = {layer: path / f'{layer}_tomogram.tif' for layer in cls.LAYERS}
 
         # Check if the files exist
-        if not raw_path.exists() or not multilooked_path.exists() or not filtered_path.exists():
+        if any(not native_paths[layer].exists() and not geotiff_paths[layer].exists() for layer in cls.LAYERS):
             raise FileNotFoundError("One or more tomogram files are missing in the directory.")
         
         # Function to read a tomogram file
@@ -627,79 +1213,149 @@ class Tomograms:
             with rasterio.open(file_path) as src:
                 tags = [src.tags(i+1) for i in range(src.count)]
                 if is_complex(tags):
+                    # Real and imaginary bands are read at once into the parts of one complex cube
                     half = src.count // 2
-                    real = np.stack([src.read(i+1) for i in range(half)])
-                    imag = np.stack([src.read(i+1+half) for i in range(half)])
-                    return real + 1j * imag, src.profile
+                    real = src.read(list(range(1, half + 1)))
+                    tomogram = np.empty(real.shape, dtype=np.result_type(real.dtype, np.complex64))
+                    tomogram.real = real
+                    del real
+                    tomogram.imag = src.read(list(range(half + 1, src.count + 1)))
+                    return tomogram, src.profile
                 elif is_real(tags):
                     return src.read(), src.profile
                 else:
                     raise ValueError(f"Tomogram {file_path} contains imaginary slices, \
                                      but they cannot be matched against real slices.\n \
                                      Tags: {tags}")
+
+        def read_layer(layer: str) -> np.ndarray:
+            if native_paths[layer].exists():
+                return np.load(native_paths[layer], mmap_mode='r')
+            return read_tomogram(geotiff_paths[layer])[0]
+
+        # The profile of natively saved tomograms, or of the filtered GeoTIFF
+        profile_path = path / 'tomogram_profile.json'
+        if profile_path.exists():
+            with open(profile_path, 'r') as f:
+                profile = profile_from_json(json.load(f))
+        else:
+            with rasterio.open(geotiff_paths['filtered']) as src:
+                profile = src.profile
+
+        tomograms = cls(profile=profile)
+        if lazy:
+            for layer in cls.LAYERS:
+                tomograms.defer(layer, partial(read_layer, layer))
+            return tomograms
         
         # Load the tomograms from the files
         with ThreadPoolExecutor() as executor:
-            futures = {
-                'raw': executor.submit(read_tomogram, raw_path),
-                'multilooked': executor.submit(read_tomogram, multilooked_path),
-                'filtered': executor.submit(read_tomogram, filtered_path)
-            }
-            result = futures['raw'].result()
-            raw,_ = result if result else (None, None)
-            result = futures['multilooked'].result()
-            multilooked,_ =  result if result else (None, None)
-            result = futures['filtered'].result()
-            filtered, profile = result if result else (None, None)
-
-        return cls(raw=raw, multilooked=multilooked, filtered=filtered, profile=profile)
-    
-    def save(self, tomo_dir: str|Path):
+            for layer, array in zip(cls.LAYERS, executor.map(read_layer, cls.LAYERS)):
+                setattr(tomograms, layer, array)
+
+        return tomograms
+    
+    def save(self, tomo_dir: str|Path, compression: str | None = None, overviews: bool | None = None,
+             storage: str | None = None):
+        """
+        Saves the tomograms as tiled GeoTIFFs (see tomogram_profile) compressed by compression (by default the
+        TOMOGRAM_COMPRESSION setting), with overviews if set (by default the TOMOGRAM_OVERVIEWS setting). Complex
+        tomograms are saved as real bands followed by imaginary bands, tagged by role and slice.
+        Depending on storage (by default the TOMOGRAM_STORAGE setting), tomograms are saved as GeoTIFFs, natively
+        as .npy cubes (with the profile in tomogram_profile.json) that are memory-mapped when loaded, or both.
+        """
         tomo_dir = Path(tomo_dir)
+        compression = compression or get_tomogram_compression()
+        overviews = Settings().TOMOGRAM_OVERVIEWS if overviews is None else overviews
+        storage = storage or get_tomogram_storage()
+        if storage not in TOMOGRAM_STORAGES:
+            raise ValueError(f"Tomogram storage must be one of {', '.join(TOMOGRAM_STORAGES)}.")
         def save_tomogram(array, filename):
             if array is not None:
-                if array.iscomplexobj():
-                    c = True
-                    num_slices = array.shape[0]
-                    array = np.concatenate([array.real, array.imag], axis=0)
-                else:
-                    c = False
-                    num_slices = array.shape[0]
-                profile = self.profile.copy()
-                profile.update({
-                    'driver': 'GTiff',
-                    'count': array.shape[0] ,
-                    'height': array.shape[1],
-                    'width': array.shape[2],
-                    'dtype': array.dtype
-                })
+                c = np.iscomplexobj(array)
+                num_slices = array.shape[0]
+                dtype = array.real.dtype if c else array.dtype
+                profile = tomogram_profile(self.profile, count=2 * num_slices if c else num_slices,
+                                           shape=array.shape[1:], dtype=dtype, compression=compression)
                 with rasterio.open(tomo_dir/filename, 'w', **profile) as dst:
-                    dst.write(array)
+                    # Slices are written in chunks, real and imaginary parts without concatenating them
+                    for chunk in height_chunks(array.shape, bytes_per_voxel=2 * array.itemsize):
+                        indexes = list(range(chunk.start + 1, chunk.stop + 1))
+                        block = np.asarray(array[chunk])
+                        dst.write(block.real if c else block, indexes=indexes)
+                        if c:
+                            dst.write(block.imag, indexes=[i + num_slices for i in indexes])
                     for i in range(num_slices):
                         dst.update_tags(i+1, role='real', slice=i)
                         if c:
                             dst.update_tags(i+num_slices+1, role='imag', slice=i)
+                    if overviews:
+                        factors = overview_factors(array.shape[1:])
+                        if factors:
+                            dst.build_overviews(factors, Resampling.average)
+                            dst.update_tags(ns='rio_overview', resampling='average')
 
-
-        save_tomogram(self.raw, 'raw_tomogram.tif')
-        save_tomogram(self.multilooked, 'multilooked_tomogram.tif')
-        save_tomogram(self.filtered, 'filtered_tomogram.tif')
+        def save_native(array, filename):
+            if array is not None:
+                # Written next to the file and moved over it, as the file may be memory-mapped by array
+                with tempfile.NamedTemporaryFile(dir=tomo_dir, prefix=Path(filename).stem, suffix=".npy",
+                                                 delete=False) as file:
+                    pass
+                try:
+                    native = np.lib.format.open_memmap(file.name, mode='w+', dtype=array.dtype, shape=array.shape)
+                    for chunk in height_chunks(array.shape, bytes_per_voxel=2 * array.itemsize):
+                        native[chunk] = array[chunk]
+                    native.flush()
+                    del native
+                except BaseException:
+                    os.remove(file.name)
+                    raise
+                os.replace(file.name, tomo_dir/filename)
+
+        for layer in self.LAYERS:
+            array = self.get(layer)
+            if array is None:
+                continue
+            # Files of the other storage are removed so that they are not loaded instead
+            if storage in ['geotiff', 'both']:
+                save_tomogram(array, f'{layer}_tomogram.tif')
+            else:
+                (tomo_dir/f'{layer}_tomogram.tif').unlink(missing_ok=True)
+            if storage in ['native', 'both']:
+                save_native(array, f'{layer}_tomogram.npy')
+            else:
+                (tomo_dir/f'{layer}_tomogram.npy').unlink(missing_ok=True)
+        if self.profile is not None and any((tomo_dir/f'{layer}_tomogram.npy').exists() for layer in self.LAYERS):
+            with open(tomo_dir/'tomogram_profile.json', 'w') as f:
+                json.dump(profile_to_json(self.profile), f, indent=4)
+        else:
+            (tomo_dir/'tomogram_profile.json').unlink(missing_ok=True)
 
     def copy(self) -> 'Tomograms':
         new_tomograms = Tomograms()
-        new_tomograms.raw = self.raw.copy() if self.raw is not None else None
-        new_tomograms.multilooked = self.multilooked.copy() if self.multilooked is not None else None
-        new_tomograms.filtered = self.filtered.copy() if self.filtered is not None else None
+        for layer in self.LAYERS:
+            # Layers yet to be read are deferred to the same reader
+            if self.deferred(layer):
+                new_tomograms.defer(layer, self._readers[layer])
+            else:
+                array = self.get(layer)
+                setattr(new_tomograms, layer, array.copy() if array is not None else None)
         new_tomograms.profile = self.profile.copy() if self.profile is not None else None
+        new_tomograms.height = copy.copy(self.height)
+        new_tomograms.scratch = self.scratch
         return new_tomograms
 
+    def __deepcopy__(self, memo) -> 'Tomograms':
+        return self.copy()
+
     def get(self, key):
         return getattr(self, key, None)
 
 @dataclass
 class Multilook:
     parent: "TomoInfo" = field(repr=False,compare=False)
-    factor: int = 1
+    factor: int | tuple[int, int] = 1                       # Look size, one factor or (azimuth, range)
+    step: int | tuple[int, int] | None = None               # Look spacing (default: factor, i.e. non-overlapping)
 
     @property
     def tomogram(self) -> np.ndarray:
@@ -708,39 +1364,64 @@ class Multilook:
         if self.parent.tomograms.multilooked is None:
             self.apply()
         return self.parent.tomograms.multilooked
+
+    @property
+    def looks(self) -> tuple[int, int]:
+        """Look size in (azimuth, range) pixels."""
+        return as_looks(self.factor)
+
+    @property
+    def steps(self) -> tuple[int, int]:
+        """Look spacing in (azimuth, range) pixels."""
+        return as_looks(self.step) if self.step is not None else self.looks
     
     @property
-    def res(self) -> float:
+    def res(self) -> float | tuple[float, float]:
         if self.parent.res is None:
             raise ValueError("No parent resolution available.")
-        return self.parent.res * self.factor
+        fy, fx = self.looks
+        if fy == fx:
+            return self.parent.res * fy
+        return self.parent.res * fy, self.parent.res * fx
     
     @property
     def profile(self) -> Profile:
         if self.parent.tomograms.profile is None:
             raise ValueError("No parent profile available.")
+        (fy, fx), (sy, sx) = self.looks, self.steps
         profile = self.parent.tomograms.profile.copy()
+        # Pixel i covers rows [i*sy, i*sy + fy) (and likewise for columns), so overlapping looks shift the centres
         profile.update({
-            'width': (self.parent.tomograms.profile['width'] + self.factor - 1) // self.factor,
-            'height': (self.parent.tomograms.profile['height'] + self.factor - 1) // self.factor,
-            'transform': self.parent.tomograms.profile['transform'] * Affine.scale(self.factor, self.factor)
+            'width': (self.parent.tomograms.profile['width'] + sx - 1) // sx,
+            'height': (self.parent.tomograms.profile['height'] + sy - 1) // sy,
+            'transform': self.parent.tomograms.profile['transform'] * Affine.translation((fx - sx) / 2, (fy - sy) / 2)
+                         * Affine.scale(sx, sy)
         })
         return profile
     
-    def apply(self, factor: int = None, npar: int = os.cpu_count(), RR: bool = True):
+    def apply(self, factor: int | tuple[int, int] = None, npar: int = os.cpu_count(), RR: bool = True,
+              step: int | tuple[int, int] | None = None):
         if not factor:
             factor = self.factor
-        elif int(factor) > 1:
-            self.factor = int(factor)
+        elif max(as_looks(factor)) > 1:
+            looks = as_looks(factor)
+            self.factor = looks[0] if looks[0] == looks[1] else looks
         else:
             raise ValueError("Multilook factor must be a positive integer.")
+        if step is not None:
+            steps = as_looks(step)
+            self.step = steps[0] if steps[0] == steps[1] else steps
         
-        self.parent.tomograms.multilooked = multilook(np.abs(self.parent.tomograms.raw)**2, ds=self.factor,
-                                                      npar=npar)
+        tomograms = self.parent.tomograms
+        if is_out_of_core(tomograms.raw):
+            tomograms.multilooked = chunked_multilook(tomograms.intensity, ds=self.looks, npar=npar, step=self.steps,
+                                                      scratch=tomograms.scratch)
+        else:
+            tomograms.multilooked = multilook(tomograms.intensity, ds=self.looks, npar=npar, step=self.steps)
         self.parent.stats.collect('multilooked', RR=RR)
     
     def copy(self) -> 'Multilook':
-        new_multilook = Multilook(parent=self.parent, factor=self.factor)
+        new_multilook = Multilook(parent=self.parent, factor=self.factor, step=self.step)
         return new_multilook
 
 @dataclass
@@ -750,6 +1431,10 @@ class Filter:
     size: int = 9
     point_percentile: float = 98.0
     point_threshold: int = 15
+    _cache: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _cache_source: weakref.ref | None = field(default=None, init=False, repr=False, compare=False)
+
+    PARAMETERS: ClassVar[list[str]] = ['sigma_xi', 'size', 'point_percentile', 'point_threshold']
 
     @property
     def tomogram(self) -> np.ndarray:
@@ -768,7 +1453,11 @@ class Filter:
         return self.parent.tomograms.profile
     
     def apply(self, sigma_xi: float = None, size: int = None, point_percentile: float = None, 
-              point_threshold: int = None, npar: int = os.cpu_count(), RR: bool = False):
+              point_threshold: int = None, npar: int = os.cpu_count(), RR: bool = False,
+              pool: FilterPool | None = None):
+        """
+        Filters the raw tomogram intensity. Pass a FilterPool to reuse its workers (e.g. across the bands of a scene).
+        """
         if not sigma_xi:
             sigma_xi = self.sigma_xi
         else:
@@ -785,12 +1474,94 @@ class Filter:
             point_threshold = self.point_threshold
         else:
             self.point_threshold = int(point_threshold)
-        self.parent.tomograms.filtered = filter(np.abs(self.parent.tomograms.raw)**2, sigma_xi=sigma_xi, 
-                                                size=size, point_percentile=point_percentile, point_threshold=point_threshold,
-                                                npar=npar)
+        self.parent.tomograms.filtered = self._filter(sigma_xi, size, point_percentile, point_threshold,
+                                                      npar=npar, pool=pool)
         
         self.parent.stats.collect('filtered', RR=RR)
 
+    def sweep(self, param_grid: dict[str, list] | list[dict], npar: int = os.cpu_count(), statistics: bool = False,
+              pool: FilterPool | None = None) -> list[tuple[dict, np.ndarray | pd.DataFrame]]:
+        """
+        Filters the raw tomogram for every setting in param_grid, either a dict of parameter value lists (whose
+        product is swept) or a list of settings, e.g. {'sigma_xi': [0.7, 0.8, 0.9], 'size': [7, 9]}. Parameters not
+        in a setting keep their current values, and neither the filter nor its tomogram are changed.
+        All settings run in one batch on a single FilterPool, grouped by point target parameters so that point
+        target detection and local statistics are computed once per group (and cached), and each further setting
+        only reruns the windowed pass. Returns (setting, filtered tomogram) pairs in grid order, or
+        (setting, statistics) pairs if statistics is set.
+        """
+        if isinstance(param_grid, dict):
+            param_grid = [dict(zip(param_grid, values)) for values in itertools.product(*param_grid.values())]
+        unknown = {key for setting in param_grid for key in setting} - set(self.PARAMETERS)
+        if unknown:
+            raise ValueError(f"Unknown filter parameters: {', '.join(sorted(unknown))}. "
+                             f"The parameters are {', '.join(self.PARAMETERS)}.")
+        settings = [{key: setting.get(key, getattr(self, key)) for key in self.PARAMETERS} for setting in param_grid]
+        order = sorted(range(len(settings)),
+                       key=lambda i: (settings[i]['point_percentile'], settings[i]['point_threshold']))
+
+        results = [None] * len(settings)
+        own_pool = pool is None
+        if own_pool:
+            pool = FilterPool(npar=npar, scratch=self.parent.tomograms.scratch)
+        try:
+            for i in order:
+                filtered = self._filter(**settings[i], npar=npar, pool=pool)
+                if statistics:
+                    filtered = collect_statistics(filtered, height=self.parent.tomograms.height)
+                results[i] = (settings[i], filtered)
+        finally:
+            if own_pool:
+                pool.close()
+        return results
+
+    def estimates(self, point_percentile: float = None, point_threshold: int = None,
+                  nlooks: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the point target mask and mean estimate of the raw tomogram intensity. The percentile threshold,
+        point target mask and MMSE local statistics are cached, keyed by the intensity and their parameters.
+        """
+        I = self.parent.tomograms.intensity
+        threshold = self._threshold(I, point_percentile or self.point_percentile)
+        point_threshold = point_threshold or self.point_threshold
+        point_mask = self._cached(I, ('point_mask', threshold, point_threshold),
+                                  lambda: point_targets(I, threshold, point_threshold))
+        mmse = self._cached(I, ('mmse', nlooks), lambda: mmse_estimate(I, nlooks))
+        mean_estimate = self._cached(I, ('mean_estimate', threshold, point_threshold, nlooks),
+                                     lambda: np.where(point_mask, I, mmse))
+        return point_mask, mean_estimate
+
+    def clear_cache(self) -> None:
+        """Drops the cached point target detection and local statistics."""
+        self._cache = {}
+        self._cache_source = None
+
+    def _filter(self, sigma_xi: float, size: int, point_percentile: float, point_threshold: int,
+                npar: int = os.cpu_count(), pool: FilterPool | None = None) -> np.ndarray:
+        tomograms = self.parent.tomograms
+        I = tomograms.intensity
+        if is_out_of_core(tomograms.raw):
+            # Tiles have their own local statistics, only the global threshold is cached
+            return chunked_filter(I, sigma_xi=sigma_xi, size=size, point_percentile=point_percentile,
+                                  point_threshold=point_threshold, npar=npar, scratch=tomograms.scratch, pool=pool,
+                                  threshold=self._threshold(I, point_percentile))
+        point_mask, mean_estimate = self.estimates(point_percentile, point_threshold)
+        return filter(I, sigma_xi=sigma_xi, size=size, npar=npar, pool=pool, point_mask=point_mask,
+                      mean_estimate=mean_estimate)
+
+    def _threshold(self, I: np.ndarray, point_percentile: float) -> float:
+        method = get_quantile_method()
+        return self._cached(I, ('threshold', point_percentile, method), lambda: quantile(I, point_percentile, method).value)
+
+    def _cached(self, I: np.ndarray, key: tuple, compute):
+        # The intensity is referenced weakly, so that the cache does not keep a dropped intensity alive
+        if self._cache_source is None or self._cache_source() is not I:
+            self.clear_cache()
+            self._cache_source = weakref.ref(I)
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
     def copy(self) -> 'Filter':
         new_filter = Filter(parent=self.parent, sigma_xi=self.sigma_xi, size=self.size,
                             point_percentile=self.point_percentile, point_threshold=self.point_threshold)
@@ -820,21 +1591,43 @@ class TomoStats:
             if '_' in stat_key:
                 df.to_csv(masked_stats_dir / f'{stat_key}_statistics.csv', index=False)
 
-    def collect(self, layers: str | list[str] = ['raw', 'multilooked', 'filtered','masked'], RR: bool = False):
+    def collect(self, layers: str | list[str] = ['raw', 'multilooked', 'filtered','masked'], RR: bool = False,
+                npar: int = os.cpu_count()):
+        """
+        Collects the statistics of the given layers, computing up to npar layers concurrently in threads that
+        share the memory budget. Masked statistics are collected for all masks in one sweep per layer and
+        label image of non-overlapping masks (see Masks.labels).
+        """
         if isinstance(layers, str):
             layers = [layers]
         if any(layer not in ['raw', 'multilooked', 'filtered','masked'] for layer in layers):
             raise ValueError("The different layers are 'raw', 'multilooked', 'filtered' and 'masked'.")
+        tomograms = self.parent.tomograms
+
+        def layer_statistics(layer):
+            return {layer: collect_statistics(tomograms.get(layer), height=tomograms.height, budget=budget)}
+
+        def masked_statistics(layer, labels, masks):
+            statistics = collect_label_statistics(tomograms.get(layer), labels, height=tomograms.height, budget=budget)
+            return {masks[label - 1].name + '_' + layer: df for label, df in statistics.items()}
+
+        jobs = []
         for layer in layers:
             if layer != 'masked':
-                self[layer] = collect_statistics(self.parent.tomograms.get(layer), height=self.parent.tomograms.height)
+                jobs.append(partial(layer_statistics, layer))
 
             else:
-                for mask in self.parent.masks:
-                    for l in  ['raw', 'multilooked', 'filtered']:
-                        layer_name = mask.name + '_' + l
-                        self[layer_name] = collect_statistics(mask.apply(self.parent.tomograms.get(l), multilooked=(l=='multilooked')), 
-                                                              height=self.parent.tomograms.height,circ=False)
+                # All masks of a layer at once, from label images of non-overlapping masks
+                for l in  ['raw', 'multilooked', 'filtered']:
+                    for labels, masks in self.parent.masks.labels(multilooked=(l=='multilooked')):
+                        jobs.append(partial(masked_statistics, l, labels, masks))
+
+        workers = max(min(npar, len(jobs)), 1)
+        budget = get_memory_budget() // workers
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for statistics in executor.map(lambda job: job(), jobs):
+                for key, df in statistics.items():
+                    self[key] = df
                 
         if RR:
             RR_estimate, cFactor = estimaterr(self.parent.multilook.tomogram,)
@@ -860,7 +1653,7 @@ class TomoStats:
         if cached:
             masked_stats_dir = path / 'masked_statistics'
             if masked_stats_dir.is_dir():
-                for mask in parent.masks:
+                for mask in itertools.chain.from_iterable(parent.masks.values()):
                     mask_name = mask.name if hasattr(mask, 'name') else None
                     if mask_name:
                         for key in ['raw', 'multilooked', 'filtered']:
@@ -1015,12 +1808,19 @@ class TomoInfo:
         self.masks.update()
 
     @classmethod
-    def forge(cls, slices: SliceInfo, multilook: int = 1, sigma_xi: float = 0.9, 
+    def forge(cls, slices: SliceInfo, multilook: int | tuple[int, int] = 1, sigma_xi: float = 0.9, 
               filter_size: int = 9, point_percentile: float = 98.0, point_threshold: int = 9,
               fused: bool = True, sub: bool = True, sup: bool = True, canopy: bool = True, 
-              npar: int = os.cpu_count(), RR: bool = True, masks: str = "") -> 'TomoInfo':
+              npar: int = os.cpu_count(), RR: bool = True, masks: str = "", db0: float = 1,
+              window: Window | tuple | None = None, bounds: tuple[float, float, float, float] | None = None,
+              out_shape: tuple[int, int] | None = None, scratch: str | Path | None = None,
+              multilook_step: int | tuple[int, int] | None = None, pool: FilterPool | None = None) -> 'TomoInfo':
         """
         Initializes a TomoInfo instance from a SliceInfo with slices from the same tomogram.
+        The multilook factor and step are one integer or (azimuth, range) pixels (see Multilook), and the
+        filter runs on pool if given (see FilterPool).
+        Unread slices are read (scaled by db0, over the optional region) directly into the preallocated
+        raw tomogram in height order, which is memory-mapped in the scratch folder if given.
         """
         if not slices:
             return TomoInfo()
@@ -1069,8 +1869,9 @@ class TomoInfo:
                 refr = 1
             else:
                 refr = base.refr
-            # Construct tomogram    
-            tomogram = np.stack([s.image for s in group], axis=0)
+            # Construct tomogram
+            tomogram = group.assemble(db0=db0, npar=npar, window=window, bounds=bounds, out_shape=out_shape,
+                                      scratch=scratch)
             info = TomoInfo()
             info.band = base.band
             info.width = base.width
@@ -1093,9 +1894,11 @@ class TomoInfo:
             info.category = cat
             info._slices = group.copy()
             info.tomograms.raw = tomogram
+            info.tomograms.scratch = Path(scratch) if scratch is not None else None
             info.tomograms.profile = base.profile.copy()
             info.tomograms.height = slices.get('height')
             info.multilook.factor = multilook
+            info.multilook.step = multilook_step
             info.filter.sigma_xi = sigma_xi
             info.filter.size = filter_size
             info.filter.point_percentile = point_percentile
@@ -1129,7 +1932,9 @@ class TomoInfo:
         tomo.multilook.apply(npar=npar,RR=RR)
         print("Multilooking done.")
         # Filter
-        tomo.filter.apply(npar=npar,RR=RR)
+        tomo.filter.apply(npar=npar,RR=RR,pool=pool)
+        tomo.filter.clear_cache() # Only kept for interactive refiltering and sweeps
+        tomo.tomograms.intensity = None # Likewise, only kept for interactive re-multilooking and refiltering
         print("Filtering done.")
         # Update masks
         tomo.masks.update(masks)
@@ -1138,7 +1943,7 @@ class TomoInfo:
         return tomo
 
     @classmethod
-    def load(cls, path: str|Path, cached: bool = False) -> 'TomoInfo':
+    def load(cls, path: str|Path, cached: bool = False, lazy: bool = False) -> 'TomoInfo':
         """
         Create a TomoInfo instance from a band  sub-directory of a .tomo directory.
         Path validation is delegated by TomoScene.load() and this method should only be called from there.
@@ -1159,12 +1964,11 @@ class TomoInfo:
             raise RuntimeError(f"The recorded band {data.get('band')} does not match band directory {band}.")
         
         # Construct the Tomograms instance
-        tomograms = Tomograms.load(path)
+        tomograms = Tomograms.load(path, lazy=lazy)
         tomograms.height = np.array(data.get('height'))
 
         # Create a TomoInfo instance from the loaded data
         tomo_info = cls(
-            date=data.get('date'),
             band=band,
             width=data.get('width'),
             res=data.get('res'),
@@ -1190,21 +1994,25 @@ class TomoInfo:
         slice_directory = path / '.slices'
         tomo_info._slices = SliceInfo.scan(slice_directory)
         
+        # Set multilook (factors and steps are saved as lists if anisotropic)
+        factor, step = data.get('multilook', 1), data.get('multilook_step')
+        tomo_info.multilook.factor = tuple(factor) if isinstance(factor, list) else factor
+        tomo_info.multilook.step = tuple(step) if isinstance(step, list) else step
+
         # Set masks
         if cached:
-            # Construct full path to the cached_masks subdirectory
-            masks_dir = path / 'cached_masks'
-            if not masks_dir.is_dir():
-                raise NotADirectoryError(f"Cached masks directory {masks_dir} is not a directory.")
-            # Load the cached directory
-            tomo_info.masks.read(masks_dir)
+            # Mask container, or the cached_masks folder of former versions
+            masks_path = path / 'masks.npz'
+            if not masks_path.is_file():
+                masks_path = path / 'cached_masks'
+                if not masks_path.is_dir():
+                    raise FileNotFoundError(f"No cached masks in {path}.")
+            # Load the cached masks (memory-mapped)
+            tomo_info.masks.read(masks_path)
         else:
-            # Load masks from the TOMOMASKS folder
-            tomo_info.masks.update()
+            # Load masks from the TOMOMASKS folder (on the multilook profile, and without reading the tomograms)
+            tomo_info.masks.update(collect=False)
         
-        # Set multilook
-        tomo_info.multilook = data.get('multilook', 1)
-
         # Set filter parameters
         tomo_info.filter.sigma_xi = data.get('sigma_xi', 0.9)
         tomo_info.filter.size = data.get('filter_size', 9)
@@ -1228,6 +2036,7 @@ class TomoInfo:
             'thresh': self.thresh, 'squint': self.squint, 'text': self.text,
             'category': self.category, 'height': self.tomograms.height.tolist(),
             'multilook': self.multilook.factor if self.multilook else 1,
+            'multilook_step': self.multilook.step if self.multilook else None,
             'sigma_xi': self.filter.sigma_xi, 'filter_size': self.filter.size, 
             'point_percentile': self.filter.point_percentile, 'point_threshold': self.filter.point_threshold
         }
@@ -1242,7 +2051,10 @@ class TomoInfo:
 
         # Save cached masks
         if self.masks and hasattr(self.masks, 'masks'):
-            cache_masks(self.masks.masks,folder=band_dir/'cached_masks')
+            cache_masks(self.masks.masks, path=band_dir/'masks.npz')
+            # Replaces the per-mask files of former versions
+            if (band_dir/'cached_masks').is_dir():
+                shutil.rmtree(band_dir/'cached_masks')
 
         # Save slices
         slice_folder = band_dir/'.slices'
@@ -1286,7 +2098,7 @@ class TomoInfo:
             fused[key] = pd.concat(frame, sup.stats[key][1:], ignore_index=True)
 
         if sub.tomograms.multilooked and sup.tomograms.multilooked:
-            if sub.multilook.factor == sup.multilook.factor:
+            if sub.multilook.looks == sup.multilook.looks and sub.multilook.steps == sup.multilook.steps:
                 fused.tomograms.multilooked = np.concatenate([sub.tomograms.multilooked,sup.tomograms.multilooked], axis=-1)
             else:
                 warn("Different multilook factors, selecting subsurface factor and applying.")
@@ -1400,9 +2212,10 @@ class TomoScene:
         return new_scene
     
     @classmethod
-    def load(cls, path: str|Path = '.', cached: bool = False, npar: int = os.cpu_count()) -> 'TomoScene':
+    def load(cls, path: str|Path = '.', cached: bool = False, npar: int = os.cpu_count(),
+             lazy: bool = False) -> 'TomoScene':
         """
-        Create a TomoScene instance from a .tomo directory.
+        Create a TomoScene instance from a .tomo directory. If lazy, tomograms are read on first access.
         """
         path = Path(path)
         # Check if the path exists
@@ -1440,7 +2253,7 @@ class TomoScene:
                         if band.is_dir() and band.name in ['phh','cvv','lhh','lhv','lvh','lvv',
                                                             'phh1','phh0','cvv1','cvv0']]
         with ThreadPoolExecutor(max_workers = npar) as executor:
-            future_tomos = {executor.submit(TomoInfo.load, path=band, cached=cached): band for band in bands}
+            future_tomos = {executor.submit(TomoInfo.load, path=band, cached=cached, lazy=lazy): band for band in bands}
             for future in as_completed(future_tomos):
                 band = future_tomos[future]
                 try:
@@ -1449,6 +2262,8 @@ class TomoScene:
                     tomo._scene = tomo_scene
                 except Exception as e:
                     warn(f"Failed to load {band}: {e}")
+
+        return tomo_scene
     
     def save(self, folder: str|Path = "."):
         folder = Path(folder)
@@ -1521,15 +2336,18 @@ class TomoScenes:
             scene.update()
     
     @classmethod
-    def load(self, path: str|Path = ".", cached: bool = False, npar: int = os.cpu_count) -> 'TomoScenes':
+    def load(self, path: str|Path = ".", cached: bool = False, npar: int = os.cpu_count(),
+             lazy: bool = False) -> 'TomoScenes':
         path = Path(path)
         tomo_scenes = TomoScenes()
         if path.is_dir():
             tomo_dirs = [d for d in path.iterdir() if d.is_dir() and d.suffix == '.tomo']
+            if not tomo_dirs:
+                return tomo_scenes
 
             with ThreadPoolExecutor(max_workers=npar) as executor:
-                interior_npar = npar // len(tomo_dirs)
-                future_to_path = {executor.submit(TomoScene.load, tomo_path, cached=cached, npar=interior_npar): tomo_path for tomo_path in tomo_dirs}
+                interior_npar = max(npar // len(tomo_dirs), 1)
+                future_to_path = {executor.submit(TomoScene.load, tomo_path, cached=cached, npar=interior_npar, lazy=lazy): tomo_path for tomo_path in tomo_dirs}
                 for future in as_completed(future_to_path):
                     tomo_path = future_to_path[future]
                     try:
@@ -1693,9 +2511,9 @@ def regroup(grouped_dict: Dict[str,SliceInfo], keys: str | list[str], list: bool
 
     # Group
     for outer_key, sliceinfo in grouped_dict.items():
-        for s in sliceinfo:
-            key = tuple(s.get(k) for k in keys)
-            regrouped[key][outer_key].append(s)
+        for key, group in sliceinfo.group(keys).items():
+            key = (key,) if len(keys) == 1 else key
+            regrouped[key][outer_key] = group
 
     # Convert to list if list is set to True
     if list:
@@ -1704,6 +2522,57 @@ def regroup(grouped_dict: Dict[str,SliceInfo], keys: str | list[str], list: bool
         result = regrouped
     return result
 
+## Columnar helpers for SliceTable
+def _values(column: pd.Series) -> list:
+    """Converts a table column to a list of the Python values ImageInfo holds (None for missing values)."""
+    if pd.api.types.is_datetime64_any_dtype(column):
+        values = column.dt.to_pydatetime().tolist()
+    else:
+        values = column.astype(object).tolist()
+    missing = column.isna().to_numpy()
+    if missing.any():
+        values = [None if m else v for v, m in zip(values, missing)]
+    return values
+
+def _metadata_table(slices: list[ImageInfo]) -> pd.DataFrame:
+    """Collects the metadata parameters of ImageInfo objects into a table."""
+    records = []
+    for s in slices:
+        record = {key: s.get(key) for key in ImageInfo.METADATA_PARAMETERS}
+        record['folder'] = str(record['folder']) if record['folder'] is not None else None
+        records.append(record)
+    return pd.DataFrame(records, columns=ImageInfo.METADATA_PARAMETERS)
+
+def _filter_mask(table: pd.DataFrame, filter: ImageInfo) -> np.ndarray:
+    """
+    Vectorized ImageInfo.__eq__ against a filter: falsy values (in the filter or in the table) are not compared,
+    dates are compared by date and/or time, and a list of bands matches any of the bands.
+    """
+    mask = np.ones(len(table), dtype=bool)
+    for key in ImageInfo.METADATA_PARAMETERS:
+        value = filter.get(key)
+        if key == 'linuxTime' or not value:
+            continue
+        column = table[key]
+        if key == 'date':
+            dates = pd.to_datetime(column)
+            condition = np.ones(len(table), dtype=bool)
+            if value.year > 2000:
+                condition &= (dates.dt.date == value.date()).to_numpy()
+            if value.time() != time(0, 0, 0, 0):
+                condition &= (dates.dt.time == value.time()).to_numpy()
+            mask &= dates.isna().to_numpy() | condition
+            continue
+        if key == 'band' and not isinstance(value, str):
+            condition = column.isin(list(value))
+        elif key == 'folder':
+            condition = column.astype(str) == str(Path(value))
+        else:
+            condition = column == value
+        falsy = column.isna() | column.isin([0, ''])
+        mask &= (falsy | condition).to_numpy(dtype=bool)
+    return mask
+
 ## Calculate vres from SliceInfo
 def calculate_vres(slices: SliceInfo) -> float | None:
     height = slices.get('height')
@@ -1784,23 +2653,100 @@ def parse_filename(path: str) -> ImageInfo:
 
     return default
 
+## Parsing many filenames at once into a columnar table
+# Flags in the order they are written by ImageInfo.generate_filename
+FILENAME_FLAGS = {'ho': 'hoff', 'ham': 'ham', 'ro': 'roff', 'smo': 'smo', 'ref': 'refr', 'prof': 'depth',
+                  'LA': 'lat', 'LO': 'lon', 'DC': 'DC', 'DL': 'DL', 'HC': 'HC', 'HV': 'HV', 'TH': 'thresh',
+                  'sq': 'squint'}
+FILENAME_PATTERN = re.compile(
+    r"^[^_]*_(?P<date>\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2})-(?P<spiral>\d{2})"
+    r"_(?P<band>[^_]*)"
+    r"_[^-0-9._]*(?P<width>-?(?:\d+\.?\d*|\.\d+))(?![-0-9.])[^_]*"
+    r"_[^-0-9._]*(?P<res>-?(?:\d+\.?\d*|\.\d+))(?![-0-9.])[^_]*"
+    r"_[^0-9_]*(?P<linuxTime>\d+)[^_]*"
+    + "".join(rf"(?:_{flag}(?![a-zA-Z])[^-0-9._]*(?P<{key}>-?(?:\d+\.?\d*|\.\d+))(?![-0-9.])[^_]*)?"
+              for flag, key in FILENAME_FLAGS.items())
+    + r"_[^_]*$"
+)
+# Values of parameters that are not present in the filename
+FILENAME_DEFAULTS = {'hoff': 0.0, 'depth': 0.0, 'ham': 0.0, 'refr': 1.0, 'DC': 0.0, 'DL': 999.0,
+                     'HC': 120.0, 'HV': 999.0, 'thresh': 10.0, 'squint': 0.0}
+
+def parse_filenames(paths: list[str|Path]) -> pd.DataFrame:
+    """
+    Parses many slice filenames at once into a table with one column per ImageInfo metadata parameter.
+
+    All filenames are matched by a single precompiled pattern for the grammar written by
+    ImageInfo.generate_filename, and the columns are converted in bulk. Filenames that do not follow
+    the grammar (e.g. flags in another order or text tags) fall back to parse_filename.
+    Use SliceInfo.from_table or ImageInfo.from_record to create ImageInfo objects when needed.
+    """
+    paths = [os.fspath(p) for p in paths]
+    split = [os.path.split(p) for p in paths]
+    folders = [folder or '.' for folder, _ in split]
+    names = [name for _, name in split]
+    matches = [FILENAME_PATTERN.match(name) for name in names]
+    empty = (None,) * FILENAME_PATTERN.groups
+    table = pd.DataFrame([m.groups() if m else empty for m in matches], columns=list(FILENAME_PATTERN.groupindex),
+                         dtype=object)
+    table.insert(0, 'filename', names)
+    table.insert(1, 'folder', folders)
+
+    # Bulk conversion of matched rows (str -> float conversion is exact, unlike pd.to_numeric)
+    matched = pd.Series([m is not None for m in matches], dtype=bool)
+    # Timestamps repeat across slices of a flight, so only the unique ones are parsed
+    codes, uniques = pd.factorize(table['date'])
+    uniques = pd.to_datetime(uniques, format="%Y-%m-%d-%H-%M-%S", errors='coerce')
+    table['date'] = uniques.take(codes, allow_fill=True, fill_value=pd.NaT)
+    matched &= table['date'].notna() | ~matched
+    for key in ['spiral', 'width', 'res', 'linuxTime', *FILENAME_FLAGS.values()]:
+        table[key] = table[key].fillna('nan').astype(float)
+    table['spiral'] = table['spiral'].astype('Int64')
+    table['linuxTime'] = table['linuxTime'].astype('Int64')
+    table['smo'] = table['smo'].fillna(table['width'] / 10 / table['res'])
+    table = table.fillna(FILENAME_DEFAULTS)
+    table['text'] = None
+
+    # Fall back to per-file parsing for filenames outside the grammar
+    fallback = []
+    for i in np.flatnonzero(~matched.to_numpy()):
+        try:
+            info = parse_filename(paths[i])
+        except Exception as e:
+            print(f"Error parsing file {names[i]}: {e}")
+            continue
+        record = {key: info.get(key) for key in ImageInfo.METADATA_PARAMETERS}
+        record['folder'] = str(record['folder'])
+        fallback.append((i, record))
+
+    table = table.loc[matched, ImageInfo.METADATA_PARAMETERS]
+    if fallback:
+        index, records = zip(*fallback)
+        table = pd.concat([table, pd.DataFrame(list(records), index=list(index))]).sort_index()
+    return table.reset_index(drop=True)
+
 ## Masks helpers
-def get_masks(raster_profile: Profile, multilooked_profile: Profile, 
+MASK_CACHE_VERSION = 1 # Invalidates the mask cache when rasterization or the container format changes
+
+def get_masks(raster_profile: Profile, multilooked_profile: Profile,
               user_mask: str | Path = "") -> dict[str,list[Mask]]:
     """
     Generate binary masks from shapefiles using rasterio and geopandas.
 
     Parameters:
-    - mask_dirs: list of directories containing .shp files
-    - raster_profile: rasterio profile dictionary (contains raster size, dtype, etc.)
-    - raster_transform: rasterio transform object
+    - raster_profile: rasterio profile of the tomograms (contains raster size, transform, etc.)
+    - multilooked_profile: rasterio profile of the multilooked tomograms
+    - user_mask: shapefile, or directory containing .shp files, in addition to the MASKS setting
+
+    Every shapefile is rasterized at once (see rasterize_masks), unless it was rasterized on the same
+    profiles before, in which case its masks are loaded from the mask cache.
 
     Returns:
-    - List of dictionaries with keys 'mask' (binary np.ndarray) and 'name' (shapename)
+    - Dictionary of lists of masks by shapename
     """
-    mask_paths = Settings().MASKS
+    mask_paths = [Path(path) for path in Settings().MASKS]
     if user_mask:
-        mask_paths.append(user_mask)
+        mask_paths.append(Path(user_mask))
     masks = defaultdict(list)
 
     for path in mask_paths:
@@ -1813,110 +2759,225 @@ def get_masks(raster_profile: Profile, multilooked_profile: Profile,
             continue
 
         for shp_path in shapefiles:
-            # Read shapefile using geopandas
-            gdf = gpd.read_file(shp_path)
-            shapename = shp_path.stem
-
-            # Loop through each shape in the shapefile
-            for idx, row in gdf.iterrows():
-                geometry = row.geometry
-
-                # Create a binary mask using rasterio.features.rasterize
-                mask = rasterize(
-                    [(geometry, 1)],
-                    out_shape=(raster_profile['height'], raster_profile['width']),
-                    transform=raster_profile['transform'],
-                    fill=0,
-                    dtype='uint8'
-                ).astype(bool)
-
-                if not np.any(mask):
-                    continue        # This shape does not intersect raster
-
-                # Create multilooked binary mask
-                multilooked = rasterize(
-                    [(geometry, 1)],
-                    out_shape=(multilooked_profile['height'], multilooked_profile['width']),
-                    transform=multilooked_profile['transform'],
-                    fill=0,
-                    dtype='uint8'
-                ).astype(bool)
-
-                # Generate a shapename
-                shape_id = row.get('id', idx)
-
-                # Generate metadata
-                metadata = {
-                    'source': shp_path,
-                    'shape_id': shape_id,
-                    'timestamp': datetime.now().isoformat(timespec='seconds'),
-                    'bounding_box': geometry.bounds,
-                    'generated_on': socket.gethostname(),
-                    'profile': str(raster_profile),
-                    'multilooked': str(multilooked_profile)
-                }
-
-                # Append the mask and name to the list
-                masks[shapename].append(Mask(name=shapename, id=shape_id, mask=mask, 
-                                             multilooked=multilooked, metadata=metadata))
+            cache = MASK_CACHE_PATH / f"{mask_cache_key(shp_path, raster_profile, multilooked_profile)}.npz"
+            if cache.exists():
+                shape_masks = load_mask_container(cache)
+            else:
+                shape_masks = rasterize_masks(shp_path, raster_profile, multilooked_profile)
+                save_mask_container(cache, shape_masks)
+            masks[shp_path.stem].extend(shape_masks)
 
     return masks
 
-def cache_masks(masks: dict[str,list[Mask]], folder: str|Path = 'cached_masks'):
+def rasterize_masks(shp_path: str | Path, raster_profile: Profile, multilooked_profile: Profile) -> list[Mask]:
     """
-    Save each mask's numpy array and metadata to a folder.
-    Each mask is saved as <name>.npy and <name>.json using the Mask.name attribute.
-    If the folder exists, it is deleted and recreated.
+    Rasterizes all shapes of a shapefile into label images, one rasterize call per group of non-overlapping
+    shapes, and returns a Mask per shape that intersects the raster. Multilooked masks are subsampled from
+    the same label images when the multilooked pixel centres fall on pixel centres (odd looks), and
+    rasterized on the multilooked profile otherwise.
     """
-    folder = Path(folder)
-    # Remove existing folder contents
-    if folder.exists():
-        for file_path in folder.iterdir():
-            if file_path.is_file():
-                os.remove(file_path)
-            elif file_path.is_dir():
-                shutil.rmtree(file_path)
+    shp_path = Path(shp_path)
+    gdf = gpd.read_file(shp_path)
+    shapename = shp_path.stem
+    if gdf.empty:
+        return []
+    geometries = gdf.geometry
+    groups = _disjoint_groups(geometries)
+
+    shape = (raster_profile['height'], raster_profile['width'])
+    multilooked_shape = (multilooked_profile['height'], multilooked_profile['width'])
+    nesting = _nesting(raster_profile, multilooked_profile)
+    if nesting is not None:
+        # Extend the labels past the raster edge to the centres of overhanging looks
+        (y0, sy, py), (x0, sx, px) = nesting
+        extended = _label_images(geometries, groups, (shape[0] + py, shape[1] + px), raster_profile['transform'])
+        labels = [image[:shape[0], :shape[1]] for image in extended]
+        multilooked_labels = [image[y0::sy, x0::sx][:multilooked_shape[0], :multilooked_shape[1]] for image in extended]
     else:
-        folder.mkdir(exist_ok=True)
+        labels = _label_images(geometries, groups, shape, raster_profile['transform'])
+        multilooked_labels = _label_images(geometries, groups, multilooked_shape, multilooked_profile['transform'])
+
+    # Bounding boxes of every label
+    objects = [find_objects(image, max_label=len(gdf)) for image in labels]
+    multilooked_objects = [find_objects(image, max_label=len(gdf)) for image in multilooked_labels]
+
+    masks = []
+    shape_ids = gdf['id'] if 'id' in gdf.columns else gdf.index
+    for i, (geometry, shape_id) in enumerate(zip(geometries, shape_ids)):
+        group = groups[i]
+        window = objects[group][i]
+        if window is None:
+            continue        # This shape does not intersect raster
+        mask = BitMask.from_crop(shape, window, labels[group][window] == i + 1)
+
+        window = multilooked_objects[group][i]
+        if window is not None:
+            multilooked = BitMask.from_crop(multilooked_shape, window, multilooked_labels[group][window] == i + 1)
+        else:
+            multilooked = BitMask.from_array(np.zeros(multilooked_shape, dtype=bool))
+
+        # Generate metadata
+        shape_id = shape_id.item() if isinstance(shape_id, np.generic) else shape_id
+        metadata = {
+            'source': str(shp_path),
+            'shape_id': shape_id,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'bounding_box': geometry.bounds,
+            'generated_on': socket.gethostname(),
+            'profile': str(raster_profile),
+            'multilooked': str(multilooked_profile)
+        }
 
-    # Save each mask and metadata
-    for shapename, mask_list in masks:
-        mask_folder = folder / f"{shapename}"
-        mask_folder.mkdir(exist_ok=True)
-        for mask_obj in mask_list:
-            mask_path = mask_folder / f"shape_id_{mask_obj.id}.npy"
-            np.save(mask_path, mask_obj.mask)
+        # Append the mask and name to the list
+        masks.append(Mask(name=shapename, id=shape_id, mask=mask, multilooked=multilooked, metadata=metadata))
 
-            multilooked_path = mask_folder / f"multilooked_id_{mask_obj.id}.npy"
-            np.save(multilooked_path,mask_obj.multilooked)
+    return masks
 
-            metadata_path = mask_folder / f"metadata_id_{mask_obj.id}.json"
-            with open(metadata_path, 'w') as f:
-                json.dump(mask_obj.metadata, f, indent=4)
+def _disjoint_groups(geometries: gpd.GeoSeries) -> np.ndarray:
+    """Assigns every geometry to the first group in which it intersects no other geometry."""
+    query, tree = geometries.sindex.query(geometries, predicate='intersects')
+    neighbours = defaultdict(list)
+    for i, j in zip(query.tolist(), tree.tolist()):
+        if j < i:
+            neighbours[i].append(j)
+    groups = np.zeros(len(geometries), dtype=np.intp)
+    for i in range(len(geometries)):
+        taken = {groups[j] for j in neighbours[i]}
+        groups[i] = next(g for g in itertools.count() if g not in taken)
+    return groups
+
+def _label_images(geometries: gpd.GeoSeries, groups: np.ndarray, shape: tuple[int, int],
+                  transform: Affine) -> list[np.ndarray]:
+    """Rasterizes each group of geometries into one label image, in which geometry i is i + 1."""
+    return [rasterize([(geometries.iloc[i], i + 1) for i in np.flatnonzero(groups == group)],
+                      out_shape=shape, transform=transform, fill=0, dtype='int32')
+            for group in range(groups.max() + 1)]
+
+def _nesting(raster_profile: Profile, multilooked_profile: Profile) -> tuple[tuple[int, int, int], ...] | None:
+    """
+    The (start, step, overhang) along rows and columns such that the centre of multilooked pixel i is the
+    centre of pixel start + step * i, overhang being how far the last centre lies beyond the raster edge.
+    None unless every multilooked pixel centre falls on a pixel centre (e.g. for odd looks).
+    """
+    relative = ~raster_profile['transform'] * multilooked_profile['transform']
+    if not (np.isclose(relative.b, 0) and np.isclose(relative.d, 0)):
+        return None
+    nesting = []
+    for scale, offset, n, N in [(relative.e, relative.f, multilooked_profile['height'], raster_profile['height']),
+                                (relative.a, relative.c, multilooked_profile['width'], raster_profile['width'])]:
+        first = offset + scale / 2 - 0.5
+        step, start = round(scale), round(first)
+        if not (np.isclose(scale, step) and np.isclose(first, start)) or step < 1 or start < 0:
+            return None
+        nesting.append((start, step, max(start + step * (n - 1) - (N - 1), 0)))
+    return tuple(nesting)
+
+def mask_cache_key(shp_path: str | Path, raster_profile: Profile, multilooked_profile: Profile) -> str:
+    """Hash of the contents of a shapefile (and its sidecar files) and of the raster grids it is rasterized on."""
+    shp_path = Path(shp_path)
+    hasher = hashlib.sha256(f"masks v{MASK_CACHE_VERSION}".encode())
+    for suffix in ['.shp', '.shx', '.dbf', '.prj', '.cpg']:
+        sidecar = shp_path.with_suffix(suffix)
+        if sidecar.exists():
+            hasher.update(suffix.encode())
+            hasher.update(sidecar.read_bytes())
+    for profile in [raster_profile, multilooked_profile]:
+        grid = [profile['height'], profile['width'], list(profile['transform'])[:6], str(profile.get('crs'))]
+        hasher.update(json.dumps(grid).encode())
+    return hasher.hexdigest()
+
+def save_mask_container(path: str | Path, masks: list[Mask]) -> None:
+    """
+    Saves masks in one uncompressed .npz container: the bit-packed pixels of all masks in one blob, and an
+    index (JSON) of their names, ids, metadata and the shape, bounding box and blob extent of their bit masks.
+    The container is written next to path and then moved over it, so that masks memory-mapped from a previous
+    container at path stay valid.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    blobs, index, offset = [], [], 0
+    for mask in masks:
+        entry = {'name': mask.name, 'id': mask.id, 'metadata': mask.metadata}
+        for key in ['mask', 'multilooked']:
+            bits = getattr(mask, key)
+            if bits is None:
+                continue
+            entry[key] = {'shape': list(bits.shape), 'bbox': list(bits.bbox), 'offset': offset, 'size': bits.bits.size}
+            blobs.append(bits.bits)
+            offset += bits.bits.size
+        index.append(entry)
+    blob = np.concatenate(blobs) if blobs else np.zeros(0, dtype=np.uint8)
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.stem, suffix=".npz", delete=False) as file:
+        try:
+            np.savez(file, blob=blob, index=np.array(json.dumps(index, default=str)))
+        except BaseException:
+            os.remove(file.name)
+            raise
+    os.replace(file.name, path)
+
+def load_mask_container(path: str | Path, mmap: bool = True) -> list[Mask]:
+    """
+    Loads the masks of a container saved by save_mask_container. Only the index is read: with mmap, the bit
+    masks are views of the memory-mapped blob, and their pixels are read from disk when a mask is used.
+    """
+    with np.load(path) as container:
+        index = json.loads(str(container['index']))
+        blob = _memmap_member(path, 'blob') if mmap else container['blob']
+    masks = []
+    for entry in index:
+        bits = {key: BitMask(shape=tuple(entry[key]['shape']), bbox=tuple(entry[key]['bbox']),
+                             bits=blob[entry[key]['offset']:entry[key]['offset'] + entry[key]['size']])
+                for key in ['mask', 'multilooked'] if key in entry}
+        masks.append(Mask(name=entry['name'], id=entry['id'], metadata=entry['metadata'], **bits))
+    return masks
 
-def restore_cache(folder: str|Path = 'cached_masks') -> defaultdict[str,list[Mask]]:
+def _memmap_member(path: str | Path, name: str) -> np.ndarray:
+    """Memory-maps an array stored (uncompressed) in an .npz file, from its offset within the archive."""
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(f"{name}.npy")
+        if info.compress_type != zipfile.ZIP_STORED:
+            raise ValueError(f"Array {name} of {path} is compressed and cannot be memory-mapped.")
+    with open(path, 'rb') as file:
+        # Local file header: fixed 30 bytes, then the file name and extra field
+        file.seek(info.header_offset + 26)
+        name_length, extra_length = struct.unpack('<HH', file.read(4))
+        file.seek(info.header_offset + 30 + name_length + extra_length)
+        version = np.lib.format.read_magic(file)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, fortran_order, dtype = read_header(file)
+        offset = file.tell()
+    if not np.prod(shape):
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape, order='F' if fortran_order else 'C')
+
+def cache_masks(masks: dict[str,list[Mask]], path: str|Path = 'masks.npz'):
     """
-    Load cached masks from a folder containing .npy and .json files.
-    Returns a list of Mask objects with mask array and metadata restored.
+    Saves all masks in one mask container (see save_mask_container).
+    """
+    save_mask_container(path, list(itertools.chain.from_iterable(masks.values())))
+
+def restore_cache(path: str|Path = 'masks.npz') -> defaultdict[str,list[Mask]]:
+    """
+    Loads cached masks by name from a mask container, memory-mapped (see load_mask_container), or from a folder
+    of masks cached as <name>/shape_id_<id>.npy, multilooked_id_<id>.npy and metadata_id_<id>.json files.
     """
     masks = defaultdict(list)
-    folder = Path(folder)
-    if not folder.exists():
-        warn(f"Folder '{folder}' does not exist.")
+    path = Path(path)
+    if not path.exists():
+        warn(f"Mask cache '{path}' does not exist.")
         return masks
-    if not folder.is_dir():
-        warn(f"Folder '{folder}' is not a folder.")
+    if path.is_file():
+        for mask in load_mask_container(path):
+            masks[mask.name].append(mask)
         return masks
 
-    # Collect all .json files and match with corresponding .npy files
-    json_files = folder.rglob("*.json")
-
-    for json_file in json_files:
-        # Load metadata 
+    # Former per-mask files, the name being the folder and the id in the file names
+    for json_file in sorted(path.rglob("metadata_id_*.json")):
         with open(json_file, 'r') as f:
             metadata = json.load(f)
-        name = metadata.get('name')
-        id = metadata.get('id')
+        name = json_file.parent.name
+        id = json_file.stem.removeprefix("metadata_id_")
+        id = int(id) if id.lstrip('-').isdigit() else id
         
         npy_file = json_file.parent / f"shape_id_{id}.npy"
         ml_file = json_file.parent / f"multilooked_id_{id}.npy"
@@ -1935,6 +2996,71 @@ def restore_cache(folder: str|Path = 'cached_masks') -> defaultdict[str,list[Mas
 
     return masks
 
+TOMOGRAM_TILE = 256 # Block size of saved tomograms (see tomogram_profile)
+
+def tomogram_profile(profile: Profile, count: int, shape: tuple[int, int], dtype: np.dtype | str,
+                     compression: str | None = None, tile: int = TOMOGRAM_TILE) -> Profile:
+    """
+    GeoTIFF creation options of a saved tomogram of count bands of the given (height, width) shape, based on the
+    profile of the tomograms: band-interleaved (tile, tile) blocks, compressed by compression (by default the
+    TOMOGRAM_COMPRESSION setting) with a floating point (or horizontal, for integers) predictor, and BigTIFF
+    when the uncompressed tomogram could exceed 4 GB.
+    """
+    compression = compression or get_tomogram_compression()
+    if compression not in TOMOGRAM_COMPRESSIONS:
+        raise ValueError(f"Tomogram compression must be one of {', '.join(TOMOGRAM_COMPRESSIONS)}.")
+    dtype = np.dtype(dtype)
+    profile = Profile(profile.copy())
+    for key in ['blockxsize', 'blockysize', 'tiled', 'compress', 'predictor', 'interleave', 'photometric']:
+        profile.pop(key, None)
+    profile.update({
+        'driver': 'GTiff',
+        'count': count,
+        'height': shape[0],
+        'width': shape[1],
+        'dtype': dtype.name,
+        'tiled': True,
+        'blockxsize': tile,
+        'blockysize': tile,
+        'interleave': 'band',
+        'bigtiff': 'IF_SAFER',
+        'num_threads': 'ALL_CPUS'
+    })
+    if compression != 'none':
+        profile.update(compress=compression, predictor=3 if np.issubdtype(dtype, np.floating) else 2)
+    return profile
+
+def profile_to_json(profile: Profile) -> dict:
+    """A JSON serializable copy of a raster profile (the CRS as WKT and the transform as its six coefficients)."""
+    data = {}
+    for key, value in profile.items():
+        if key == 'crs':
+            value = value.to_wkt() if value is not None and not isinstance(value, str) else value
+        elif key == 'transform':
+            value = list(value)[:6]
+        elif isinstance(value, np.dtype):
+            value = value.name
+        elif isinstance(value, np.generic):
+            value = value.item()
+        data[key] = value
+    return data
+
+def profile_from_json(data: dict) -> Profile:
+    """The raster profile of its JSON serializable copy (see profile_to_json)."""
+    profile = Profile(data)
+    if profile.get('crs') is not None:
+        profile['crs'] = CRS.from_user_input(profile['crs'])
+    if profile.get('transform') is not None:
+        profile['transform'] = Affine(*profile['transform'])
+    return profile
+
+def overview_factors(shape: tuple[int, int], tile: int = TOMOGRAM_TILE) -> list[int]:
+    """Overview decimation factors (powers of 2) down to the first overview that fits in one tile."""
+    factors = []
+    while max(shape) / 2**len(factors) > tile:
+        factors.append(2**(len(factors) + 1))
+    return factors
+
 # Orchestrating functions
 def sliceinfo(path: str|Path = '.', filter: ImageInfo = None, read: bool = False,
               npar: int = os.cpu_count()) -> SliceInfo:
@@ -1958,14 +3084,8 @@ def sliceinfo(path: str|Path = '.', filter: ImageInfo = None, read: bool = False
         else:
             raise ValueError(f"File '{p.name}' does not match expected pattern for slice info.")
     else:
-        tif_files = list(p.glob("dbr*C.tif"))
-
-
-        for f in tif_files:
-            try:
-                slice_info.append(parse_filename(f.resove()))
-            except Exception as e:
-                print(f"Error parsing file {f}: {e}")
+        tif_files = sorted(p.glob("dbr*C.tif"))
+        slice_info = SliceInfo.from_table(parse_filenames([f.resolve() for f in tif_files]))
 
     # Apply filter
     if filter:
@@ -1977,9 +3097,12 @@ def sliceinfo(path: str|Path = '.', filter: ImageInfo = None, read: bool = False
     
     return slice_info
 
-def tomoload(path: str = '.', cached: bool = True, npar: int = os.cpu_count()) -> TomoScene | TomoScenes:
+def tomoload(path: str = '.', cached: bool = True, npar: int = os.cpu_count(),
+             lazy: bool = False) -> TomoScene | TomoScenes:
     """
     Loads TomoScene instances from .tomo directories, collecting them into a TomoScenes if multple are found.
+    If lazy, only metadata, masks and statistics are loaded, and tomograms are read on first access, within the
+    memory budget of the TOMOGRAM_CACHE setting across all scenes (see TomogramCache).
     """
     # yyyy-mm-dd-HH-MM-SS-filename_processing-time.tomo/
     #   |-- flight_info.json
@@ -1989,6 +3112,7 @@ def tomoload(path: str = '.', cached: bool = True, npar: int = os.cpu_count()) -
     #   |    |-- raw_tomogram.tif
     #   |    |-- multilooked_tomogram.tif
     #   |    |-- filtered_tomogram.tif
+    #   |    |-- (raw|multilooked|filtered)_tomogram.npy, tomogram_profile.json (native storage)
     #   |    |-- raw_statistics.csv
     #   |    |-- multilooked_statistics.csv
     #   |    |-- filtered_statistics.csv
@@ -1998,11 +3122,7 @@ def tomoload(path: str = '.', cached: bool = True, npar: int = os.cpu_count()) -
     #   |    |       |-- <mask1>_filtered_statistics.csv
     #   |    |       |-- <mask2>_raw_statistics.csv
     #   |    |       |-- ...
-    #   |    |-- cached_masks/
-    #   |    |       |-- <mask1>.npy
-    #   |    |       |-- <mask1>.json
-    #   |    |       |-- <mask2>.npy
-    #   |    |       |-- ...
+    #   |    |-- masks.npz
     #   |    |-- .slices/
     #   |    |       |-- ...
     #   |-- cvv
@@ -2017,8 +3137,8 @@ def tomoload(path: str = '.', cached: bool = True, npar: int = os.cpu_count()) -
     # If path is a single .tomo directory
     if path.suffix == '.tomo':
         print("Returning single TomoScene.")
-        return TomoScene.load(path,cached=cached, npar=npar)
+        return TomoScene.load(path,cached=cached, npar=npar, lazy=lazy)
     # If path is a folder containing multiple .tomo directories
-    tomo_scenes = TomoScenes.load(path=path, cached=cached, npar=npar)
+    tomo_scenes = TomoScenes.load(path=path, cached=cached, npar=npar, lazy=lazy)
 
     return tomo_scenes if tomo_scenes else None
\ No newline at end of file
@@ -1,6 +1,5 @@
 # Imports
 import os
-import re
 from datetime import datetime, timezone
 from collections import defaultdict
 import math
@@ -9,8 +8,11 @@ import pandas as pd
 from pathlib import Path
 
 from .utils import warn
-from .core import ImageInfo, SliceInfo, TomoInfo, TomoScene, TomoScenes, regroup
+from .core import ImageInfo, SliceInfo, TomoInfo, TomoScene, TomoScenes, regroup, parse_filenames
 from .apperture import SARModel
+from .catalog import SliceCatalog
+from .processing import FilterPool
+from .scanning import DirectoryScanner, timestamp
 
 # Configuration constants
 DB0_1M2 = 5 * 10**3.75     # Raw backscatter corresponding to 1 dB across 1 meter squared
@@ -20,59 +22,46 @@ FILTER_SIZE = 9            # Filter size
 POINT_PERCENTILE = 98.0    # Percentile for identifying potential point targets
 POINT_THRESHOLD = 9        # Threshold voxel count for identifying point targets
 
-def recursive_search(paths: str|Path|list[str|Path], filter: ImageInfo = None) -> tuple[SliceInfo, list[Path], list[Path]]:
+def recursive_search(paths: str|Path|list[str|Path], filter: ImageInfo = None,
+                     catalog: bool = True, npar: int = os.cpu_count()) -> tuple[SliceInfo, list[Path], list[Path]]:
     """
-    Recursively search for complex .tif files by calling sliceinfo on each subdirectory.
+    Recursively search for complex .tif files, moco cuts and flight info files in a single parallel pass.
+    If catalog is set the persistent slice catalog is refreshed incrementally and queried instead.
     Returns a list of sliceInfo dictionaries.
     """
-    if isinstance(paths, (str, Path)):
-        paths = [Path(paths)]
-    else:
-        paths = [Path(path) for path in paths]
+    if catalog:
+        print("\nQuerying slice catalog ...")
+        with SliceCatalog() as slice_catalog:
+            return slice_catalog.search(paths, filter=filter, npar=npar)
 
-    slice_info = SliceInfo()
+    slice_paths = []
     flight_infos = {}
     moco_cuts = {}
 
-    timestamp_spiral_pattern = re.compile(r"(\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2})-(\d{2})")
-    timestamp_pattern = re.compile(r"\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}")
-
     print("\nScanning directories ...")
 
-    for root_path in paths:
-        for dirpath in root_path.rglob("*"):
-            if dirpath.is_dir():
-                print(dirpath)
-
-                for file in dirpath.iterdir():
-                    if file.is_file():
-
-                        if 'spiral.moco_cut' in file.name:
-                            match = timestamp_spiral_pattern.search(file.name)
-                            if match:
-                                try:
-                                    dt = datetime.strptime(match.group(1), "%Y-%m-%d-%H-%M-%S")
-                                    spiral_id = int(match.group(2))
-                                    key = (dt, spiral_id)
-                                    moco_cuts[key] = file
-                                except ValueError:
-                                    pass
-
-                        elif 'flight_info.json' in file.name:
-                            match = timestamp_pattern.search(file.name)
-                            if match:
-                                try:
-                                    dt = datetime.strptime(match.group(1), "%Y-%m-%d-%H-%M-%S")
-                                    key = dt  # No spiral_id here
-                                    flight_infos[key] = file
-                                except ValueError:
-                                    pass
-
-                info = SliceInfo.scan(str(dirpath), read=False, filter=filter)
-                if info:
-                    slice_info.extend(info)
-
-
+    scanner = DirectoryScanner(npar=npar)
+    for listing in scanner.scan(paths):
+        if not listing.files:
+            continue
+        for file, (kind, _, _) in sorted(listing.files.items()):
+            name = os.path.basename(file)
+            if kind == 'slice':
+                slice_paths.append(file)
+            else:
+                stamp = timestamp(name, kind)
+                if stamp is None:
+                    continue
+                if kind == 'moco_cut':
+                    moco_cuts[stamp] = Path(file)
+                else:
+                    flight_infos[stamp[0]] = Path(file) # No spiral_id here
+    print(f"Scanned {scanner.stats}.")
+    slice_info = SliceInfo.from_table(parse_filenames(slice_paths))
+
+    # Apply filter
+    if filter:
+        slice_info.filter(filter)
 
     return slice_info, flight_infos, moco_cuts
 
@@ -104,18 +93,32 @@ def find_pairs(band_groups, single=False) -> defaultdict[SliceInfo]:
     # Include other bands
     for band, slices in band_groups.items():
         if band not in ['phh1', 'phh0', 'cvv1', 'cvv0'] or single:
-            new_band_groups[band].extend(slices)
+            if band in new_band_groups:
+                new_band_groups[band].extend(slices)
+            else:
+                new_band_groups[band] = slices
 
     return new_band_groups
 
 def generate_tomograms(band_groups, flight_infos, moco_cuts, 
                    sub=False, sup=False, canopy=False, fused=False, npar: int = os.cpu_count(), 
-                   RR: bool = True, masks: str = "", tag: str = "") -> TomoScenes:
+                   RR: bool = True, masks: str = "", tag: str = "", window: tuple | None = None,
+                   bounds: tuple | None = None, out_shape: tuple | None = None, scratch: str | None = None) -> TomoScenes:
     """
     Find and process tomograms based on the provided band groups and flags.
+    Slices are read over the optional window, bounds and (decimated) out_shape only, directly into
+    each raw tomogram (memory-mapped in the scratch folder if given).
+    The filter workers are started once and reused for all bands and scenes.
     Returns a TomoList of tomogram information.
     """
 
+    with FilterPool(npar=npar, scratch=scratch) as pool:
+        return _generate_tomograms(band_groups, flight_infos, moco_cuts, sub=sub, sup=sup, canopy=canopy, fused=fused,
+                                   npar=npar, RR=RR, masks=masks, tag=tag, window=window, bounds=bounds,
+                                   out_shape=out_shape, scratch=scratch, pool=pool)
+
+def _generate_tomograms(band_groups, flight_infos, moco_cuts, sub, sup, canopy, fused, npar, RR, masks, tag,
+                        window, bounds, out_shape, scratch, pool) -> TomoScenes:
     tomo_scenes = []
     scenes = regroup(band_groups, ['date','spiral'])
     print(f"{len(scenes)} tomographic scene(s) detected.")
@@ -137,9 +140,6 @@ def generate_tomograms(band_groups, flight_infos, moco_cuts,
                 print(f"Band: {band}.")
             tomo_slices = tomo_slices[0]
 
-            # Read slices
-            tomo_slices.read(db0=DB0_1M2, npar=npar)
-            
             # Calculate multilooking factor 
             ml_factor = max(math.ceil(TARGET_RES / tomo_slices[0].res), 2)
 
@@ -149,7 +149,9 @@ def generate_tomograms(band_groups, flight_infos, moco_cuts,
             # Forge tomogram
             tomo_scene[band] = TomoInfo.forge(tomo_slices, multilook=ml_factor, sigma_xi=SIGMA_XI, filter_size=FILTER_SIZE,
                                     point_percentile=POINT_PERCENTILE, point_threshold=POINT_THRESHOLD,
-                                    fused=fused, sub=sub, sup=sup, canopy=canopy, npar=npar, RR=RR, masks=masks)
+                                    fused=fused, sub=sub, sup=sup, canopy=canopy, npar=npar, RR=RR, masks=masks,
+                                    db0=DB0_1M2, window=window, bounds=bounds, out_shape=out_shape, scratch=scratch,
+                                    pool=pool)
 
         if tag is None:
             processed = datetime.fromtimestamp(max(linux_time), tz=timezone.utc)
@@ -197,7 +199,9 @@ def generate_tomograms(band_groups, flight_infos, moco_cuts,
 def tomoforge(*,paths: str|Path | list[str|Path] = ".", filter: ImageInfo = None, 
                 single: bool = False, nopair: bool = False, RR: bool = False,
                 fused: bool = False, sub: bool = False, sup: bool = False, canopy: bool = False,
-                masks: str = None, npar: int = os.cpu_count(), out: str = ".", tag: str = "") -> TomoScenes:
+                masks: str = None, npar: int = os.cpu_count(), out: str = ".", tag: str = "",
+                catalog: bool = True, window: tuple | None = None, bounds: tuple | None = None,
+                out_shape: tuple | None = None, scratch: str | None = None) -> TomoScenes:
     """
     Processes tomographic data from .srf or complex .tif files.
 
@@ -207,6 +211,11 @@ def tomoforge(*,paths: str|Path | list[str|Path] = ".", filter: ImageInfo = None
         masks (str or list): Path(s) to mask files or folders.
         npar (int): Number of parallel threads to use.
         out (str): Output directory path.
+        catalog (bool): Query the persistent slice catalog instead of re-walking the paths.
+        window (tuple): Pixel window (col_off, row_off, width, height) to read from each slice.
+        bounds (tuple): Crop (left, bottom, right, top) in the slice CRS to read from each slice.
+        out_shape (tuple): Decimated (height, width) to read each slice (or crop) into.
+        scratch (str): Folder for memory-mapped raw tomograms (default: in memory).
 
     Returns:
         None
@@ -220,7 +229,7 @@ def tomoforge(*,paths: str|Path | list[str|Path] = ".", filter: ImageInfo = None
         canopy = True
 
     # Search for complex .tif files in the provided paths recursively
-    slice_info, flight_infos, moco_cuts = recursive_search(paths, filter=filter)
+    slice_info, flight_infos, moco_cuts = recursive_search(paths, filter=filter, catalog=catalog, npar=npar)
 
     # If no slices are found exit early, else print the number of slices found
     if not slice_info:
@@ -249,7 +258,8 @@ def tomoforge(*,paths: str|Path | list[str|Path] = ".", filter: ImageInfo = None
 
     # Tomographic processing
     tomo_scenes = generate_tomograms(band_groups, flight_infos=flight_infos, moco_cuts=moco_cuts, tag=tag,
-                                 sub=sub, sup=sup, canopy=canopy, fused=fused, npar=npar, RR=RR, masks=masks)
+                                 sub=sub, sup=sup, canopy=canopy, fused=fused, npar=npar, RR=RR, masks=masks,
+                                 window=window, bounds=bounds, out_shape=out_shape, scratch=scratch)
 
     # Save results
     tomo_scenes.save(out)
@@ -0,0 +1,255 @@
+# Imports
+import threading
+from pathlib import Path
+import numpy as np
+import rasterio
+from rasterio.profiles import Profile
+from rasterio.windows import Window, from_bounds
+from rasterio.errors import WindowError
+from rasterio.transform import Affine
+
+from .processing import working_dtypes
+
+class ImageCache:
+    """
+    Process-wide cache of slice images keyed by source (paths, window, scale).
+
+    Every ImageHandle on a source holds one reference; the image is read once, shared by all handles
+    (e.g. copies of an ImageInfo) and dropped when the last handle is released.
+    """
+    def __init__(self):
+        self._entries: dict[tuple, list] = {}  # key: [image, profile, references]
+        self._lock = threading.Lock()
+
+    def acquire(self, key: tuple) -> None:
+        with self._lock:
+            self._entries.setdefault(key, [None, None, 0])[2] += 1
+
+    def release(self, key: tuple) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry[2] -= 1
+            if entry[2] <= 0:
+                del self._entries[key]
+
+    def get(self, key: tuple) -> tuple[np.ndarray | tuple | None, Profile | None]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return (entry[0], entry[1]) if entry else (None, None)
+
+    def put(self, key: tuple, image: np.ndarray | tuple, profile: Profile) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is None:
+                entry[0] = image
+                entry[1] = profile
+
+    def references(self, key: tuple) -> int:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[2] if entry else 0
+
+    @property
+    def nbytes(self) -> int:
+        with self._lock:
+            images = [entry[0] for entry in self._entries.values() if entry[0] is not None]
+        return sum(sum(i.nbytes for i in image) if isinstance(image, tuple) else image.nbytes for image in images)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+IMAGE_CACHE = ImageCache()
+
+def as_window(window: Window | tuple | None) -> Window | None:
+    """
+    Converts a window given as a rasterio Window, as (col_off, row_off, width, height)
+    or as ((row_start, row_stop), (col_start, col_stop)) to a rasterio Window.
+    """
+    if window is None or isinstance(window, Window):
+        return window
+    if len(window) == 2:
+        return Window.from_slices(*window)
+    return Window(*window)
+
+def read_complex(src: rasterio.DatasetReader, window: Window | None = None, out_shape: tuple[int, int] | None = None,
+                 scale: float = 1.0, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Reads a two-band (real, imaginary) slice straight into the real and imaginary views of a complex
+    buffer and scales it in place, without band or complex temporaries. The buffer is out if given
+    (e.g. a slot of a preallocated tomogram, which also sets the output shape), else a new array
+    in the complex working dtype.
+    """
+    if out is None:
+        if out_shape is None:
+            out_shape = (int(window.height), int(window.width)) if window is not None else (src.height, src.width)
+        out = np.empty(out_shape, dtype=working_dtypes()[0])
+    src.read(1, window=window, out=out.real)
+    src.read(2, window=window, out=out.imag)
+    if scale != 1:
+        np.divide(out, scale, out=out)
+    return out
+
+class ImageHandle:
+    """
+    Lazy reference to the pixel data of a slice: the source path (or pair of paths for composite slices),
+    an optional region (pixel window or georeferenced bounds, and a decimated output shape) and the
+    backscatter scale. The image is read on first access and shared through IMAGE_CACHE with every other
+    handle on the same source. Handles created from an array (e.g. by ImageInfo.pair) hold the array
+    themselves; copies share it rather than duplicating it.
+    """
+    __slots__ = ('paths', 'window', 'bounds', 'out_shape', 'scale', '_key', '_image', '_profile')
+
+    def __init__(self, paths: str | Path | list[str | Path], window: Window | tuple | None = None,
+                 bounds: tuple[float, float, float, float] | None = None,
+                 out_shape: tuple[int, int] | None = None, scale: float = 1.0):
+        if isinstance(paths, (str, Path)):
+            paths = [paths]
+        self.paths = tuple(str(p) for p in paths)
+        self.window = as_window(window)
+        self.bounds = tuple(bounds) if bounds is not None else None
+        self.out_shape = tuple(int(n) for n in out_shape) if out_shape is not None else None
+        self.scale = scale
+        self._key = (self.paths, self.window.flatten() if self.window is not None else None,
+                     self.bounds, self.out_shape, scale)
+        self._image = None
+        self._profile = None
+        IMAGE_CACHE.acquire(self._key)
+
+    @classmethod
+    def from_array(cls, image: np.ndarray | tuple | None, profile: Profile | None = None) -> 'ImageHandle':
+        handle = cls.__new__(cls)
+        handle.paths = ()
+        handle.window = None
+        handle.bounds = None
+        handle.out_shape = None
+        handle.scale = 1.0
+        handle._key = None
+        handle._image = image
+        handle._profile = profile
+        return handle
+
+    @property
+    def loaded(self) -> bool:
+        if self._key is None:
+            return self._image is not None
+        return IMAGE_CACHE.get(self._key)[0] is not None
+
+    @property
+    def image(self) -> np.ndarray | tuple | None:
+        if self._key is None:
+            return self._image
+        return self.load()[0]
+
+    @property
+    def profile(self) -> Profile | None:
+        if self._profile is not None or self._key is None:
+            return self._profile
+        return self.load()[1]
+
+    @profile.setter
+    def profile(self, profile: Profile | None) -> None:
+        self._profile = profile
+
+    def load(self, out: np.ndarray | None = None) -> tuple[np.ndarray | tuple, Profile]:
+        """
+        Returns the image and profile, reading them from file if they are not cached.
+        A single-file image is read into out (e.g. a slot of a preallocated tomogram) if given,
+        and out then becomes the cached image.
+        """
+        image, profile = IMAGE_CACHE.get(self._key)
+        if image is None:
+            if len(self.paths) == 1:
+                image, profile = self._read(self.paths[0], out=out)
+            else:
+                images, profiles = zip(*(self._read(path) for path in self.paths))
+                image, profile = images, profiles[0]
+            IMAGE_CACHE.put(self._key, image, profile)
+        elif out is not None and out is not image:
+            out[...] = image
+        return image, profile
+
+    def matches(self, window: Window | tuple | None = None, bounds: tuple | None = None,
+                out_shape: tuple[int, int] | None = None) -> bool:
+        """Whether this handle reads the given region."""
+        return (self.window == as_window(window)
+                and self.bounds == (tuple(bounds) if bounds is not None else None)
+                and self.out_shape == (tuple(int(n) for n in out_shape) if out_shape is not None else None))
+
+    def region(self, src: rasterio.DatasetReader,
+               out_shape: tuple[int, int] | None = None) -> tuple[Window | None, tuple[int, int] | None, Profile]:
+        """
+        Resolves the pixel window and output shape (unless given) of this handle in an open dataset,
+        and returns them with the dataset profile updated to the region.
+        """
+        profile = src.profile
+        out_shape = tuple(out_shape) if out_shape is not None else self.out_shape
+        window = self.window
+        if self.bounds is not None:
+            window = from_bounds(*self.bounds, transform=src.transform)
+            window = window.round_offsets().round_lengths()
+        if window is not None:
+            try:
+                window = window.intersection(Window(0, 0, src.width, src.height))
+            except WindowError:
+                raise WindowError(f"The region {self.bounds if self.bounds is not None else self.window} "
+                                  f"lies outside {src.name}.") from None
+        if window is None and out_shape is None:
+            return None, None, profile
+
+        full = window if window is not None else Window(0, 0, src.width, src.height)
+        height, width = out_shape if out_shape is not None else (int(full.height), int(full.width))
+        transform = src.window_transform(full) * Affine.scale(full.width / width, full.height / height)
+        profile.update(width=width, height=height, transform=transform)
+        return window, out_shape, profile
+
+    def _read(self, path: str, out: np.ndarray | None = None) -> tuple[np.ndarray, Profile]:
+        with rasterio.open(path) as src:
+            if src.count == 2:
+                window, out_shape, profile = self.region(src, out.shape if out is not None else None)
+                return read_complex(src, window=window, out_shape=out_shape, scale=self.scale, out=out), profile
+            window, out_shape, profile = self.region(src)
+            out_shape = (src.count, *out_shape) if out_shape is not None else None
+            return src.read(window=window, out_shape=out_shape), profile
+
+    def describe(self) -> Profile | None:
+        """Returns the profile of the image over this handle's region without reading pixels."""
+        if self._profile is None and self._key is not None:
+            with rasterio.open(self.paths[0]) as src:
+                self._profile = self.region(src)[2]
+        return self._profile
+
+    def copy(self) -> 'ImageHandle':
+        if self._key is None:
+            return ImageHandle.from_array(self._image, self._profile)
+        handle = ImageHandle(self.paths, window=self.window, bounds=self.bounds, out_shape=self.out_shape,
+                             scale=self.scale)
+        handle._profile = self._profile
+        return handle
+
+    def release(self) -> None:
+        """Drops this handle's reference to the cached image."""
+        if self._key is not None:
+            IMAGE_CACHE.release(self._key)
+            self._key = None
+        self._image = None
+
+    def __getstate__(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state: dict) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+        if self._key is not None:
+            IMAGE_CACHE.acquire(self._key)
+
+    def __del__(self):
+        try:
+            self.release()
+        except Exception:
+            pass
+
+    def __repr__(self):
+        source = ", ".join(Path(p).name for p in self.paths) if self.paths else "array"
+        return f"ImageHandle({source}{', loaded' if self.loaded else ''})"
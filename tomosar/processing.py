@@ -1,68 +1,321 @@
 # Imports
 import os
+import tempfile
 import numpy as np
+from dataclasses import dataclass
+from functools import partial, lru_cache
 from concurrent.futures import ThreadPoolExecutor
-from threadpoolctl import threadpool_limits
-from multiprocessing import Pool
+from multiprocessing import Pool, Barrier
 from tqdm import tqdm
-from numpy.lib.stride_tricks import sliding_window_view
 from scipy.stats import gamma
 from scipy.ndimage import uniform_filter
 
+from .config import PRECISIONS, get_precision
+from .chunking import allocate, tiles, tile_shape, height_chunks
+from .quantiles import quantile
+
+# Precision
+def working_dtypes(precision: str | None = None) -> tuple[np.dtype, np.dtype]:
+    """
+    Returns the (complex, real) working dtypes of a precision, by default the one set for the process.
+    """
+    complex_dtype, real_dtype = PRECISIONS[precision or get_precision()]
+    return np.dtype(complex_dtype), np.dtype(real_dtype)
+
+def intensity(volume: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Linear intensity |volume|^2 in the real working dtype (or written into out), computed without complex temporaries.
+    """
+    _, real_dtype = working_dtypes()
+    if not np.iscomplexobj(volume):
+        return np.square(volume, out=out, dtype=real_dtype if out is None else None)
+    out = np.square(volume.real, out=out, dtype=real_dtype if out is None else None)
+    out += np.square(volume.imag, dtype=out.dtype)
+    return out
+
+def chunked_intensity(volume: np.ndarray, scratch: str | None = None) -> np.ndarray:
+    """
+    Intensity of a tomogram computed chunk by chunk (slices fitting the memory budget) into a single buffer in the
+    real working dtype, memory-mapped in the scratch folder if given, so that only chunk-sized temporaries exist.
+    """
+    out = allocate(volume.shape, dtype=working_dtypes()[1], scratch=scratch)
+    for chunk in height_chunks(volume.shape, bytes_per_voxel=volume.itemsize + 2 * out.itemsize):
+        intensity(volume[chunk], out=out[chunk])
+    return out
+
 # Multilook
-def multilook(I: np.ndarray, ds: int, npar: int = os.cpu_count()):
-    N, H, W= I.shape
-    out_H = (H + ds - 1) // ds
-    out_W = (W + ds - 1) // ds
-    out = np.empty((N, out_H, out_W), dtype=I.dtype)
-
-    with threadpool_limits(limits=1):
-        with ThreadPoolExecutor(max_workers=npar) as ex:
-            futures = [ex.submit(_multilook_slice, I[n, ...], ds) for n in range(N)]
-            for n, f in enumerate(tqdm(futures, desc="Multilooking: ", total = N, unit='slices',leave=False)):
-                out[n, ...] = f.result()
+def as_looks(factor: int | tuple[int, int]) -> tuple[int, int]:
+    """
+    Returns a multilook factor (or step) as (azimuth, range) pixels, i.e. along (rows, columns).
+    A single integer applies to both directions.
+    """
+    if np.ndim(factor) == 0:
+        factor = (factor, factor)
+    looks = tuple(int(f) for f in factor)
+    if len(looks) != 2 or min(looks) < 1:
+        raise ValueError("Multilook factors must be one or two positive integers.")
+    return looks
+
+def multilook(I: np.ndarray, ds: int | tuple[int, int], npar: int = os.cpu_count(),
+              step: int | tuple[int, int] | None = None) -> np.ndarray:
+    """
+    Mean intensity of an (N, H, W) cube over looks of ds = (azimuth, range) pixels (or one factor for both),
+    started every step pixels: by default step = ds (non-overlapping looks), smaller steps give overlapping,
+    sliding looks. Looks overhanging the far edges average the pixels they cover. Looks are separable box sums
+    over the whole cube, accumulated from strided views (or, for looks much longer than the step, from a
+    cumulative sum table), with the cube split into npar chunks of slices processed on threads.
+    """
+    looks = as_looks(ds)
+    steps = as_looks(step) if step is not None else looks
+    N, H, W = I.shape
+    out = np.empty((N, -(-H // steps[0]), -(-W // steps[1])), dtype=I.dtype)
+
+    def work(chunk):
+        sums = I[chunk]
+        counts = []
+        for axis, size, stride in zip((1, 2), looks, steps):
+            sums, count = _look_sums(sums, axis, size, stride)
+            counts.append(count)
+        np.divide(sums, np.multiply.outer(*counts), out=sums)
+        out[chunk] = sums
+
+    chunks = [slice(c[0], c[-1] + 1) for c in np.array_split(np.arange(N), min(max(npar, 1), N)) if len(c)]
+    with ThreadPoolExecutor(max_workers=len(chunks)) as ex:
+        for f in tqdm(ex.map(work, chunks), desc="Multilooking: ", total=len(chunks), unit='chunks', leave=False):
+            pass
 
     return out
 
-def _multilook_slice(I2d, ds):
-    # I2d is linear intensity, 2-D; implement your block-mean here (vectorized).
-    H, W = I2d.shape
-    out_H = (H + ds - 1) // ds
-    out_W = (W + ds - 1) // ds
-    h_full, w_full = H // ds, W // ds
-    out = np.empty((out_H, out_W), dtype=I2d.dtype)
-
-    if h_full > 0 and w_full > 0:
-        core = I2d[:h_full*ds, :w_full*ds].reshape(h_full, ds, w_full, ds)
-        out[:h_full, :w_full] = core.mean(axis=(1, 3))
-    if w_full*ds < W:
-        right = I2d[:h_full*ds, w_full*ds:].reshape(h_full, ds, W - w_full*ds)
-        out[:h_full, w_full] = right.mean(axis=(1, 2))
-    if h_full*ds < H:
-        bottom = I2d[h_full*ds:, :w_full*ds].reshape(H - h_full*ds, w_full, ds)
-        out[h_full, :w_full] = bottom.mean(axis=(0, 2))
-    if h_full*ds < H and w_full*ds < W:
-        out[h_full, w_full] = I2d[h_full*ds:, w_full*ds:].mean()
+def _look_sums(a: np.ndarray, axis: int, size: int, step: int) -> tuple[np.ndarray, np.ndarray]:
+    """Sums and pixel counts of the looks of size pixels started every step pixels along an axis of a."""
+    n = a.shape[axis]
+    starts = np.arange(0, n, step)
+    counts = np.minimum(starts + size, n) - starts
+    if size > 4 * step:
+        # Long sliding looks: differences of a cumulative sum table (in double precision)
+        table = np.cumsum(a, axis=axis, dtype=np.float64)
+        table = np.concatenate([np.zeros_like(np.take(table, [0], axis=axis)), table], axis=axis)
+        sums = np.take(table, starts + counts, axis=axis) - np.take(table, starts, axis=axis)
+        return sums.astype(np.result_type(a.dtype, np.float32), copy=False), counts
+
+    # Otherwise accumulate the size strided views a[k::step] (k < size) into the looks they start
+    index = [slice(None)] * a.ndim
+    index[axis] = slice(0, None, step)
+    sums = a[tuple(index)].astype(np.result_type(a.dtype, np.float32))
+    for k in range(1, min(size, n)):
+        index[axis] = slice(k, None, step)
+        view = a[tuple(index)]
+        target = [slice(None)] * a.ndim
+        target[axis] = slice(0, view.shape[axis])
+        sums[tuple(target)] += view
+    return sums, counts
+
+def chunked_multilook(volume: np.ndarray, ds: int | tuple[int, int], npar: int = os.cpu_count(),
+                      step: int | tuple[int, int] | None = None, scratch: str | None = None) -> np.ndarray:
+    """
+    Multilooks an out-of-core (e.g. memory-mapped) tomogram tile by tile, with tiles aligned to the look step
+    and extended by the look overlap, so that the result equals multilook(intensity(volume), ds, step=step).
+    Real volumes are taken to be intensities already. The output is memory-mapped in the scratch folder if given.
+    """
+    looks = as_looks(ds)
+    steps = as_looks(step) if step is not None else looks
+    overlap = [max(f - s, 0) for f, s in zip(looks, steps)]
+    N, H, W = volume.shape
+    real_dtype = working_dtypes()[1]
+    out = allocate((N, -(-H // steps[0]), -(-W // steps[1])), dtype=real_dtype, scratch=scratch)
+    tile = tile_shape(volume.shape, bytes_per_pixel=N * (volume.itemsize + 2 * real_dtype.itemsize + 8),
+                      halo=max(overlap), align=int(np.lcm(*steps)))
+    for t in tqdm(list(tiles(volume.shape, tile)), desc="Multilooking: ", unit='tiles', leave=False):
+        y, x = t.core
+        oy, ox = slice(y.start // steps[0], -(-y.stop // steps[0])), slice(x.start // steps[1], -(-x.stop // steps[1]))
+        region = volume[:, y.start:min(y.stop + overlap[0], H), x.start:min(x.stop + overlap[1], W)]
+        region = intensity(region) if np.iscomplexobj(region) else np.asarray(region)
+        looked = multilook(region, ds=looks, npar=npar, step=steps)
+        out[:, oy, ox] = looked[:, :oy.stop - oy.start, :ox.stop - ox.start]
     return out
 
 # Filter 
 def filter(I: np.ndarray, sigma_xi: float = 0.9, size: int = 9, point_percentile: float = 98.0,
-           point_threshold: int = 9, nlooks: int = 1, npar: int = os.cpu_count()):
+           point_threshold: int = 9, nlooks: int = 1, npar: int = os.cpu_count(), threshold: float | None = None,
+           pool: 'FilterPool | None' = None, point_mask: np.ndarray | None = None,
+           mean_estimate: np.ndarray | None = None):
+    """
+    Improved Lee filter of an intensity cube. Slices are filtered in parallel on a FilterPool, by default one
+    started for this call; pass a pool to reuse its workers across calls (e.g. all bands of a scene).
+    The point mask and mean estimate are computed unless given (e.g. cached by Filter).
+    """
+    I = np.asarray(I, dtype=working_dtypes()[1])
     sigma_range = _estimate_sigma_range(nlooks, sigma_xi)
-    point_mask, mean_estimate = _point_target_estimator(I, percentile=point_percentile, min_voxels=point_threshold,
-                                                       nlooks=nlooks)
-
-    # Prepare per-slice arguments
-    args_list = [(I[z, ...], point_mask[z, ...], mean_estimate[z, ...], sigma_range, size, nlooks) for z in range(I.shape[0])]
+    if point_mask is None or mean_estimate is None:
+        point_mask, mean_estimate = _point_target_estimator(I, percentile=point_percentile, min_voxels=point_threshold,
+                                                           nlooks=nlooks, threshold=threshold)
 
     # Filter each slice in parallel
-    with Pool(processes=npar) as pool:
-        results = []
-        for result in tqdm(pool.imap_unordered(_filter_wrapper, args_list),
-                        total=len(args_list), desc="Filtering: ", unit="slices", leave=False):
-            results.append(result)
-
-    out = np.stack(results, axis=0)
+    if pool is None:
+        with FilterPool(npar=npar) as pool:
+            return pool.filter(I, point_mask, mean_estimate, sigma_range=sigma_range, size=size, nlooks=nlooks)
+    return pool.filter(I, point_mask, mean_estimate, sigma_range=sigma_range, size=size, nlooks=nlooks)
+
+@dataclass(frozen=True)
+class _FilterJob:
+    folder: str                 # Folder of the memory-mapped image, point_mask and mean_estimate cubes
+    out: str                    # File name of the memory-mapped output cube in folder
+    shape: tuple[int, int, int]
+    dtype: str
+    sigma_range: tuple[float, float]
+    size: int
+    nlooks: int
+
+class FilterPool:
+    """
+    Worker pool of the improved Lee filter. The cubes are exchanged through memory-mapped files: workers
+    receive only the job (folder, shape and filter parameters) and a slice index, and write the filtered
+    slice in place, so no image data is pickled and the output is in height order. The workers are started
+    on first use and reused by every filter call until the pool is closed, and close their memory maps at the
+    end of every call, so that no files stay open once they are removed. Inputs stay staged while the
+    following calls filter the same arrays (e.g. a parameter sweep), and are only written out again for new ones.
+    """
+    def __init__(self, npar: int = os.cpu_count(), scratch: str | None = None):
+        self.npar = max(int(npar or 1), 1)
+        self.scratch = scratch
+        self._pool = None
+        self._staged = None # (image, point_mask, mean_estimate, TemporaryDirectory) of the last call
+        self._calls = 0
+
+    def filter(self, I: np.ndarray, point_mask: np.ndarray, mean_estimate: np.ndarray,
+               sigma_range: tuple[float, float], size: int, nlooks: int, out: np.ndarray | None = None) -> np.ndarray:
+        """Filters the slices of I into out (a new array if None), given its point mask and mean estimate."""
+        if self._pool is None:
+            self._pool = Pool(processes=self.npar, initializer=_init_worker, initargs=(Barrier(self.npar),))
+        N = I.shape[0]
+        folder = self._stage(I, point_mask, mean_estimate)
+        self._calls += 1
+        job = _FilterJob(folder=folder, out=f"out_{self._calls}", shape=I.shape, dtype=I.dtype.str,
+                         sigma_range=tuple(sigma_range), size=size, nlooks=nlooks)
+        path = os.path.join(folder, job.out)
+        filtered = np.memmap(path, dtype=I.dtype, mode='w+', shape=I.shape)
+        try:
+            for _ in tqdm(self._pool.imap_unordered(partial(_filter_task, job), range(N)),
+                          total=N, desc="Filtering: ", unit="slices", leave=False):
+                pass
+            if out is None:
+                out = np.array(filtered)
+            else:
+                out[...] = filtered
+        finally:
+            self._release()
+            del filtered
+            os.remove(path)
+        return out
+
+    def _release(self) -> None:
+        """Closes the memory maps of every worker (one release task each, see _release_task)."""
+        self._pool.map(_release_task, range(self.npar), chunksize=1)
+
+    def _stage(self, I: np.ndarray, point_mask: np.ndarray, mean_estimate: np.ndarray) -> str:
+        """Writes the input cubes to memory-mapped files (unless already staged) and returns their folder."""
+        arrays = (I, point_mask, mean_estimate)
+        if self._staged is not None and all(a is b for a, b in zip(self._staged, arrays)):
+            return self._staged[3].name
+        self._unstage()
+        if self.scratch is not None:
+            os.makedirs(self.scratch, exist_ok=True)
+        folder = tempfile.TemporaryDirectory(dir=self.scratch, prefix="filter_")
+        for name, array in zip(['image', 'point_mask', 'mean_estimate'], arrays):
+            dtype = bool if name == 'point_mask' else I.dtype
+            mapped = np.memmap(os.path.join(folder.name, name), dtype=dtype, mode='w+', shape=I.shape)
+            mapped[:] = array
+            mapped.flush()
+            del mapped
+        self._staged = (*arrays, folder)
+        return folder.name
+
+    def _unstage(self) -> None:
+        if self._staged is not None:
+            self._staged[3].cleanup()
+            self._staged = None
+
+    def close(self) -> None:
+        self._unstage()
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> 'FilterPool':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+# Memory maps of the current job in a FilterPool worker, and the barrier of the pool's workers
+_WORKER_JOB = None
+_WORKER_ARRAYS = None
+_WORKER_BARRIER = None
+
+def _init_worker(barrier: Barrier) -> None:
+    global _WORKER_BARRIER
+    _WORKER_BARRIER = barrier
+
+def _release_task(_: int) -> None:
+    # Every worker waits for the others after releasing, so that each of them takes exactly one release task
+    global _WORKER_JOB, _WORKER_ARRAYS
+    _WORKER_JOB = None
+    _WORKER_ARRAYS = None
+    _WORKER_BARRIER.wait()
+
+def _filter_task(job: _FilterJob, z: int) -> int:
+    global _WORKER_JOB, _WORKER_ARRAYS
+    if job != _WORKER_JOB:
+        _WORKER_ARRAYS = None
+        _WORKER_ARRAYS = {
+            'image': np.memmap(os.path.join(job.folder, 'image'), dtype=job.dtype, mode='r', shape=job.shape),
+            'point_mask': np.memmap(os.path.join(job.folder, 'point_mask'), dtype=bool, mode='r', shape=job.shape),
+            'mean_estimate': np.memmap(os.path.join(job.folder, 'mean_estimate'), dtype=job.dtype, mode='r',
+                                       shape=job.shape),
+            'out': np.memmap(os.path.join(job.folder, job.out), dtype=job.dtype, mode='r+', shape=job.shape),
+        }
+        _WORKER_JOB = job
+    arrays = _WORKER_ARRAYS
+    arrays['out'][z] = _filter_slice(np.asarray(arrays['image'][z]), np.asarray(arrays['point_mask'][z]),
+                                     np.asarray(arrays['mean_estimate'][z]), size=job.size,
+                                     sigma_range=job.sigma_range, nlooks=job.nlooks)
+    return z
+
+def chunked_filter(volume: np.ndarray, sigma_xi: float = 0.9, size: int = 9, point_percentile: float = 98.0,
+                   point_threshold: int = 9, nlooks: int = 1, npar: int = os.cpu_count(),
+                   scratch: str | None = None, pool: 'FilterPool | None' = None,
+                   threshold: float | None = None) -> np.ndarray:
+    """
+    Filters an out-of-core (e.g. memory-mapped) tomogram tile by tile. Each tile is read with a halo covering
+    the filter window and the 3x3x3 point target neighbourhood, and the point target threshold is the exact
+    percentile over the whole tomogram, so that the result matches filter(intensity(volume)). Real volumes are
+    taken to be intensities already. The output is memory-mapped in the scratch folder if given. All tiles
+    are filtered on one FilterPool (the given one, or one started for this call). The point target threshold
+    is computed unless given (e.g. cached by Filter).
+    """
+    if pool is None:
+        with FilterPool(npar=npar, scratch=scratch) as pool:
+            return chunked_filter(volume, sigma_xi=sigma_xi, size=size, point_percentile=point_percentile,
+                                  point_threshold=point_threshold, nlooks=nlooks, npar=npar, scratch=scratch, pool=pool,
+                                  threshold=threshold)
+    N, H, W = volume.shape
+    real_dtype = working_dtypes()[1]
+    out = allocate((N, H, W), dtype=real_dtype, scratch=scratch)
+    clx = np.iscomplexobj(volume)
+    if threshold is None:
+        threshold = quantile(volume, point_percentile, transform=intensity if clx else None).value
+    halo = size // 2 + 1
+    # Working set per pixel: the tile of the tomogram and its intensity, point mask, mean estimate and
+    # temporaries over all heights, and the accumulators of the slices in flight in the workers
+    bytes_per_pixel = N * (volume.itemsize + 12 * real_dtype.itemsize) + npar * 64
+    tile = tile_shape(volume.shape, bytes_per_pixel=bytes_per_pixel, halo=halo)
+    for t in tqdm(list(tiles(volume.shape, tile, halo=halo)), desc="Filtering: ", unit='tiles', leave=False):
+        y, x = t.region
+        region = intensity(volume[:, y, x]) if clx else volume[:, y, x]
+        filtered = filter(region, sigma_xi=sigma_xi, size=size, point_percentile=point_percentile,
+                          point_threshold=point_threshold, nlooks=nlooks, npar=npar, threshold=threshold, pool=pool)
+        out[:, t.core[0], t.core[1]] = filtered[:, t.inner[0], t.inner[1]]
     return out
 
 def _estimate_sigma_range(nlooks, sigma_xi):
@@ -75,7 +328,7 @@ def _estimate_sigma_range(nlooks, sigma_xi):
     upper_bound = gamma.ppf(1 - (1 - sigma_xi) / 2, a=shape, scale=scale)
     return lower_bound, upper_bound
 
-def _point_target_estimator(volume, percentile, min_voxels, nlooks):
+def _point_target_estimator(volume, percentile, min_voxels, nlooks, threshold=None):
     """
     Identify point targets in a 3D tomogram using a percentile threshold and 3x3x3 neighborhood.
     Also compute MMSE-based mean estimate for non-point voxels assuming multiplicative noise.
@@ -85,14 +338,30 @@ def _point_target_estimator(volume, percentile, min_voxels, nlooks):
         percentile (float): Percentile threshold to identify bright voxels.
         min_voxels (int): Minimum number of bright voxels in a 3x3x3 neighborhood to classify as point target.
         n_looks (int): Number of looks (used for MMSE estimation).
+        threshold (float): Precomputed intensity threshold (e.g. over a whole tomogram of which volume is a tile),
+            overrides percentile if given.
 
     Returns:
         point_mask (ndarray): Boolean 3D array where True indicates point target voxels.
         mean_estimate (ndarray): 3D array of estimated means for non-point voxels.
     """
     # Compute threshold from percentile
-    threshold = np.percentile(volume, percentile)
+    if threshold is None:
+        threshold = quantile(volume, percentile).value
+
+    point_mask = point_targets(volume, threshold, min_voxels)
+    mean_estimate = mmse_estimate(volume, nlooks)
+
+    # Restore original values where point_mask is True
+    mean_estimate[point_mask] = volume[point_mask]
 
+    return point_mask, mean_estimate
+
+def point_targets(volume: np.ndarray, threshold: float, min_voxels: int) -> np.ndarray:
+    """
+    Point target mask of an intensity volume: voxels at or above threshold with at least min_voxels such voxels
+    in their 3x3x3 neighbourhood.
+    """
     # Pad the volume symmetrically
     padded = np.pad(volume, 1, mode='symmetric')
 
@@ -104,14 +373,14 @@ def _point_target_estimator(volume, percentile, min_voxels, nlooks):
     neighborhood_sum = neighborhood_sum[1:-1, 1:-1, 1:-1]
 
     # Initial point target mask
-    point_mask = (volume >= threshold) & (neighborhood_sum >= min_voxels)
+    return (volume >= threshold) & (neighborhood_sum >= min_voxels)
 
-    # Initialize mean estimate volume
-    mean_estimate = np.zeros_like(volume, dtype=np.float32)
-
-    # MMSE estimation for non-point voxels
+def mmse_estimate(volume: np.ndarray, nlooks: int) -> np.ndarray:
+    """
+    MMSE estimate of the mean of an intensity volume from its 3x3x3 local statistics, assuming multiplicative
+    noise of nlooks looks (before point targets are restored, see _point_target_estimator).
+    """
     noise_var = 1.0 / nlooks
-    padded_volume = np.pad(volume, 1, mode='symmetric')
 
     # Compute local mean and squared mean
     local_mean = uniform_filter(volume, size=3, mode='reflect')
@@ -124,16 +393,13 @@ def _point_target_estimator(volume, percentile, min_voxels, nlooks):
     b = np.clip(b, 0, 1)  # Ensure b ≥ 0
 
     # Apply formula
-    mean_estimate = b * volume + (1 - b) * local_mean
-
-    # Restore original values where point_mask is True
-    mean_estimate[point_mask] = volume[point_mask]
-
-    return point_mask, mean_estimate
+    return b * volume + (1 - b) * local_mean
 
 def _filter_slice(image, point_mask, mean_estimate, size, sigma_range, nlooks):
     """
     Apply an approximate version of the improved Lee filter to non-point pixels within the sigma range.
+    The mean and variance of the pixels in each size x size window that fall within the sigma range of its centre
+    are accumulated over the window offsets, in two passes (as np.nanmean and np.nanvar), so that memory stays O(H*W).
     """
 
     pad_size = size // 2
@@ -142,24 +408,35 @@ def _filter_slice(image, point_mask, mean_estimate, size, sigma_range, nlooks):
 
     height, width = image.shape
     padded_image = np.pad(image, pad_size, mode='symmetric')
-    windows = sliding_window_view(padded_image, (size, size))  # shape: (H, W, size, size)
-    windows = windows.reshape(height, width, -1)  # flatten each window
 
     # Compute bounds
     bounds_low = mean_estimate * sigma_range[0]
     bounds_high = mean_estimate * sigma_range[1]
 
-    # Mask out-of-bound values
-    mask = (windows > bounds_low[..., None]) & (windows < bounds_high[..., None])
-    valid_windows = np.where(mask, windows, np.nan)
-
-    # Compute local mean and variance ignoring NaNs
-    local_mean = np.nanmean(valid_windows, axis=-1)
-    local_var = np.nanvar(valid_windows, axis=-1)
-
-    # Compute b
-    noise_var = 1.0 / nlooks
-    b = (local_var - noise_var * local_mean**2) / ((1 + noise_var) * local_var)
+    def windows():
+        # Every offset of the window as a shifted view of the image, and where it is within bounds
+        for dy in range(size):
+            for dx in range(size):
+                window = padded_image[dy:dy + height, dx:dx + width]
+                yield window, (window > bounds_low) & (window < bounds_high)
+
+    # Compute local mean and variance over the in-bound pixels
+    count = np.zeros((height, width), dtype=np.int32)
+    total = np.zeros((height, width), dtype=np.float64)
+    for window, valid in windows():
+        count += valid
+        total += np.where(valid, window, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        local_mean = total / count
+        squares = np.zeros((height, width), dtype=np.float64)
+        for window, valid in windows():
+            squares += np.where(valid, np.square(window - local_mean), 0)
+        local_var = (squares / count).astype(image.dtype)
+        local_mean = local_mean.astype(image.dtype)
+
+        # Compute b
+        noise_var = 1.0 / nlooks
+        b = (local_var - noise_var * local_mean**2) / ((1 + noise_var) * local_var)
     b = np.clip(b, 0, 1)
 
     # Final output
@@ -168,53 +445,58 @@ def _filter_slice(image, point_mask, mean_estimate, size, sigma_range, nlooks):
     # Restore original values for masked points
     output[point_mask] = image[point_mask]
 
-
     return output
 
-def _filter_wrapper(args):
-        I_slice, point_mask, mean_estimate, sigma_range, size, nlooks = args
-        return _filter_slice(I_slice, point_mask, mean_estimate,
-                            sigma_range=sigma_range, size=size, nlooks=nlooks)
-    
 # Circularize
-def circularize(I: np.ndarray, rescale: bool = False) -> np.ndarray:
-    # Validate input dimensions
-    if I.ndim not in [2, 3]:
-        raise ValueError("Input must be a 2D or 3D array.")
-    if not (I.shape[1] == I.shape[2] or abs(I.shape[1] - I.shape[2]) == 1):
+@dataclass(frozen=True)
+class Footprint:
+    """
+    The circular footprint of (H, W) tomogram slices: the (read-only) disc mask of valid pixels and their
+    flat (row-major) indices.
+    """
+    mask: np.ndarray
+    indices: np.ndarray
+
+    @property
+    def excluded(self) -> int:
+        """Number of pixels outside the footprint."""
+        return self.mask.size - self.indices.size
+
+@lru_cache(maxsize=32)
+def footprint(shape: tuple[int, int]) -> Footprint:
+    """Returns the (cached) circular footprint of slices of the given (H, W) shape."""
+    if not (shape[0] == shape[1] or abs(shape[0] - shape[1]) == 1):
         raise ValueError("Input must be square or nearly square in horizontal dimensions.")
 
-    # Get image dimensions
-    sz = I.shape[1:3]
-    N = 1 if I.ndim == 2 else I.shape[0]
-
     # Nominal radius
-    r0 = max(sz) / 2
+    r0 = max(shape) / 2
 
     # Find center
-    xcenter = (sz[0] + 1) / 2
-    ycenter = (sz[1] + 1) / 2
+    xcenter = (shape[0] + 1) / 2
+    ycenter = (shape[1] + 1) / 2
 
     # Coordinate vectors
-    x = np.arange(1, sz[0] + 1) - xcenter
-    y = np.arange(1, sz[1] + 1) - ycenter
+    x = np.arange(1, shape[0] + 1) - xcenter
+    y = np.arange(1, shape[1] + 1) - ycenter
 
-    # Create coordinate grid
-    X, Y = np.meshgrid(x, y, indexing='ij')
+    # Pixels within the radius
+    mask = np.sqrt(x[:, None]**2 + y[None, :]**2) <= r0
+    mask.flags.writeable = False
+    indices = np.flatnonzero(mask)
+    indices.flags.writeable = False
+    return Footprint(mask=mask, indices=indices)
 
-    # Calculate radius grid
-    R = np.sqrt(X**2 + Y**2)
-
-    # Create mask
-    mask = R <= r0
+def circularize(I: np.ndarray, rescale: bool = False) -> np.ndarray:
+    """Returns a copy of the image or tomogram with NaN outside its circular footprint (see footprint)."""
+    # Validate input dimensions
+    if I.ndim not in [2, 3]:
+        raise ValueError("Input must be a 2D or 3D array.")
 
     # Apply mask to each layer
-    if I.ndim == 2:
-        J = np.where(mask, I, np.nan + np.nan*1j if np.iscomplexobj(I) else np.nan)
-    else:
-        J = np.empty_like(I, dtype=complex if np.iscomplexobj(I) else float)
-        for i in range(N):
-            J[i ,:, :] = np.where(mask, I[i, :, :], np.nan + np.nan*1j if np.iscomplexobj(I) else np.nan)
+    mask = footprint(tuple(I.shape[-2:])).mask
+    J = np.where(mask, I, np.nan + np.nan*1j if np.iscomplexobj(I) else np.nan)
+    if not np.issubdtype(I.dtype, np.inexact):
+        J = J.astype(float)
 
     # Rescale if requested
     if rescale:
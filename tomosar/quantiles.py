@@ -0,0 +1,184 @@
+# Imports
+from dataclasses import dataclass
+from typing import Callable, Iterator
+import numpy as np
+
+from .config import QUANTILE_METHODS, get_memory_budget, get_quantile_method
+from .chunking import height_chunks, is_out_of_core
+
+# Two-sided 99% normal quantile for the confidence interval of sampled quantiles
+_Z99 = 2.5758293035489004
+
+@dataclass(frozen=True)
+class Quantile:
+    """
+    A quantile estimate with a bound on its error: value is within error of the exact percentile (as np.percentile),
+    always for the exact and histogram methods, and with 99% confidence for the sampled method.
+    """
+    value: float
+    error: float
+    method: str
+
+    def __float__(self) -> float:
+        return float(self.value)
+
+def quantile(array: np.ndarray, q: float, method: str | None = None,
+             transform: Callable[[np.ndarray], np.ndarray] | None = None, bins: int = 2**16,
+             samples: int = 2**20, seed: int = 0, budget: int | None = None) -> Quantile:
+    """
+    Estimates the q:th percentile of transform(array), ignoring NaNs, by method (by default the QUANTILE_METHOD
+    setting). All methods stream over chunks of slices of out-of-core (e.g. memory-mapped) arrays:
+        exact:      np.percentile in memory, or histogram refinement over chunks (see chunked_percentile).
+        histogram:  two passes (extent, then a histogram of bins bins, logarithmic for positive data) and
+                    interpolation within the bin holding the rank; the error is bounded by the bin span.
+        sampled:    the percentile of samples uniformly drawn voxels; the error bound is the 99% confidence
+                    interval of the order statistics around the rank.
+    """
+    method = method or get_quantile_method()
+    if method not in QUANTILE_METHODS:
+        raise ValueError(f"Quantile method must be one of {', '.join(QUANTILE_METHODS)}.")
+    budget = budget or get_memory_budget()
+    if method == 'exact':
+        if is_out_of_core(array, budget=budget):
+            return Quantile(chunked_percentile(array, q, transform=transform, budget=budget), 0.0, method)
+        values = transform(array) if transform is not None else np.asarray(array)
+        return Quantile(float(np.nanpercentile(values, q)), 0.0, method)
+    if method == 'histogram':
+        return _histogram_quantile(array, q, transform=transform, bins=bins, budget=budget)
+    return _sampled_quantile(array, q, transform=transform, samples=samples, seed=seed, budget=budget)
+
+def _chunks(array: np.ndarray, transform: Callable[[np.ndarray], np.ndarray] | None,
+            budget: int) -> Callable[[], Iterator[np.ndarray]]:
+    """Returns an iterator factory over the flattened, NaN-free, transformed chunks of an array."""
+    chunks = list(height_chunks(array.shape, bytes_per_voxel=3 * array.itemsize + 16, budget=budget))
+
+    def values() -> Iterator[np.ndarray]:
+        for chunk in chunks:
+            v = np.asarray(array[chunk])
+            v = transform(v) if transform is not None else v
+            v = v.ravel()
+            yield v[~np.isnan(v)]
+    return values
+
+def _extent(values: Callable[[], Iterator[np.ndarray]]) -> tuple[float, float, int]:
+    lo, hi, n = np.inf, -np.inf, 0
+    for v in values():
+        if v.size:
+            lo, hi, n = min(lo, v.min()), max(hi, v.max()), n + v.size
+    return float(lo), float(hi), n
+
+def _histogram_quantile(array: np.ndarray, q: float, transform: Callable[[np.ndarray], np.ndarray] | None,
+                        bins: int, budget: int) -> Quantile:
+    values = _chunks(array, transform, budget)
+    lo, hi, n = _extent(values)
+    if n == 0:
+        return Quantile(np.nan, np.nan, 'histogram')
+    if lo == hi:
+        return Quantile(lo, 0.0, 'histogram')
+
+    # Logarithmic bins resolve the decades spanned by intensities, linear ones anything else
+    logarithmic = lo > 0
+    scale = np.log if logarithmic else (lambda v: v)
+    start, stop = scale(lo), scale(hi)
+    counts = np.zeros(bins, dtype=np.int64)
+    for v in values():
+        counts += np.bincount(_bin(scale(v.astype(np.float64)), start, (stop - start) / bins, bins), minlength=bins)
+    edges = np.linspace(start, stop, bins + 1)
+    edges = np.exp(edges) if logarithmic else edges
+    edges[0], edges[-1] = lo, hi
+
+    # Bins holding the ranks below and above the percentile position
+    position = (n - 1) * q / 100
+    cumulative = np.cumsum(counts)
+    k = int(np.floor(position))
+    first = int(np.searchsorted(cumulative, k, side='right'))
+    last = int(np.searchsorted(cumulative, min(k + 1, n - 1), side='right'))
+    below = int(cumulative[first - 1]) if first else 0
+    value = edges[first] + (edges[first + 1] - edges[first]) * (position - below + 0.5) / counts[first]
+    value = float(np.clip(value, edges[first], edges[last + 1]))
+    return Quantile(value, float(max(value - edges[first], edges[last + 1] - value)), 'histogram')
+
+def _sampled_quantile(array: np.ndarray, q: float, transform: Callable[[np.ndarray], np.ndarray] | None,
+                      samples: int, seed: int, budget: int) -> Quantile:
+    rng = np.random.default_rng(seed)
+    total = array.size
+    drawn = []
+    for chunk in height_chunks(array.shape, bytes_per_voxel=3 * array.itemsize + 16, budget=budget):
+        block = array[chunk].reshape(-1)
+        if samples >= total:
+            v = np.asarray(block)
+        else:
+            # Voxels drawn with replacement, in proportion to the chunk size (sorted to read memmaps forwards)
+            index = np.sort(rng.integers(0, block.size, size=round(samples * block.size / total)))
+            v = np.asarray(block[index])
+        v = transform(v) if transform is not None else v
+        drawn.append(v[~np.isnan(v)])
+    sample = np.sort(np.concatenate(drawn))
+    m = sample.size
+    if m == 0:
+        return Quantile(np.nan, np.nan, 'sampled')
+    value = float(np.percentile(sample, q))
+    if m == total:
+        return Quantile(value, 0.0, 'sampled')
+
+    # Order statistics bracketing the percentile with 99% confidence
+    p = q / 100
+    half_width = _Z99 * np.sqrt(m * p * (1 - p)) + 1
+    lower = sample[int(np.clip(np.floor(m * p - half_width), 0, m - 1))]
+    upper = sample[int(np.clip(np.ceil(m * p + half_width), 0, m - 1))]
+    return Quantile(value, float(max(value - lower, upper - value)), 'sampled')
+
+def chunked_percentile(array: np.ndarray, q: float, transform: Callable[[np.ndarray], np.ndarray] | None = None,
+                       bins: int = 4096, budget: int | None = None) -> float:
+    """
+    Exact q:th percentile (with linear interpolation, as np.percentile) of transform(array), ignoring NaNs,
+    computed by streaming over chunks of slices. Histogram passes narrow down the bin holding each rank until
+    the values in it fit in memory, and these are then sorted.
+    """
+    budget = budget or get_memory_budget()
+    values = _chunks(array, transform, budget)
+    lo, hi, n = _extent(values)
+    if n == 0:
+        return np.nan
+
+    position = (n - 1) * q / 100
+    k = int(np.floor(position))
+    fraction = position - k
+    low = _select(values, k, lo, hi, bins, limit=budget // 32)
+    if fraction == 0 or k + 1 >= n:
+        return low
+    high = _select(values, k + 1, lo, hi, bins, limit=budget // 32)
+    return low + (high - low) * fraction
+
+def _bin(v: np.ndarray, lo: float, width: float, bins: int) -> np.ndarray:
+    return np.clip((v.astype(np.float64) - lo) / width, 0, bins - 1).astype(np.int64)
+
+def _select(values: Callable[[], Iterator[np.ndarray]], k: int, lo: float, hi: float, bins: int, limit: int) -> float:
+    """Returns the k:th smallest value by histogram refinement (see chunked_percentile)."""
+    constraints = []  # (lo, width, bin) of every refinement; a value is a member if it falls in all of them
+    def members(v):
+        for lo_, width_, bin_ in constraints:
+            v = v[_bin(v, lo_, width_, bins) == bin_]
+        return v
+
+    below = 0
+    while True:
+        width = (hi - lo) / bins or 1.0
+        counts = np.zeros(bins, dtype=np.int64)
+        smallest, largest = np.inf, -np.inf
+        for v in values():
+            m = members(v)
+            if m.size:
+                counts += np.bincount(_bin(m, lo, width, bins), minlength=bins)
+                smallest, largest = min(smallest, m.min()), max(largest, m.max())
+        if smallest == largest:
+            return float(smallest)
+        if counts.sum() <= limit:
+            selected = np.concatenate([members(v) for v in values()])
+            selected.sort()
+            return float(selected[k - below])
+        cumulative = np.cumsum(counts)
+        i = int(np.searchsorted(cumulative, k - below, side='right'))
+        below += int(cumulative[i - 1]) if i else 0
+        constraints.append((lo, width, i))
+        lo, hi = lo + i * width, lo + (i + 1) * width
@@ -0,0 +1,155 @@
+# Imports
+import os
+import re
+import time as Time
+from pathlib import Path
+from datetime import datetime
+from fnmatch import fnmatchcase
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterator
+
+TIMESTAMP_SPIRAL_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2})-(\d{2})")
+TIMESTAMP_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}-\d{2}-\d{2}-\d{2}")
+
+def classify(name: str) -> str | None:
+    """
+    Classifies a file name as 'slice', 'moco_cut' or 'flight_info' (or None if the file is irrelevant).
+    """
+    if fnmatchcase(name, "dbr*C.tif"):
+        return 'slice'
+    if 'spiral.moco_cut' in name:
+        return 'moco_cut'
+    if 'flight_info.json' in name:
+        return 'flight_info'
+    return None
+
+def timestamp(name: str, kind: str) -> tuple[datetime, int | None] | None:
+    """
+    Extracts the flight timestamp (and spiral ID for moco cuts) from a moco_cut or flight_info file name.
+    """
+    try:
+        if kind == 'moco_cut':
+            match = TIMESTAMP_SPIRAL_PATTERN.search(name)
+            if match:
+                return datetime.strptime(match.group(1), "%Y-%m-%d-%H-%M-%S"), int(match.group(2))
+        elif kind == 'flight_info':
+            match = TIMESTAMP_PATTERN.search(name)
+            if match:
+                return datetime.strptime(match.group(0), "%Y-%m-%d-%H-%M-%S"), None
+    except ValueError:
+        pass
+    return None
+
+@dataclass
+class DirectoryListing:
+    path: str
+    parent: str | None = None
+    mtime: int | None = None                                    # None if the directory could not be read
+    subdirs: list[str] = field(default_factory=list)
+    files: dict[str, tuple[str, int, int]] | None = None        # path: (kind, mtime, size), None if unchanged
+
+    @property
+    def unchanged(self) -> bool:
+        return self.mtime is not None and self.files is None
+
+@dataclass
+class ScanStats:
+    directories: int = 0    # Directories visited
+    listed: int = 0         # Directories actually listed
+    files: int = 0          # Directory entries seen
+    matched: int = 0        # Slice, moco_cut and flight_info files found
+    elapsed: float = 0.0
+
+    @property
+    def dirs_per_second(self) -> float:
+        return self.directories / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.directories} directories ({self.listed} listed, {self.dirs_per_second:.0f} dirs/s), "
+                f"{self.files} files ({self.files_per_second:.0f} files/s), {self.matched} matched "
+                f"in {self.elapsed:.2f} s")
+
+def list_directory(path: str, parent: str | None = None, known_mtime: int | None = None,
+                   known_subdirs: list[str] | None = None) -> tuple[DirectoryListing, int]:
+    """
+    Lists a directory in a single os.scandir pass, classifying slice, moco_cut and flight_info files as it goes.
+    If the directory mtime equals known_mtime the listing is skipped and known_subdirs are returned instead.
+    Returns the listing and the number of directory entries seen.
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return DirectoryListing(path=path, parent=parent), 0
+    if known_mtime is not None and mtime == known_mtime:
+        return DirectoryListing(path=path, parent=parent, mtime=mtime, subdirs=list(known_subdirs or [])), 0
+
+    listing = DirectoryListing(path=path, parent=parent, mtime=mtime, files={})
+    count = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                count += 1
+                try:
+                    if entry.is_dir():
+                        listing.subdirs.append(entry.path)
+                    elif entry.is_file():
+                        kind = classify(entry.name)
+                        if kind:
+                            stat = entry.stat()
+                            listing.files[entry.path] = (kind, stat.st_mtime_ns, stat.st_size)
+                except OSError:
+                    continue
+    except OSError:
+        return DirectoryListing(path=path, parent=parent), count
+    return listing, count
+
+class DirectoryScanner:
+    """
+    Parallel single-pass directory scanner.
+
+    Every directory is listed once with os.scandir on a thread pool, so that the per-directory latency
+    of network file systems overlaps across the whole tree. Listings are yielded in the calling thread
+    as they complete. Directories whose mtime matches the optional known mtimes are not listed, and their
+    subdirectories are taken from the known children instead.
+    """
+    def __init__(self, npar: int = os.cpu_count(), mtimes: dict[str, int] | None = None,
+                 children: dict[str, list[str]] | None = None):
+        self.npar = max(int(npar or 1), 1)
+        self.mtimes = mtimes or {}
+        self.children = children or {}
+        self.stats = ScanStats()
+
+    def scan(self, paths: str | Path | list[str | Path], recursive: bool = True) -> Iterator[DirectoryListing]:
+        if isinstance(paths, (str, Path)):
+            paths = [paths]
+        roots = []
+        for path in paths:
+            path = Path(path).resolve()
+            roots.append(str(path.parent if path.is_file() else path))
+
+        self.stats = ScanStats()
+        start = Time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.npar) as executor:
+            def submit(path, parent):
+                return executor.submit(list_directory, path, parent,
+                                       self.mtimes.get(path), self.children.get(path))
+
+            pending = {submit(root, None) for root in dict.fromkeys(roots)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    listing, count = future.result()
+                    self.stats.directories += 1
+                    self.stats.files += count
+                    if listing.files is not None:
+                        self.stats.listed += 1
+                        self.stats.matched += len(listing.files)
+                    if recursive:
+                        pending.update(submit(d, listing.path) for d in listing.subdirs)
+                    yield listing
+        self.stats.elapsed = Time.perf_counter() - start
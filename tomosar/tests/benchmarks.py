@@ -0,0 +1,728 @@
+# Imports
+import os
+import json
+import tempfile
+import tracemalloc
+import time as Time
+import numpy as np
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
+from numpy.lib.stride_tricks import sliding_window_view
+import pandas as pd
+from skimage.measure import shannon_entropy
+import rasterio
+from rasterio.transform import from_origin, Affine
+from rasterio.features import rasterize
+from rasterio.windows import Window
+import geopandas as gpd
+
+from ..core import (ImageInfo, SliceInfo, Mask, Masks, TomoInfo, Tomograms, tomogram_cache, parse_filename, parse_filenames, sliceinfo, rasterize_masks,
+                    save_mask_container, load_mask_container, cache_masks, restore_cache)
+from ..config import TOMOGRAM_COMPRESSIONS, set_precision, set_memory_budget, set_tomogram_cache
+from ..chunking import allocate
+from ..processing import (working_dtypes, intensity, multilook, filter, chunked_multilook, chunked_filter,
+                          FilterPool, _point_target_estimator, _estimate_sigma_range, _filter_slice, circularize)
+from ..quantiles import QUANTILE_METHODS, quantile
+from ..utils import collect_statistics, collect_label_statistics, apply_variable_descriptions
+
+def timed(func, *args, repeat: int = 3, **kwargs) -> tuple[float, object]:
+    """Returns the best wall time of repeat calls and the result of the last call."""
+    best = np.inf
+    result = None
+    for _ in range(repeat):
+        start = Time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, Time.perf_counter() - start)
+    return best, result
+
+def peak_memory(func, *args, **kwargs) -> tuple[int, object]:
+    """Returns the peak traced memory (in bytes) allocated during a call and its result."""
+    tracemalloc.start()
+    try:
+        result = func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, result
+
+def synthetic_filenames(n: int, seed: int = 0) -> list[str]:
+    """Generates n slice filenames following the ImageInfo.generate_filename grammar."""
+    rng = np.random.default_rng(seed)
+    bands = ['phh1', 'phh0', 'lhh', 'lhv', 'lvh', 'lvv', 'cvv1', 'cvv0']
+    names = []
+    for i in range(n):
+        name = (f"dbr_2025-06-{1 + i % 28:02d}-10-{i % 60:02d}-00-{1 + i % 5:02d}_{bands[i % len(bands)]}"
+                f"_50.0m_0.1m_{1700000000 + i}")
+        hoff = float(rng.integers(0, 40)) / 2
+        depth = -float(rng.integers(0, 20)) / 2
+        if hoff:
+            name += f"_ho{hoff}m"
+        name += "_ro5.0m"
+        if depth:
+            name += f"_prof{depth:+05.1f}m"
+        name += f"_LA={64 + rng.random():.16f}_LO={19 + rng.random():.16f}_C.tif"
+        names.append(f"/data/campaign/{name}")
+    return names
+
+def benchmark_parsing(n: int = 100000, repeat: int = 3) -> dict[str, float]:
+    """
+    Micro-benchmark of the batch filename parser against the per-file parser.
+    """
+    paths = synthetic_filenames(n)
+    per_file, infos = timed(lambda: [parse_filename(p) for p in paths], repeat=repeat)
+    batch, table = timed(parse_filenames, paths, repeat=repeat)
+
+    # Validate that the parsers agree
+    for i in np.linspace(0, n - 1, min(n, 100)).astype(int):
+        info = ImageInfo.from_record(table.iloc[i].to_dict())
+        if any(info.get(k) != infos[i].get(k) for k in ImageInfo.METADATA_PARAMETERS):
+            raise RuntimeError(f"Parsers disagree on {paths[i]}")
+
+    return {'files': n, 'parse_filename': per_file, 'parse_filenames': batch, 'speedup': per_file / batch}
+
+def benchmark_grouping(n: int = 50000, repeat: int = 3) -> dict[str, tuple[float, float]]:
+    """
+    Micro-benchmark of the columnar SliceTable against the list-based SliceInfo for grouping,
+    de-duplication, categorization and sorting.
+    """
+    table = parse_filenames(synthetic_filenames(n))
+    columnar = SliceInfo.from_table(table)
+    rows = SliceInfo([ImageInfo.from_record(record) for record in table.to_dict('records')])
+    operations = {
+        'group': lambda s: s.group('band'),
+        'tomograms': lambda s: s.tomograms(),
+        'unique': lambda s: s.unique(),
+        'categorize': lambda s: s.categorize(),
+        'sort': lambda s: s.copy().sort('height'),
+    }
+    result = {}
+    for name, operation in operations.items():
+        list_time, _ = timed(operation, rows, repeat=repeat)
+        table_time, _ = timed(operation, columnar, repeat=repeat)
+        result[name] = (list_time, table_time)
+    return result
+
+def synthetic_slices(folder: str, n: int = 8, size: int = 1024, seed: int = 0) -> list[str]:
+    """Writes n two-band (real, imaginary) float32 slice GeoTIFFs of size x size pixels into folder."""
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(n):
+        path = os.path.join(folder, f"dbr_2025-06-01-10-00-00-01_lhh_{size / 10}m_0.1m_{1700000000 + i}"
+                                    f"_ho{float(i)}m_ro5.0m_LA=64.1_LO=19.1_C.tif")
+        with rasterio.open(path, 'w', driver='GTiff', width=size, height=size, count=2, dtype='float32',
+                           crs='EPSG:3006', transform=from_origin(0, 0, 0.1, 0.1)) as dst:
+            dst.write(rng.standard_normal((2, size, size), dtype=np.float32))
+        paths.append(path)
+    return paths
+
+def benchmark_reading(n: int = 8, size: int = 1024, repeat: int = 3) -> dict[str, tuple[float, int]]:
+    """
+    Benchmark of assembling a tomogram from two-band slices: separate band reads, complex promotion
+    and np.stack against reading straight into the slots of a preallocated complex64 cube.
+    Returns the best time and the peak traced memory of each method.
+    """
+    def separate(paths):
+        images = []
+        for path in paths:
+            with rasterio.open(path) as src:
+                real = src.read(1)
+                imag = src.read(2)
+                images.append((real + 1j * imag) / 10.0)
+        return np.stack(images, axis=0)
+
+    def preallocated(paths):
+        slices = sliceinfo(os.path.dirname(paths[0]))
+        cube = np.empty((len(slices), size, size), dtype=np.complex64)
+        slices.read(db0=10.0 / slices[0].res**2, npar=1, out=cube)
+        return cube
+
+    result = {}
+    with tempfile.TemporaryDirectory() as folder:
+        paths = synthetic_slices(folder, n=n, size=size)
+        reference = separate(paths)
+        for name, method in [('separate', separate), ('preallocated', preallocated)]:
+            best, cube = timed(method, paths, repeat=repeat)
+            if not np.allclose(cube, reference, rtol=1e-6):
+                raise RuntimeError(f"{name} assembly does not match the reference.")
+            del cube
+            peak, _ = peak_memory(method, paths)
+            result[name] = (best, peak)
+    return result
+
+def synthetic_tomogram(n: int = 16, size: int = 512, seed: int = 0) -> np.ndarray:
+    """Generates an (n, size, size) complex128 tomogram of circular Gaussian speckle with a height-varying mean."""
+    rng = np.random.default_rng(seed)
+    amplitude = np.sqrt(np.logspace(-2, 1, n))[:, None, None]
+    speckle = rng.standard_normal((n, size, size)) + 1j * rng.standard_normal((n, size, size))
+    return amplitude * speckle / np.sqrt(2)
+
+def benchmark_precision(n: int = 16, size: int = 512, repeat: int = 3, npar: int = os.cpu_count()) -> dict:
+    """
+    Regression benchmark of the working precisions on a synthetic tomogram: intensity, multilooking,
+    point-target estimation and raw statistics in single and double precision.
+    Returns the best time and peak traced memory per precision, and the maximum absolute deviation
+    of each single precision statistic from double precision.
+    """
+    raw = synthetic_tomogram(n=n, size=size)
+    height = np.arange(n, dtype=float)
+
+    def pipeline(precision):
+        set_precision(precision)
+        volume = raw.astype(working_dtypes()[0])
+        I = intensity(volume)
+        multilook(I, 4, npar=npar)
+        _point_target_estimator(I, percentile=98.0, min_voxels=9, nlooks=1)
+        return collect_statistics(volume, height=height)
+
+    result = {}
+    stats = {}
+    try:
+        for precision in ['double', 'single']:
+            best, stats[precision] = timed(pipeline, precision, repeat=repeat)
+            peak, _ = peak_memory(pipeline, precision)
+            result[precision] = (best, peak)
+    finally:
+        set_precision(None)
+    columns = [c for c in stats['double'].columns if c != 'height']
+    result['deviation'] = {c: float(np.nanmax(np.abs(stats['single'][c] - stats['double'][c]))) for c in columns}
+    return result
+
+def benchmark_out_of_core(n: int = 16, size: int = 512, budget: int = 16, repeat: int = 1,
+                          npar: int = os.cpu_count()) -> dict:
+    """
+    Benchmark of the out-of-core engine: multilooking, filtering and raw statistics of a memory-mapped
+    tomogram processed in tiles within a memory budget (in MiB), against the in-memory processing chain.
+    Returns the best time and peak traced memory of each chain and the maximum relative deviation of the
+    out-of-core products.
+    """
+    raw = synthetic_tomogram(n=n, size=size).astype(working_dtypes()[0])
+    height = np.arange(n, dtype=float)
+
+    def in_memory():
+        I = intensity(raw)
+        return multilook(I, 4, npar=npar), filter(I, npar=npar), collect_statistics(raw, height=height)
+
+    def out_of_core(folder):
+        volume = allocate(raw.shape, raw.dtype, scratch=folder)
+        volume[:] = raw
+        return (chunked_multilook(volume, 4, npar=npar, scratch=folder),
+                chunked_filter(volume, npar=npar, scratch=folder), collect_statistics(volume, height=height))
+
+    result = {}
+    with tempfile.TemporaryDirectory() as folder:
+        best, reference = timed(in_memory, repeat=repeat)
+        result['in-memory'] = (best, peak_memory(in_memory)[0])
+        set_memory_budget(budget)
+        try:
+            best, products = timed(out_of_core, folder, repeat=repeat)
+            result['out-of-core'] = (best, peak_memory(out_of_core, folder)[0])
+        finally:
+            set_memory_budget(None)
+        result['deviation'] = {
+            'multilooked': float(np.max(np.abs(products[0] - reference[0]) / reference[0])),
+            'filtered': float(np.nanmax(np.abs(products[1] - reference[1]) / reference[1])),
+            'statistics': float(np.nanmax(np.abs(products[2].to_numpy() - reference[2].to_numpy()))),
+        }
+        del products
+    return result
+
+def _multilook_per_slice(I: np.ndarray, ds: int, npar: int = os.cpu_count()) -> np.ndarray:
+    """The former multilook: a reshape + mean block average per slice (with separate edges) on a thread pool."""
+    def block_mean(I2d):
+        H, W = I2d.shape
+        h_full, w_full = H // ds, W // ds
+        out = np.empty(((H + ds - 1) // ds, (W + ds - 1) // ds), dtype=I2d.dtype)
+        if h_full > 0 and w_full > 0:
+            out[:h_full, :w_full] = I2d[:h_full*ds, :w_full*ds].reshape(h_full, ds, w_full, ds).mean(axis=(1, 3))
+        if w_full*ds < W:
+            out[:h_full, w_full] = I2d[:h_full*ds, w_full*ds:].reshape(h_full, ds, W - w_full*ds).mean(axis=(1, 2))
+        if h_full*ds < H:
+            out[h_full, :w_full] = I2d[h_full*ds:, :w_full*ds].reshape(H - h_full*ds, w_full, ds).mean(axis=(0, 2))
+        if h_full*ds < H and w_full*ds < W:
+            out[h_full, w_full] = I2d[h_full*ds:, w_full*ds:].mean()
+        return out
+
+    with ThreadPoolExecutor(max_workers=npar) as ex:
+        return np.stack(list(ex.map(block_mean, I)), axis=0)
+
+def benchmark_multilook(n: int = 32, size: int = 1000, factor: int = 5, repeat: int = 3,
+                        npar: int = os.cpu_count()) -> dict:
+    """
+    Benchmark of the vectorized multilook engine against the former per-slice thread pool on a synthetic
+    intensity cube, for square non-overlapping looks (compared for equality), anisotropic looks and sliding
+    looks at half the factor. Returns the best time of each case and the maximum relative deviation.
+    """
+    I = intensity(synthetic_tomogram(n=n, size=size).astype(working_dtypes()[0]))
+    result = {}
+    best, reference = timed(_multilook_per_slice, I, factor, npar=npar, repeat=repeat)
+    result['per-slice'] = best
+    best, looked = timed(multilook, I, factor, npar=npar, repeat=repeat)
+    result['vectorized'] = best
+    result['deviation'] = float(np.max(np.abs(looked - reference) / reference))
+    result['anisotropic'], _ = timed(multilook, I, (factor, 2 * factor), npar=npar, repeat=repeat)
+    result['sliding'], _ = timed(multilook, I, factor, npar=npar, step=max(factor // 2, 1), repeat=repeat)
+    return result
+
+def _filter_pickled_slice(args):
+    image, point_mask, mean_estimate, sigma_range, size, nlooks = args
+    return _filter_slice(image, point_mask, mean_estimate, size=size, sigma_range=sigma_range, nlooks=nlooks)
+
+def _filter_pickled(I: np.ndarray, size: int = 9, npar: int = os.cpu_count()) -> np.ndarray:
+    """The former filter executor: per-slice copies pickled to a new Pool, results stacked in completion order."""
+    sigma_range = _estimate_sigma_range(1, 0.9)
+    point_mask, mean_estimate = _point_target_estimator(I, percentile=98.0, min_voxels=9, nlooks=1)
+    args_list = [(I[z], point_mask[z], mean_estimate[z], sigma_range, size, 1) for z in range(I.shape[0])]
+    with Pool(processes=npar) as pool:
+        return np.stack(list(pool.imap_unordered(_filter_pickled_slice, args_list)), axis=0)
+
+def benchmark_filter_pool(n: int = 16, size: int = 256, bands: int = 3, repeat: int = 1,
+                          npar: int = os.cpu_count()) -> dict:
+    """
+    Benchmark of filtering the intensity cubes of a scene with several bands: a new pickling Pool per band
+    (the former executor) against one memory-mapped FilterPool reused for all bands.
+    Returns the best time of each executor and whether the outputs are in height order.
+    """
+    cubes = [intensity(synthetic_tomogram(n=n, size=size, seed=b).astype(working_dtypes()[0])) for b in range(bands)]
+    reference = [filter(I, npar=1) for I in cubes]
+
+    def pickled():
+        return [_filter_pickled(I, npar=npar) for I in cubes]
+
+    def shared():
+        with FilterPool(npar=npar) as pool:
+            return [filter(I, npar=npar, pool=pool) for I in cubes]
+
+    result = {}
+    for name, method in [('pickled', pickled), ('shared', shared)]:
+        best, filtered = timed(method, repeat=repeat)
+        ordered = all(np.allclose(f, r, equal_nan=True) for f, r in zip(filtered, reference))
+        result[name] = (best, ordered)
+    return result
+
+def _filter_slice_windowed(image, point_mask, mean_estimate, size, sigma_range, nlooks):
+    """The former slice filter: NaN-masked (H, W, size^2) window copies reduced by np.nanmean and np.nanvar."""
+    pad_size = size // 2
+    if size == 2 * pad_size:
+        size += 1
+    height, width = image.shape
+    windows = sliding_window_view(np.pad(image, pad_size, mode='symmetric'), (size, size)).reshape(height, width, -1)
+    mask = (windows > (mean_estimate * sigma_range[0])[..., None]) & (windows < (mean_estimate * sigma_range[1])[..., None])
+    valid_windows = np.where(mask, windows, np.nan)
+    local_mean = np.nanmean(valid_windows, axis=-1)
+    local_var = np.nanvar(valid_windows, axis=-1)
+    noise_var = 1.0 / nlooks
+    b = np.clip((local_var - noise_var * local_mean**2) / ((1 + noise_var) * local_var), 0, 1)
+    output = b * image + (1 - b) * local_mean
+    output[point_mask] = image[point_mask]
+    return output
+
+def benchmark_filter_sizes(size: int = 512, sizes: tuple[int, ...] = (5, 7, 9, 11, 13, 15), repeat: int = 3) -> dict:
+    """
+    Benchmark of the accumulating slice filter against the former sliding-window filter on one synthetic slice,
+    for a range of filter sizes. Returns the best time and peak traced memory of both, and the maximum relative
+    deviation of the output, per filter size.
+    """
+    I = intensity(synthetic_tomogram(n=3, size=size).astype(working_dtypes()[0]))
+    point_mask, mean_estimate = _point_target_estimator(I, percentile=98.0, min_voxels=9, nlooks=1)
+    args = (I[1], point_mask[1], mean_estimate[1])
+    sigma_range = _estimate_sigma_range(1, 0.9)
+
+    result = {}
+    for window in sizes:
+        kwargs = dict(size=window, sigma_range=sigma_range, nlooks=1)
+        windowed_time, reference = timed(_filter_slice_windowed, *args, repeat=repeat, **kwargs)
+        windowed_peak, _ = peak_memory(_filter_slice_windowed, *args, **kwargs)
+        accumulated_time, output = timed(_filter_slice, *args, repeat=repeat, **kwargs)
+        accumulated_peak, _ = peak_memory(_filter_slice, *args, **kwargs)
+        deviation = float(np.nanmax(np.abs(output - reference) / reference))
+        result[window] = {'windowed': (windowed_time, windowed_peak), 'accumulated': (accumulated_time, accumulated_peak),
+                          'deviation': deviation}
+    return result
+
+def benchmark_quantile(n: int = 32, size: int = 512, q: float = 98.0, budget: int = 16, repeat: int = 3) -> dict:
+    """
+    Benchmark of the quantile estimators on the intensity of a synthetic tomogram, in memory and memory-mapped
+    within a memory budget (in MiB). Returns the best time, estimate, reported error bound and actual error
+    (against np.percentile) of each estimator in each setting.
+    """
+    I = intensity(synthetic_tomogram(n=n, size=size).astype(working_dtypes()[0]))
+    exact = float(np.percentile(I, q))
+
+    result = {}
+    with tempfile.TemporaryDirectory() as folder:
+        volume = allocate(I.shape, I.dtype, scratch=folder)
+        volume[:] = I
+        for setting, array in [('in-memory', I), ('out-of-core', volume)]:
+            set_memory_budget(budget if setting == 'out-of-core' else None)
+            try:
+                for method in QUANTILE_METHODS:
+                    best, estimate = timed(quantile, array, q, method=method, repeat=repeat)
+                    result[(setting, method)] = (best, estimate.value, estimate.error, abs(estimate.value - exact))
+            finally:
+                set_memory_budget(None)
+        del volume
+    return result
+
+def _collect_statistics_per_slice(tomogram: np.ndarray, height: np.ndarray, circ: bool = True) -> pd.DataFrame:
+    """The former collect_statistics: separate NaN-aware reductions and shannon_entropy per slice."""
+    clx = np.iscomplexobj(tomogram)
+    block = circularize(tomogram) if circ else tomogram
+    if clx:
+        phase = np.angle(block)
+        block = intensity(block)
+    else:
+        block = 10 ** (np.asarray(block, dtype=working_dtypes()[1]) / 10)
+    columns = {key: [] for key in ["mean_backscatter", "SD", "contrast", "E"]}
+    if clx:
+        columns.update(mean_phase=[], SD_phase=[])
+    for n in range(block.shape[0]):
+        slice_ = block[n]
+        columns["mean_backscatter"].append(10 * np.log10(np.nanmean(slice_)))
+        columns["SD"].append(10 * np.log10(np.nanstd(slice_)))
+        columns["contrast"].append(10 * np.log10(np.nanmax(slice_)) - 10 * np.log10(np.nanmin(slice_)))
+        columns["E"].append(shannon_entropy(slice_.astype(np.float64)) / 8)
+        if clx:
+            columns["mean_phase"].append(np.nanmean(phase[n]))
+            columns["SD_phase"].append(np.nanstd(phase[n]))
+    df = pd.DataFrame({"height": height, **columns})
+    apply_variable_descriptions(df)
+    return df
+
+def benchmark_statistics(n: int = 64, size: int = 512, repeat: int = 3, npar: int = os.cpu_count()) -> dict:
+    """
+    Benchmark of the vectorized per-height statistics against the former per-slice reductions on a synthetic
+    tomogram, and of collecting the raw, multilooked and filtered layers concurrently against one at a time.
+    Returns the best time and peak traced memory of each, and the maximum deviation of the statistics.
+    """
+    raw = synthetic_tomogram(n=n, size=size).astype(working_dtypes()[0])
+    height = np.arange(n, dtype=float)
+    I = intensity(raw)
+    layers = [raw, 10 * np.log10(multilook(I, 1, npar=npar)), 10 * np.log10(I)]
+
+    result = {}
+    best, reference = timed(_collect_statistics_per_slice, raw, height, repeat=repeat)
+    result['per-slice'] = (best, peak_memory(_collect_statistics_per_slice, raw, height)[0])
+    best, statistics = timed(collect_statistics, raw, height, repeat=repeat)
+    result['vectorized'] = (best, peak_memory(collect_statistics, raw, height)[0])
+    result['deviation'] = float(np.nanmax(np.abs(statistics.to_numpy() - reference.to_numpy())))
+
+    def sequential():
+        return [collect_statistics(layer, height) for layer in layers]
+
+    def concurrent():
+        with ThreadPoolExecutor(max_workers=len(layers)) as executor:
+            return list(executor.map(lambda layer: collect_statistics(layer, height), layers))
+
+    result['layers'] = {name: timed(func, repeat=repeat)[0] for name, func in
+                        [('sequential', sequential), ('concurrent', concurrent)]}
+    return result
+
+def synthetic_masks(size: int = 512, n: int = 40, seed: int = 0, radius: int | None = None) -> Masks:
+    """
+    Returns n randomly placed (and partly overlapping) disc masks of (size, size) tomograms, of the given radius
+    or of random radii up to an eighth of the size.
+    """
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[:size, :size]
+    masks = []
+    for i in range(n):
+        cy, cx = rng.integers(0, size, 2)
+        r = radius or rng.integers(size // 50 + 1, size // 8 + 2)
+        disc = (y - cy)**2 + (x - cx)**2 < r**2
+        masks.append(Mask(name=f"stand_{i}", id=i, mask=disc, multilooked=disc))
+    return Masks(masks={'stands': masks})
+
+def benchmark_masked_statistics(n: int = 16, size: int = 512, masks: int = 40, repeat: int = 1) -> dict:
+    """
+    Benchmark of masked statistics from label images of non-overlapping masks (one sweep per label image)
+    against applying every mask to a copy of the tomogram and collecting its statistics. Returns the best time
+    and peak traced memory of each, the number of label images and the maximum deviation of the statistics.
+    """
+    raw = synthetic_tomogram(n=n, size=size).astype(working_dtypes()[0])
+    height = np.arange(n, dtype=float)
+    shapes = synthetic_masks(size=size, n=masks)
+
+    def per_mask():
+        return {mask.name: collect_statistics(mask.apply(raw), height=height, circ=False)
+                for mask in shapes['stands']}
+
+    def labelled():
+        statistics = {}
+        for labels, members in shapes.labels():
+            for label, df in collect_label_statistics(raw, labels, height=height).items():
+                statistics[members[label - 1].name] = df
+        return statistics
+
+    result = {}
+    best, reference = timed(per_mask, repeat=repeat)
+    result['per-mask'] = (best, peak_memory(per_mask)[0])
+    best, statistics = timed(labelled, repeat=repeat)
+    result['labelled'] = (best, peak_memory(labelled)[0])
+    result['label images'] = len(shapes.labels())
+    result['deviation'] = max(float(np.nanmax(np.abs(statistics[name].to_numpy() - df.to_numpy())))
+                              for name, df in reference.items())
+    return result
+
+def benchmark_sparse_statistics(n: int = 4, size: int = 3000, masks: int = 40, radius: int = 20,
+                                repeat: int = 1) -> dict:
+    """
+    Benchmark of masked statistics of small masks on a scene of realistic size, where nearly every pixel of a
+    label image is excluded (counted as NaN): from label images (one sweep each) and from the gathered pixels
+    of every mask, against the statistics of the gathered pixels alone (no excluded pixels), which bound the
+    cost from below. Returns the best time of each and the maximum deviation between the masked statistics.
+    """
+    raw = synthetic_tomogram(n=n, size=size).astype(working_dtypes()[0])
+    height = np.arange(n, dtype=float)
+    shapes = synthetic_masks(size=size, n=masks, radius=radius)
+    pixels = {mask.name: mask.gather(raw) for mask in shapes['stands']}
+
+    def labelled():
+        statistics = {}
+        for labels, members in shapes.labels():
+            for label, df in collect_label_statistics(raw, labels, height=height).items():
+                statistics[members[label - 1].name] = df
+        return statistics
+
+    def gathered(excluded=True):
+        return {name: collect_statistics(p, height=height, excluded=size * size - p.shape[1] if excluded else 0)
+                for name, p in pixels.items()}
+
+    result = {}
+    result['labelled'], statistics = timed(labelled, repeat=repeat)
+    result['gathered'], reference = timed(gathered, repeat=repeat)
+    result['pixels only'] = timed(gathered, False, repeat=repeat)[0]
+    result['deviation'] = max(float(np.nanmax(np.abs(statistics[name].to_numpy() - df.to_numpy())))
+                              for name, df in reference.items())
+    return result
+
+def synthetic_shapefile(folder: str, n: int = 40, size: int = 1024, seed: int = 0) -> tuple[str, dict]:
+    """
+    Writes n randomly placed (and partly overlapping) circular stands to a shapefile in folder, and returns its
+    path and the profile of a (size, size) raster at 0.5 m over them.
+    """
+    rng = np.random.default_rng(seed)
+    transform = from_origin(1000, 2000, 0.5, 0.5)
+    extent = size * 0.5
+    x, y = rng.uniform(0, extent, (2, n))
+    stands = gpd.points_from_xy(1000 + x, 2000 - y).buffer(rng.uniform(2, extent / 8, n))
+    path = os.path.join(folder, "stands.shp")
+    gpd.GeoDataFrame({'id': np.arange(n)}, geometry=stands, crs="EPSG:3006").to_file(path)
+    return path, {'height': size, 'width': size, 'transform': transform, 'crs': "EPSG:3006"}
+
+def _rasterize_per_shape(path: str, raster_profile: dict, multilooked_profile: dict) -> list[tuple[np.ndarray, np.ndarray]]:
+    """The former mask rasterization: two rasterize calls and two full-size boolean arrays per shape."""
+    masks = []
+    for _, row in gpd.read_file(path).iterrows():
+        masks.append(tuple(rasterize([(row.geometry, 1)], out_shape=(profile['height'], profile['width']),
+                                     transform=profile['transform'], fill=0, dtype='uint8').astype(bool)
+                           for profile in [raster_profile, multilooked_profile]))
+    return masks
+
+def benchmark_masks(n: int = 40, size: int = 1024, factor: int = 5, repeat: int = 3) -> dict:
+    """
+    Benchmark of mask generation: rasterizing every shape separately into full-size boolean arrays against
+    batched rasterization into label images (with multilooked masks subsampled for odd factors) stored as
+    bounding-box-cropped bit masks, and against loading them from a mask container. Returns the best time
+    and stored bytes of each.
+    """
+    result = {}
+    with tempfile.TemporaryDirectory() as folder:
+        path, profile = synthetic_shapefile(folder, n=n, size=size)
+        looks = -(-size // factor)
+        multilooked = dict(profile, height=looks, width=looks, transform=profile['transform'] * Affine.scale(factor))
+
+        best, masks = timed(_rasterize_per_shape, path, profile, multilooked, repeat=repeat)
+        result['per-shape'] = (best, sum(mask.nbytes + ml.nbytes for mask, ml in masks))
+        best, masks = timed(rasterize_masks, path, profile, multilooked, repeat=repeat)
+        result['batched'] = (best, sum(mask.mask.nbytes + mask.multilooked.nbytes for mask in masks))
+        container = os.path.join(folder, "masks.npz")
+        save_mask_container(container, masks)
+        best, _ = timed(load_mask_container, container, repeat=repeat)
+        result['cached'] = (best, os.path.getsize(container))
+    return result
+
+def _apply_by_copy(mask: Mask, tomogram: np.ndarray) -> np.ndarray:
+    """The former Mask.apply: a copy of the tomogram with NaN scattered outside the mask."""
+    masked_tomogram = tomogram.copy()
+    masked_tomogram[:, ~np.asarray(mask.mask)] = np.nan + np.nan*1j if np.iscomplexobj(tomogram) else np.nan
+    return masked_tomogram
+
+def benchmark_mask_apply(n: int = 16, size: int = 512, masks: int = 40, repeat: int = 3) -> dict:
+    """
+    Benchmark of the statistics of every mask: from a NaN-filled copy of the tomogram per mask, as formerly by
+    Mask.apply, against Mask.apply scattering the gathered pixels, statistics of the gathered pixels (Mask.gather)
+    and of the pixels cached on Masks. Returns the best time and peak traced memory of each, and the maximum
+    deviation of the statistics.
+    """
+    raw = synthetic_tomogram(n=n, size=size).astype(working_dtypes()[0])
+    height = np.arange(n, dtype=float)
+    shapes = synthetic_masks(size=size, n=masks)
+    shapes.parent = TomoInfo(tomograms=Tomograms(raw=raw, height=height))
+    excluded = {mask.name: size * size - int(np.count_nonzero(np.asarray(mask.mask))) for mask in shapes['stands']}
+
+    def statistics(masking):
+        return lambda: {mask.name: masking(mask) for mask in shapes['stands']}
+
+    methods = {
+        'copy': lambda mask: collect_statistics(_apply_by_copy(mask, raw), height=height, circ=False),
+        'apply': lambda mask: collect_statistics(mask.apply(raw), height=height, circ=False),
+        'gather': lambda mask: collect_statistics(mask.gather(raw), height=height, excluded=excluded[mask.name]),
+        'cached': lambda mask: shapes.statistics(mask, 'raw')
+    }
+    result = {}
+    reference = statistics(methods['copy'])()
+    deviation = 0.0
+    for name, masking in methods.items():
+        best, stats = timed(statistics(masking), repeat=repeat)
+        result[name] = (best, peak_memory(statistics(masking))[0])
+        deviation = max(deviation, *(float(np.nanmax(np.abs(stats[key].to_numpy() - df.to_numpy())))
+                                     for key, df in reference.items()))
+    result['deviation'] = deviation
+    return result
+
+def _cache_per_mask(masks: dict[str, list[Mask]], folder: str) -> None:
+    """The former mask cache: full-size boolean .npy files and a JSON file of metadata per mask."""
+    for shapename, mask_list in masks.items():
+        mask_folder = os.path.join(folder, shapename)
+        os.makedirs(mask_folder, exist_ok=True)
+        for mask in mask_list:
+            np.save(os.path.join(mask_folder, f"shape_id_{mask.id}.npy"), np.asarray(mask.mask))
+            np.save(os.path.join(mask_folder, f"multilooked_id_{mask.id}.npy"), np.asarray(mask.multilooked))
+            with open(os.path.join(mask_folder, f"metadata_id_{mask.id}.json"), 'w') as f:
+                json.dump(mask.metadata, f, indent=4)
+
+def _disk_usage(path: str) -> tuple[int, int]:
+    """Number of files and their total size under a path."""
+    if os.path.isfile(path):
+        return 1, os.path.getsize(path)
+    sizes = [os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names]
+    return len(sizes), sum(sizes)
+
+def benchmark_mask_cache(n: int = 200, size: int = 1024, repeat: int = 3) -> dict:
+    """
+    Benchmark of the mask cache of a band: per-mask .npy and .json files against one memory-mapped mask container.
+    Returns the best save and load times, and the number of files and bytes on disk, of each.
+    """
+    shapes = synthetic_masks(size=size, n=n)
+    result = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for name, save, path in [('per-mask', _cache_per_mask, os.path.join(folder, 'cached_masks')),
+                                 ('container', cache_masks, os.path.join(folder, 'masks.npz'))]:
+            best_save, _ = timed(save, shapes.masks, path, repeat=repeat)
+            best_load, _ = timed(restore_cache, path, repeat=repeat)
+            result[name] = (best_save, best_load, *_disk_usage(path))
+    return result
+
+def benchmark_geotiff(n: int = 16, size: int = 1024, window: int = 256, repeat: int = 3) -> dict:
+    """
+    Benchmark of the GeoTIFF creation options of saved tomograms on a synthetic filtered (intensity) tomogram:
+    the former pixel-interleaved strips of the slice profile against tiled, band-interleaved GeoTIFFs without
+    and with compression, and with overviews. Returns the best write time, the file size, and the best times
+    of reading a (window, window) area of all slices and one full slice, of each.
+    """
+    filtered = (np.abs(synthetic_tomogram(n=n, size=size)) ** 2).astype(np.float32)
+    profile = {'driver': 'GTiff', 'width': size, 'height': size, 'count': 2, 'dtype': 'float32',
+               'crs': 'EPSG:3006', 'transform': from_origin(0, 0, 0.1, 0.1)}
+    tomograms = Tomograms(filtered=filtered, profile=profile)
+    y0 = x0 = (size - window) // 2
+
+    def strips(folder):
+        with rasterio.open(os.path.join(folder, 'filtered_tomogram.tif'), 'w', **dict(profile, count=n)) as dst:
+            dst.write(filtered)
+
+    options = {'strips': strips}
+    for compression in TOMOGRAM_COMPRESSIONS:
+        options['tiled' if compression == 'none' else compression] = partial(tomograms.save, compression=compression,
+                                                                             overviews=False)
+    options['zstd+overviews'] = partial(tomograms.save, compression='zstd', overviews=True)
+
+    def read_area(path):
+        with rasterio.open(path) as src:
+            return src.read(window=Window(x0, y0, window, window))
+
+    def read_slice(path):
+        with rasterio.open(path) as src:
+            return src.read(n // 2 + 1)
+
+    result = {}
+    for name, save in options.items():
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'filtered_tomogram.tif')
+            best, _ = timed(save, folder, repeat=repeat)
+            area, _ = timed(read_area, path, repeat=repeat)
+            full, _ = timed(read_slice, path, repeat=repeat)
+            result[name] = (best, os.path.getsize(path), area, full)
+    return result
+
+def _load_band_by_band(path: str) -> np.ndarray:
+    """The former complex tomogram read: every band separately, stacked, and reassembled as real + 1j * imag."""
+    with rasterio.open(path) as src:
+        half = src.count // 2
+        real = np.stack([src.read(i+1) for i in range(half)])
+        imag = np.stack([src.read(i+1+half) for i in range(half)])
+        return real + 1j * imag
+
+def benchmark_storage(n: int = 16, size: int = 1024, window: int = 256, repeat: int = 3) -> dict:
+    """
+    Benchmark of the storage of a complex raw tomogram: GeoTIFF read band by band as formerly, GeoTIFF read into
+    one complex cube, and a native memory-mapped .npy cube. Returns the best save and load times, the best time
+    of reading a (window, window) area of all slices after loading, and the file size, of each.
+    """
+    raw = synthetic_tomogram(n=n, size=size).astype(np.complex64)
+    profile = {'driver': 'GTiff', 'width': size, 'height': size, 'count': 2, 'dtype': 'float32',
+               'crs': 'EPSG:3006', 'transform': from_origin(0, 0, 0.1, 0.1)}
+    y0 = x0 = (size - window) // 2
+    result = {}
+    with tempfile.TemporaryDirectory() as folder:
+        for name, storage, filename in [('band-by-band', 'geotiff', 'raw_tomogram.tif'),
+                                        ('geotiff', 'geotiff', 'raw_tomogram.tif'),
+                                        ('native', 'native', 'raw_tomogram.npy')]:
+            # Only the raw tomogram is saved and loaded, other layers are empty
+            tomograms = Tomograms(raw=raw, multilooked=raw[:, :1, :1], filtered=raw[:, :1, :1], profile=profile)
+            save, _ = timed(tomograms.save, folder, compression='none', storage=storage, repeat=repeat)
+            path = os.path.join(folder, filename)
+            if name == 'band-by-band':
+                load = lambda: _load_band_by_band(path)
+            else:
+                load = lambda: Tomograms.load(folder, lazy=True).raw
+            best, _ = timed(load, repeat=repeat)
+            area, _ = timed(lambda: np.array(load()[:, y0:y0 + window, x0:x0 + window]), repeat=repeat)
+            result[name] = (save, best, area, os.path.getsize(path))
+    return result
+
+def benchmark_lazy(scenes: int = 8, n: int = 16, size: int = 512, budget: int = 64) -> dict:
+    """
+    Benchmark of loading the tomograms of several scenes eagerly against lazily, and of browsing them (the raw
+    tomogram of one scene after another) lazily without a memory budget and within a budget (in MiB) across
+    scenes. Returns the time and peak traced memory of each.
+    """
+    raw = synthetic_tomogram(n=n, size=size).astype(np.complex64)
+    profile = {'driver': 'GTiff', 'width': size, 'height': size, 'crs': 'EPSG:3006',
+               'transform': from_origin(0, 0, 0.1, 0.1)}
+    layers = Tomograms(raw=raw, multilooked=np.abs(raw[:, ::4, ::4]) ** 2, filtered=np.abs(raw) ** 2, profile=profile)
+    result = {}
+    with tempfile.TemporaryDirectory() as folder:
+        folders = []
+        for i in range(scenes):
+            folders.append(os.path.join(folder, f"scene_{i}"))
+            os.makedirs(folders[-1])
+            layers.save(folders[-1], compression='none', storage='geotiff')
+        del layers
+
+        def load(lazy):
+            return [Tomograms.load(path, lazy=lazy) for path in folders]
+
+        def browse(budget):
+            set_tomogram_cache(budget)
+            try:
+                return [float(np.abs(tomograms.raw[0, 0, 0])) for tomograms in load(lazy=True)]
+            finally:
+                set_tomogram_cache(None)
+                tomogram_cache.clear()
+
+        for name, func in [('eager', lambda: load(lazy=False)), ('lazy', lambda: load(lazy=True)),
+                           ('browse', lambda: browse(0)), ('browse in budget', lambda: browse(budget))]:
+            best, _ = timed(func, repeat=1)
+            result[name] = (best, peak_memory(func)[0])
+    return result
@@ -1,6 +1,11 @@
 import click
 from .. import ubx2rnx, rnx2rtkp
 from ..gnss import fetch_swepos, station_ppp
+from .benchmarks import benchmark_parsing, benchmark_grouping, benchmark_reading, benchmark_precision, \
+    benchmark_out_of_core, benchmark_multilook, benchmark_filter_pool, \
+    benchmark_filter_sizes, benchmark_quantile, benchmark_statistics, benchmark_masked_statistics, \
+    benchmark_sparse_statistics, benchmark_masks, benchmark_mask_apply, benchmark_mask_cache, benchmark_geotiff, \
+    benchmark_storage, benchmark_lazy
 
 @click.group()
 def tomotest() -> None:
@@ -12,6 +17,238 @@ def gnss() -> None:
     """Test GNSS processing capabilities."""
     pass # Placeholder
 
+@tomotest.command()
+@click.option("-n", "--files", type=int, default=100000, help="Number of synthetic slice filenames (default: 100000)")
+@click.option("-r", "--repeat", type=int, default=3, help="Number of repetitions (default: 3)")
+def parse(files: int, repeat: int) -> None:
+    """Benchmark batch filename parsing against per-file parsing."""
+    result = benchmark_parsing(n=files, repeat=repeat)
+    click.echo(f"Parsed {result['files']} filenames:")
+    click.echo(f"\tparse_filename:  {result['parse_filename']:.3f} s")
+    click.echo(f"\tparse_filenames: {result['parse_filenames']:.3f} s ({result['speedup']:.1f}x)")
+
+@tomotest.command()
+@click.option("-n", "--slices", type=int, default=50000, help="Number of synthetic slices (default: 50000)")
+@click.option("-r", "--repeat", type=int, default=3, help="Number of repetitions (default: 3)")
+def group(slices: int, repeat: int) -> None:
+    """Benchmark the columnar SliceTable against the list-based SliceInfo."""
+    result = benchmark_grouping(n=slices, repeat=repeat)
+    click.echo(f"{slices} slices (SliceInfo / SliceTable):")
+    for name, (list_time, table_time) in result.items():
+        click.echo(f"\t{name + ':':<12}{list_time * 1000:8.1f} ms / {table_time * 1000:8.1f} ms")
+
+@tomotest.command()
+@click.option("-n", "--slices", type=int, default=8, help="Number of synthetic slices (default: 8)")
+@click.option("-s", "--size", type=int, default=1024, help="Slice size in pixels (default: 1024)")
+@click.option("-r", "--repeat", type=int, default=3, help="Number of repetitions (default: 3)")
+def read(slices: int, size: int, repeat: int) -> None:
+    """Benchmark tomogram assembly from two-band slice GeoTIFFs."""
+    result = benchmark_reading(n=slices, size=size, repeat=repeat)
+    click.echo(f"{slices} slices of {size}x{size} pixels:")
+    for name, (best, peak) in result.items():
+        click.echo(f"\t{name + ':':<14}{best:.3f} s, peak {peak / 2**20:.1f} MiB")
+
+@tomotest.command()
+@click.option("-n", "--slices", type=int, default=16, help="Number of slices in the synthetic tomogram (default: 16)")
+@click.option("-s", "--size", type=int, default=512, help="Slice size in pixels (default: 512)")
+@click.option("-r", "--repeat", type=int, default=3, help="Number of repetitions (default: 3)")
+def precision(slices: int, size: int, repeat: int) -> None:
+    """Benchmark single against double working precision."""
+    result = benchmark_precision(n=slices, size=size, repeat=repeat)
+    click.echo(f"Tomogram of {slices} slices of {size}x{size} pixels:")
+    for name in ['double', 'single']:
+        best, peak = result[name]
+        click.echo(f"\t{name + ':':<8}{best:.3f} s, peak {peak / 2**20:.1f} MiB")
+    click.echo("Maximum deviation of single precision statistics:")
+    for column, deviation in result['deviation'].items():
+        click.echo(f"\t{column + ':':<18}{deviation:.2e}")
+
+@tomotest.command()
+@click.option("-n", "--slices", type=int, default=16, help="Number of slices in the synthetic tomogram (default: 16)")
+@click.option("-s", "--size", type=int, default=512, help="Slice size in pixels (default: 512)")
+@click.option("-b", "--budget", type=int, default=16, help="Memory budget in MiB of the out-of-core chain (default: 16)")
+@click.option("-r", "--repeat", type=int, default=1, help="Number of repetitions (default: 1)")
+def outofcore(slices: int, size: int, budget: int, repeat: int) -> None:
+    """Benchmark tiled out-of-core processing against in-memory processing."""
+    result = benchmark_out_of_core(n=slices, size=size, budget=budget, repeat=repeat)
+    click.echo(f"Tomogram of {slices} slices of {size}x{size} pixels, budget {budget} MiB:")
+    for name in ['in-memory', 'out-of-core']:
+        best, peak = result[name]
+        click.echo(f"\t{name + ':':<13}{best:.3f} s, peak {peak / 2**20:.1f} MiB")
+    click.echo("Maximum deviation of the out-of-core products:")
+    for product, deviation in result['deviation'].items():
+        click.echo(f"\t{product + ':':<13}{deviation:.2e}")
+
+@tomotest.command("multilook")
+@click.option("-n", "--slices", type=int, default=32, help="Number of slices in the synthetic tomogram (default: 32)")
+@click.option("-s", "--size", type=int, default=1000, help="Slice size in pixels (default: 1000)")
+@click.option("-f", "--factor", type=int, default=5, help="Multilook factor (default: 5)")
+@click.option("-r", "--repeat", type=int, default=3, help="Number of repetitions (default: 3)")
+def multilook_(slices: int, size: int, factor: int, repeat: int) -> None:
+    """Benchmark the vectorized multilook engine against the per-slice thread pool."""
+    result = benchmark_multilook(n=slices, size=size, factor=factor, repeat=repeat)
+    click.echo(f"Tomogram of {slices} slices of {size}x{size} pixels, factor {factor}:")
+    for name in ['per-slice', 'vectorized', 'anisotropic', 'sliding']:
+        click.echo(f"\t{name + ':':<13}{result[name]:.3f} s")
+    click.echo(f"Speedup: {result['per-slice'] / result['vectorized']:.1f}x, "
+               f"maximum relative deviation: {result['deviation']:.2e}")
+
+@tomotest.command("filter")
+@click.option("-n", "--slices", type=int, default=16, help="Number of slices per band (default: 16)")
+@click.option("-s", "--size", type=int, default=256, help="Slice size in pixels (default: 256)")
+@click.option("-b", "--bands", type=int, default=3, help="Number of bands in the scene (default: 3)")
+@click.option("-r", "--repeat", type=int, default=1, help="Number of repetitions (default: 1)")
+def filter_(slices: int, size: int, bands: int, repeat: int) -> None:
+    """Benchmark the shared-memory filter pool against a pickling Pool per band."""
+    result = benchmark_filter_pool(n=slices, size=size, bands=bands, repeat=repeat)
+    click.echo(f"{bands} bands of {slices} slices of {size}x{size} pixels:")
+    for name, (best, ordered) in result.items():
+        click.echo(f"\t{name + ':':<9}{best:.3f} s{'' if ordered else ', slices out of height order'}")
+
+@tomotest.command()
+@click.option("-s", "--size", type=int, default=512, help="Slice size in pixels (default: 512)")
+@click.option("-r", "--repeat", type=int, default=3, help="Number of repetitions (default: 3)")
+def lee(size: int, repeat: int) -> None:
+    """Benchmark the accumulating Lee slice filter against the sliding-window one for filter sizes 5-15."""
+    result = benchmark_filter_sizes(size=size, repeat=repeat)
+    click.echo(f"Slice of {size}x{size} pixels:")
+    for window, row in result.items():
+        cells = [f"{name} {best:.3f} s, peak {peak / 2**20:.1f} MiB" for name, (best, peak)
+                 in [(n, row[n]) for n in ['windowed', 'accumulated']]]
+        click.echo(f"\tsize {window:>2}: {'; '.join(cells)}; deviation {row['deviation']:.1e}")
+
+@tomotest.command()
+@click.option("-n", "--slices", type=int, default=32, help="Number of slices (default: 32)")
+@click.option("-s", "--size", type=int, default=512, help="Slice size in pixels (default: 512)")
+@click.option("-q", "--percentile", type=float, default=98.0, help="Percentile (default: 98)")
+@click.option("--budget", type=int, default=16, help="Memory budget of the out-of-core estimates in MiB (default: 16)")
+@click.option("-r", "--repeat", type=int, default=3, help="Number of repetitions (default: 3)")
+def quantile(slices: int, size: int, percentile: float, budget: int, repeat: int) -> None:
+    """Benchmark the exact, histogram and sampled percentile estimators in memory and out of core."""
+    result = benchmark_quantile(n=slices, size=size, q=percentile, budget=budget, repeat=repeat)
+    click.echo(f"Percentile {percentile:g} of {slices} slices of {size}x{size} pixels:")
+    for (setting, method), (best, value, bound, error) in result.items():
+        click.echo(f"\t{setting + ' ' + method + ':':<22}{best:.3f} s, {value:.6g} "
+                   f"(error {error:.2e}, bound {bound:.2e})")
+
+@tomotest.command()
+@click.option("-n", "--slices", type=int, default=64, help="Number of slices (default: 64)")
+@click.option("-s", "--size", type=int, default=512, help="Slice size in pixels (default: 512)")
+@click.option("-r", "--repeat", type=int, default=3, help="Number of repetitions (default: 3)")
+def statistics(slices: int, size: int, repeat: int) -> None:
+    """Benchmark the vectorized per-height statistics against per-slice reductions, and concurrent layers."""
+    result = benchmark_statistics(n=slices, size=size, repeat=repeat)
+    click.echo(f"{slices} slices of {size}x{size} pixels:")
+    for name in ['per-slice', 'vectorized']:
+        best, peak = result[name]
+        click.echo(f"\t{name + ':':<12}{best:.3f} s, peak {peak / 2**20:.1f} MiB")
+    click.echo(f"\tMaximum deviation of the statistics: {result['deviation']:.1e}")
+    click.echo("\tRaw, multilooked and filtered layers: " +
+               ", ".join(f"{name} {best:.3f} s" for name, best in result['layers'].items()))
+
+@tomotest.command()
+@click.option("-n", "--slices", type=int, default=16, help="Number of slices (default: 16)")
+@click.option("-s", "--size", type=int, default=512, help="Slice size in pixels (default: 512)")
+@click.option("-m", "--masks", type=int, default=40, help="Number of masks (default: 40)")
+@click.option("-r", "--repeat", type=int, default=1, help="Number of repetitions (default: 1)")
+def masked(slices: int, size: int, masks: int, repeat: int) -> None:
+    """Benchmark masked statistics from label images against per-mask copies of the tomogram."""
+    result = benchmark_masked_statistics(n=slices, size=size, masks=masks, repeat=repeat)
+    click.echo(f"{masks} masks on {slices} slices of {size}x{size} pixels ({result['label images']} label images):")
+    for name in ['per-mask', 'labelled']:
+        best, peak = result[name]
+        click.echo(f"\t{name + ':':<10}{best:.3f} s, peak {peak / 2**20:.1f} MiB")
+    click.echo(f"\tMaximum deviation of the statistics: {result['deviation']:.1e}")
+
+@tomotest.command()
+@click.option("-n", "--slices", type=int, default=4, help="Number of slices (default: 4)")
+@click.option("-s", "--size", type=int, default=3000, help="Slice size in pixels (default: 3000)")
+@click.option("-m", "--masks", type=int, default=40, help="Number of masks (default: 40)")
+@click.option("--radius", type=int, default=20, help="Mask radius in pixels (default: 20)")
+@click.option("-r", "--repeat", type=int, default=1, help="Number of repetitions (default: 1)")
+def sparse(slices: int, size: int, masks: int, radius: int, repeat: int) -> None:
+    """Benchmark masked statistics of small masks on a large scene against those of their pixels alone."""
+    result = benchmark_sparse_statistics(n=slices, size=size, masks=masks, radius=radius, repeat=repeat)
+    click.echo(f"{masks} masks of radius {radius} on {slices} slices of {size}x{size} pixels:")
+    for name in ['labelled', 'gathered', 'pixels only']:
+        click.echo(f"\t{name + ':':<13}{result[name]:.3f} s")
+    click.echo(f"\tMaximum deviation of the statistics: {result['deviation']:.1e}")
+
+@tomotest.command()
+@click.option("-m", "--masks", type=int, default=40, help="Number of shapes (default: 40)")
+@click.option("-s", "--size", type=int, default=1024, help="Raster size in pixels (default: 1024)")
+@click.option("-f", "--factor", type=int, default=5, help="Multilook factor (default: 5)")
+@click.option("-r", "--repeat", type=int, default=3, help="Number of repetitions (default: 3)")
+def masks(masks: int, size: int, factor: int, repeat: int) -> None:
+    """Benchmark batched mask rasterization into bit masks against per-shape rasterization, and cached masks."""
+    result = benchmark_masks(n=masks, size=size, factor=factor, repeat=repeat)
+    click.echo(f"{masks} shapes on a {size}x{size} raster (multilook {factor}):")
+    for name, (best, nbytes) in result.items():
+        click.echo(f"\t{name + ':':<11}{best:.3f} s, {nbytes / 2**20:.2f} MiB")
+
+@tomotest.command()
+@click.option("-n", "--slices", type=int, default=16, help="Number of slices (default: 16)")
+@click.option("-s", "--size", type=int, default=512, help="Slice size in pixels (default: 512)")
+@click.option("-m", "--masks", type=int, default=40, help="Number of masks (default: 40)")
+@click.option("-r", "--repeat", type=int, default=3, help="Number of repetitions (default: 3)")
+def apply(slices: int, size: int, masks: int, repeat: int) -> None:
+    """Benchmark per-mask statistics from gathered (and cached) mask pixels against NaN-filled tomogram copies."""
+    result = benchmark_mask_apply(n=slices, size=size, masks=masks, repeat=repeat)
+    click.echo(f"{masks} masks on {slices} slices of {size}x{size} pixels:")
+    for name in ['copy', 'apply', 'gather', 'cached']:
+        best, peak = result[name]
+        click.echo(f"\t{name + ':':<8}{best:.3f} s, peak {peak / 2**20:.1f} MiB")
+    click.echo(f"\tMaximum deviation of the statistics: {result['deviation']:.1e}")
+
+@tomotest.command()
+@click.option("-m", "--masks", type=int, default=200, help="Number of masks (default: 200)")
+@click.option("-s", "--size", type=int, default=1024, help="Raster size in pixels (default: 1024)")
+@click.option("-r", "--repeat", type=int, default=3, help="Number of repetitions (default: 3)")
+def cache(masks: int, size: int, repeat: int) -> None:
+    """Benchmark the memory-mapped mask container against per-mask cache files."""
+    result = benchmark_mask_cache(n=masks, size=size, repeat=repeat)
+    click.echo(f"{masks} masks on a {size}x{size} raster:")
+    for name, (save, load, files, nbytes) in result.items():
+        click.echo(f"\t{name + ':':<11}save {save:.3f} s, load {load:.3f} s, {files} file{'' if files == 1 else 's'}, {nbytes / 2**20:.2f} MiB")
+
+@tomotest.command()
+@click.option("-n", "--slices", type=int, default=16, help="Number of slices (default: 16)")
+@click.option("-s", "--size", type=int, default=1024, help="Slice size in pixels (default: 1024)")
+@click.option("-w", "--window", type=int, default=256, help="Side of the partially read area in pixels (default: 256)")
+@click.option("-r", "--repeat", type=int, default=3, help="Number of repetitions (default: 3)")
+def geotiff(slices: int, size: int, window: int, repeat: int) -> None:
+    """Benchmark write time, size and partial reads of saved tomograms for each GeoTIFF creation option."""
+    result = benchmark_geotiff(n=slices, size=size, window=window, repeat=repeat)
+    click.echo(f"{slices} slices of {size}x{size} pixels ({window}x{window} area reads):")
+    for name, (write, nbytes, area, full) in result.items():
+        click.echo(f"\t{name + ':':<16}write {write:.3f} s, {nbytes / 2**20:.1f} MiB, "
+                   f"area {1000 * area:.1f} ms, slice {1000 * full:.1f} ms")
+
+@tomotest.command()
+@click.option("-n", "--slices", type=int, default=16, help="Number of slices (default: 16)")
+@click.option("-s", "--size", type=int, default=1024, help="Slice size in pixels (default: 1024)")
+@click.option("-w", "--window", type=int, default=256, help="Side of the partially read area in pixels (default: 256)")
+@click.option("-r", "--repeat", type=int, default=3, help="Number of repetitions (default: 3)")
+def storage(slices: int, size: int, window: int, repeat: int) -> None:
+    """Benchmark saving and loading complex tomograms as GeoTIFF against native memory-mapped storage."""
+    result = benchmark_storage(n=slices, size=size, window=window, repeat=repeat)
+    click.echo(f"{slices} complex slices of {size}x{size} pixels ({window}x{window} area reads):")
+    for name, (save, load, area, nbytes) in result.items():
+        click.echo(f"\t{name + ':':<14}save {save:.3f} s, load {1000 * load:.1f} ms, "
+                   f"load and read area {1000 * area:.1f} ms, {nbytes / 2**20:.1f} MiB")
+
+@tomotest.command()
+@click.option("-m", "--scenes", type=int, default=8, help="Number of scenes (default: 8)")
+@click.option("-n", "--slices", type=int, default=16, help="Number of slices (default: 16)")
+@click.option("-s", "--size", type=int, default=512, help="Slice size in pixels (default: 512)")
+@click.option("-b", "--budget", type=int, default=64, help="Tomogram cache budget in MiB (default: 64)")
+def lazy(scenes: int, slices: int, size: int, budget: int) -> None:
+    """Benchmark eager against lazy loading of tomograms, and browsing scenes within a memory budget."""
+    result = benchmark_lazy(scenes=scenes, n=slices, size=size, budget=budget)
+    click.echo(f"{scenes} scenes of {slices} slices of {size}x{size} pixels (budget {budget} MiB):")
+    for name, (best, peak) in result.items():
+        click.echo(f"\t{name + ':':<18}{best:.3f} s, peak {peak / 2**20:.1f} MiB")
+
 # Below are placeholders
 @tomotest.command()
 def data() -> None:
@@ -21,4 +258,4 @@ def data() -> None:
 @tomotest.command()
 def stats() -> None:
     """Compute tomotest statistics."""
-    click.echo("Computing statistics...")
\ No newline at end of file
+    click.echo("Computing statistics...")
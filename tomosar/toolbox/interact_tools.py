@@ -4,25 +4,40 @@ import click
 from pathlib import Path
 
 from .. import tomoload, SliceInfo
+from ..catalog import SliceCatalog
 from ..utils import interactive_console
+from ..config import set_tomogram_cache
 
 @click.command()
 @click.argument("path", required=False, default='.', type=click.Path(exists=True, path_type=Path))
 @click.option("-u", "--update", is_flag=True, help="Update cached masks")
 @click.option("-n", "--npar", type=int, default=os.cpu_count(), help="Number of parallel threads for file reading")
-def load(path: Path, update: bool, npar: int) -> None:
+@click.option("--lazy", is_flag=True, help="Read tomograms on first access instead of when loading")
+@click.option("--cache", type=click.IntRange(min=0), default=None, help="Memory budget in MiB of lazily read tomograms of all scenes, 0 for no limit (default: TOMOGRAM_CACHE setting)")
+def load(path: Path, update: bool, npar: int, lazy: bool, cache: int | None) -> None:
     """Loads a TomoScenes object into a Python terminal"""
     cached = not update
+    set_tomogram_cache(cache)
     # Call sliceinfo
-    tomos = tomoload(path=path, cached=cached, npar=npar)
+    tomos = tomoload(path=path, cached=cached, npar=npar, lazy=lazy)
     interactive_console({"tomos": tomos})
 
 @click.command()
 @click.argument("path", required=False, default='.', type=click.Path(exists=True, path_type=Path))
 @click.option("-r", "--read", is_flag=True, help="Also read image data.")
 @click.option("-n", "--npar", type=int, default=os.cpu_count(), help="Number of parallel threads for file reading.")
-def sliceinfo(path: Path, read: bool, npar: int):
+@click.option("-R", "--recursive", is_flag=True, help="Also include slices in subdirectories.")
+@click.option("--nocatalog", is_flag=True, help="Scan the directory instead of querying the slice catalog.")
+def sliceinfo(path: Path, read: bool, npar: int, recursive: bool, nocatalog: bool):
     """Loads a SliceInfo object into a Python terminal"""
-    # Call sliceinfo
-    slices = SliceInfo.scan(path=path, read=read, npar=npar)
+    if nocatalog:
+        # Call sliceinfo
+        slices = SliceInfo.scan(path=path, read=read, npar=npar)
+    else:
+        # Query the slice catalog
+        with SliceCatalog() as catalog:
+            catalog.refresh(path, recursive=recursive)
+            slices = catalog.query(path, recursive=recursive)
+        if read:
+            slices = slices.read(db0=1, npar=npar)
     interactive_console({"slices": slices})
\ No newline at end of file
@@ -8,6 +8,8 @@ from ..gnss import fetch_swepos, station_ppp
 from ..trackfinding import trackfinder as run_trackfinder
 from .. import ImageInfo, TomoScenes
 from ..utils import interactive_console
+from ..config import (PRECISIONS, TOMOGRAM_COMPRESSIONS, TOMOGRAM_STORAGES, set_precision, set_memory_budget,
+                      set_tomogram_compression, set_tomogram_storage)
 from ..forging import tomoforge
 
 @click.command()
@@ -97,6 +99,15 @@ def trackfinder(path, linear, verbose, dry, simple, dem, npar) -> None:
 @click.option("--load", is_flag=True, help="Load generated tomogram scenes into an interactive Python console")
 @click.option("-m", "--masks", type=str, default="", help="Folder containing shapefile masks (in addition to TOMOMASKS)")
 @click.option("-n", "--npar", type=int, default=os.cpu_count(), help="Number of parallel threads")
+@click.option("--nocatalog", is_flag=True, help="Re-walk the input paths instead of querying the slice catalog")
+@click.option("--window", type=int, nargs=4, default=None, help="Only read the pixel window COL ROW WIDTH HEIGHT of each slice")
+@click.option("--bounds", type=float, nargs=4, default=None, help="Only read the crop LEFT BOTTOM RIGHT TOP (in the slice CRS) of each slice")
+@click.option("--outshape", type=int, nargs=2, default=None, help="Decimated read of each slice (or crop) into HEIGHT WIDTH pixels")
+@click.option("--scratch", type=click.Path(file_okay=False, path_type=Path), default=None, help="Folder for memory-mapped tomograms, processed out-of-core in tiles (default: in memory)")
+@click.option("--precision", type=click.Choice(list(PRECISIONS)), default=None, help="Working precision: single (complex64/float32) or double (complex128/float64) (default: PRECISION setting)")
+@click.option("--budget", type=click.IntRange(min=1), default=None, help="Memory budget in MiB for out-of-core processing (default: MEMORY_BUDGET setting)")
+@click.option("--compression", type=click.Choice(list(TOMOGRAM_COMPRESSIONS)), default=None, help="GeoTIFF compression of the saved tomograms (default: TOMOGRAM_COMPRESSION setting)")
+@click.option("--storage", type=click.Choice(list(TOMOGRAM_STORAGES)), default=None, help="Storage of the saved tomograms: GeoTIFF, native memory-mappable .npy or both (default: TOMOGRAM_STORAGE setting)")
 @click.option("--folder", type=str, default=None, help="Filter all files not in the provided folder")
 @click.option("-d", "--date", type=str, default=None, help="Filter all files where the flight date does not match")
 @click.option("-t", "--time", type=str, default=None, help="Filter all files where the flight time does not match")
@@ -117,7 +128,7 @@ def trackfinder(path, linear, verbose, dry, simple, dem, npar) -> None:
 @click.option("--HV", type=float, default=None, help="Filter all files where the HV parameter does not match")
 def forge(paths, single, nopair, RR, fused, sub, sup, canopy,
          phh, lxx, lhh, lvv, lhv, lvh, cvv, load,
-         out, masks, npar, folder, date, time, spiral, width, res, refr,
+         out, masks, npar, nocatalog, window, bounds, outshape, scratch, precision, budget, compression, storage, folder, date, time, spiral, width, res, refr,
          lat, lon, thresh, smo, ham, squint, text, DC, DL, HC, HV) -> TomoScenes:
 
     time_start = Time.time()
@@ -126,6 +137,10 @@ def forge(paths, single, nopair, RR, fused, sub, sup, canopy,
     print("Output directory:", out)
     print("Mask directory:", masks)
     print("Parallel threads:", npar)
+    set_precision(precision)
+    set_memory_budget(budget)
+    set_tomogram_compression(compression)
+    set_tomogram_storage(storage)
 
     # Construct filter
     folder = os.path.abspath(folder) if folder else None
@@ -154,7 +169,8 @@ def forge(paths, single, nopair, RR, fused, sub, sup, canopy,
     scenes = tomoforge(
         paths=paths, filter=filter, single=single, nopair=nopair, RR=RR,
         fused=fused, sub=sub, sup=sup, canopy=canopy,
-        masks=masks, npar=npar, out=out
+        masks=masks, npar=npar, out=out, catalog=not nocatalog,
+        window=window, bounds=bounds, out_shape=outshape, scratch=scratch
     )
 
     print(f"Processing completed in {Time.time() - time_start:.2f} seconds.")
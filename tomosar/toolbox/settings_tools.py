@@ -4,7 +4,7 @@ import json
 from getpass import getpass
 import re
 
-from ..config import Settings, save_default
+from ..config import Settings, save_default, PRECISIONS, QUANTILE_METHODS, TOMOGRAM_COMPRESSIONS, TOMOGRAM_STORAGES
 from ..utils import warn
 
 def read_three_numbers(prompt) -> list:
@@ -176,6 +176,101 @@ def TOMO_DIRS(value) -> None:
     st.TOMO_DIRS = value
     st.save()
 
+@set.command()
+@click.argument("value", required=False)
+def PRECISION(value) -> None:
+    """Update PRECISION (working precision of the processing chain: single or double)"""
+    st = Settings()
+    print(f"Current value: {st.PRECISION}")
+    if value is None:
+        value = input(f"Enter new value ({'/'.join(PRECISIONS)}): ")
+    if value not in PRECISIONS:
+        print(f"Error: precision must be one of {', '.join(PRECISIONS)}.")
+        return
+    st.PRECISION = value
+    st.save()
+
+@set.command()
+@click.argument("value", required=False, type=int)
+def MEMORY_BUDGET(value) -> None:
+    """Update MEMORY_BUDGET (MiB of RAM available to out-of-core tomogram processing)"""
+    st = Settings()
+    print(f"Current value: {st.MEMORY_BUDGET} MiB")
+    if value is None:
+        value = int(input("Enter new value (MiB): "))
+    if value <= 0:
+        print("Error: memory budget must be a positive number of MiB.")
+        return
+    st.MEMORY_BUDGET = value
+    st.save()
+
+@set.command()
+@click.argument("value", required=False)
+def QUANTILE_METHOD(value) -> None:
+    """Update QUANTILE_METHOD (percentile estimator of the point target threshold: exact, histogram or sampled)"""
+    st = Settings()
+    print(f"Current value: {st.QUANTILE_METHOD}")
+    if value is None:
+        value = input(f"Enter new value ({'/'.join(QUANTILE_METHODS)}): ")
+    if value not in QUANTILE_METHODS:
+        print(f"Error: quantile method must be one of {', '.join(QUANTILE_METHODS)}.")
+        return
+    st.QUANTILE_METHOD = value
+    st.save()
+
+@set.command()
+@click.argument("value", required=False)
+def TOMOGRAM_COMPRESSION(value) -> None:
+    """Update TOMOGRAM_COMPRESSION (GeoTIFF compression of saved tomograms: none, deflate, zstd or lzw)"""
+    st = Settings()
+    print(f"Current value: {st.TOMOGRAM_COMPRESSION}")
+    if value is None:
+        value = input(f"Enter new value ({'/'.join(TOMOGRAM_COMPRESSIONS)}): ")
+    if value not in TOMOGRAM_COMPRESSIONS:
+        print(f"Error: tomogram compression must be one of {', '.join(TOMOGRAM_COMPRESSIONS)}.")
+        return
+    st.TOMOGRAM_COMPRESSION = value
+    st.save()
+
+@set.command()
+@click.argument("value", required=False)
+def TOMOGRAM_STORAGE(value) -> None:
+    """Update TOMOGRAM_STORAGE (storage of saved tomograms: geotiff, native (memory-mapped .npy) or both)"""
+    st = Settings()
+    print(f"Current value: {st.TOMOGRAM_STORAGE}")
+    if value is None:
+        value = input(f"Enter new value ({'/'.join(TOMOGRAM_STORAGES)}): ")
+    if value not in TOMOGRAM_STORAGES:
+        print(f"Error: tomogram storage must be one of {', '.join(TOMOGRAM_STORAGES)}.")
+        return
+    st.TOMOGRAM_STORAGE = value
+    st.save()
+
+@set.command()
+@click.argument("value", required=False, type=int)
+def TOMOGRAM_CACHE(value) -> None:
+    """Update TOMOGRAM_CACHE (MiB of RAM for lazily loaded tomograms of all scenes, 0 for no limit)"""
+    st = Settings()
+    print(f"Current value: {st.TOMOGRAM_CACHE} MiB")
+    if value is None:
+        value = int(input("Enter new value (MiB): "))
+    if value < 0:
+        print("Error: tomogram cache budget must be a non-negative number of MiB.")
+        return
+    st.TOMOGRAM_CACHE = value
+    st.save()
+
+@set.command()
+@click.argument("value", required=False, type=bool)
+def TOMOGRAM_OVERVIEWS(value) -> None:
+    """Update TOMOGRAM_OVERVIEWS (build overviews in saved tomograms: true or false)"""
+    st = Settings()
+    print(f"Current value: {st.TOMOGRAM_OVERVIEWS}")
+    if value is None:
+        value = input("Enter new value (true/false): ").strip().lower() in ("true", "yes", "1")
+    st.TOMOGRAM_OVERVIEWS = value
+    st.save()
+
 @set.command()
 @click.argument("path", required=False)
 def RTKP_CONFIG(path) -> None:
@@ -5,8 +5,7 @@ from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 import numpy as np
 import pandas as pd
-from skimage.measure import shannon_entropy
-from scipy.special import polygamma
+from scipy.special import polygamma, entr
 from scipy.stats import gamma
 from scipy.linalg import svd
 from scipy.optimize import least_squares
@@ -24,7 +23,9 @@ import code
 import sys
 import hashlib
 
-from .processing import circularize
+from .processing import footprint, intensity, working_dtypes
+from .chunking import height_chunks
+from .config import get_memory_budget
 
 # Custom warnings
 import inspect
@@ -172,66 +173,182 @@ def apply_variable_descriptions(df: pd.DataFrame):
         df.attrs.setdefault("VariableUnits", {})["cFactor"] = "n/a"
         df.attrs.setdefault("VariableDescriptions", {})["cFactor"] = "Estimated spatial speckle correlation factor."
 
-def collect_statistics(tomogram: np.ndarray, height: np.ndarray, circ: bool = True) -> pd.DataFrame:
-    # Circularize
-    if circ:
-        tomogram = circularize(tomogram)
+# Largest working set of a chunk of collect_statistics: beyond it the sorts and reductions only lose locality
+STATISTICS_CHUNK = 64 * 2**20
 
-    # Convert to intensity
-    if np.isrealobj(tomogram):
-        clx = False
-        tomogram = 10 ** (tomogram / 10)
-    else:
-        clx = True
-        phase = np.angle(tomogram)
-        tomogram = np.abs(tomogram) ** 2
-
-
-    N = tomogram.shape[0]
-    mean_backscatter = []
-    SD = []
-    contrast = []
-    E = []
-    if clx:
-        mean_phase = []
-        SD_phase = []
-
-    for n in range(N):
-        slice_ = tomogram[n, ...]
-        mean_val = np.nanmean(slice_)
-        std_val = np.nanstd(slice_)
-        max_val = np.nanmax(slice_)
-        min_val = np.nanmin(slice_)
-        entropy_val = shannon_entropy(slice_.astype(np.float64)) / 8
-
-        mean_backscatter.append(10 * np.log10(mean_val))
-        SD.append(10 * np.log10(std_val))
-        contrast.append(10 * np.log10(max_val) - 10 * np.log10(min_val))
-        E.append(entropy_val)
+def collect_statistics(tomogram: np.ndarray, height: np.ndarray, circ: bool = True,
+                       budget: int | None = None, excluded: int = 0) -> pd.DataFrame:
+    """
+    Per-height statistics of a tomogram: mean backscatter, standard deviation, contrast and normalized
+    Shannon entropy of the intensity (and mean and standard deviation of the phase for complex tomograms),
+    ignoring NaNs and, if circ, the pixels outside the circular footprint. All slices of a chunk are reduced
+    at once along (y, x) in the working precision; chunks fit the memory budget (in bytes, by default the
+    MEMORY_BUDGET setting) and at most STATISTICS_CHUNK.
+    The tomogram may also be an (N, n_pixels) gather of pixels (see Mask.gather), which is reduced as is; the
+    statistics are then those of a tomogram that is NaN at the excluded other pixels.
+    """
+    # Complex tomograms are converted to intensity and phase, real ones are in dB
+    clx = np.iscomplexobj(tomogram)
+
+    columns = defaultdict(list)
+
+    # Statistics over the pixels of the circular footprint only
+    circ = circ and tomogram.ndim == 3
+    pixels = footprint(tuple(tomogram.shape[-2:])) if circ else None
+    excluded = pixels.excluded if circ else excluded
+
+    # Stream over chunks of slices
+    budget = min(budget or get_memory_budget(), STATISTICS_CHUNK)
+    for chunk in height_chunks(tomogram.shape, bytes_per_voxel=2 * tomogram.itemsize + 64, budget=budget):
+        block = np.asarray(tomogram[chunk])
+        block = block.reshape(block.shape[0], -1)
+        if circ:
+            block = np.take(block, pixels.indices, axis=1)
+
+        # Convert to intensity (in the working precision)
+        if clx:
+            phase = np.angle(block)
+            block = intensity(block)
+        else:
+            block = 10 ** (np.asarray(block, dtype=working_dtypes()[1]) / 10)
+
+        _append_statistics(columns, *_nan_moments(block), *_nan_extrema_entropy(block, excluded=excluded),
+                           *(_nan_moments(phase) if clx else ()))
+
+    return _statistics_frame(columns, height)
+
+def collect_label_statistics(tomogram: np.ndarray, labels: np.ndarray, height: np.ndarray,
+                             budget: int | None = None) -> dict[int, pd.DataFrame]:
+    """
+    Per-height statistics (as collect_statistics with circ=False) of the pixels of every label of an (H, W)
+    label image, as if the tomogram were NaN outside the label, for all labels in one sweep over the tomogram.
+    Label 0 is background. Pixels are gathered label by label, the moments are grouped reductions over the
+    labels and the extrema and entropy are computed from one sort per label. Returns a DataFrame per label.
+    """
+    clx = np.iscomplexobj(tomogram)
+
+    # Pixel indices ordered by label, and the extent of each label in that order
+    flat = labels.ravel()
+    order = np.argsort(flat, kind='stable')
+    ids, starts, sizes = np.unique(flat[order], return_index=True, return_counts=True)
+    if ids.size and ids[0] == 0:
+        order, ids, starts, sizes = order[sizes[0]:], ids[1:], starts[1:] - sizes[0], sizes[1:]
+    columns = {label: defaultdict(list) for label in ids.tolist()}
+    if not columns:
+        return {}
+
+    # Stream over chunks of slices
+    budget = min(budget or get_memory_budget(), STATISTICS_CHUNK)
+    for chunk in height_chunks(tomogram.shape, bytes_per_voxel=2 * tomogram.itemsize + 64, budget=budget):
+        block = np.asarray(tomogram[chunk])
+        block = np.take(block.reshape(block.shape[0], -1), order, axis=1)
+
+        # Convert to intensity (in the working precision)
+        if clx:
+            phase = np.angle(block)
+            block = intensity(block)
+        else:
+            block = 10 ** (np.asarray(block, dtype=working_dtypes()[1]) / 10)
 
+        mean_val, std_val = _grouped_nan_moments(block, starts, sizes)
         if clx:
-            slice_ = phase[n, :,:]
-            mean_val = np.nanmean(slice_)
-            std_val = np.nanstd(slice_)
-            mean_phase.append(mean_val)
-            SD_phase.append(std_val)
-
-    df = pd.DataFrame({
-        "height": height,
-        "mean_backscatter": mean_backscatter,
-        "SD": SD,
-        "contrast": contrast,
-        "E": E
-    })
-
-    if clx:
-        df["mean_phase"] = mean_phase
-        df["SD_phase"] = SD_phase
+            mean_phase, std_phase = _grouped_nan_moments(phase, starts, sizes)
+        for k, (label, start, size) in enumerate(zip(columns, starts, sizes)):
+            extrema_entropy = _nan_extrema_entropy(block[:, start:start + size], excluded=labels.size - size)
+            _append_statistics(columns[label], mean_val[:, k], std_val[:, k], *extrema_entropy,
+                               *((mean_phase[:, k], std_phase[:, k]) if clx else ()))
+
+    return {label: _statistics_frame(column, height) for label, column in columns.items()}
+
+def _append_statistics(columns: defaultdict[str, list], mean_val: np.ndarray, std_val: np.ndarray,
+                       min_val: np.ndarray, max_val: np.ndarray, entropy_val: np.ndarray,
+                       mean_phase: np.ndarray | None = None, std_phase: np.ndarray | None = None) -> None:
+    columns["mean_backscatter"].append(10 * np.log10(mean_val))
+    columns["SD"].append(10 * np.log10(std_val))
+    columns["contrast"].append(10 * np.log10(max_val) - 10 * np.log10(min_val))
+    columns["E"].append(entropy_val / 8)
+    if mean_phase is not None:
+        columns["mean_phase"].append(mean_phase)
+        columns["SD_phase"].append(std_phase)
+
+def _statistics_frame(columns: defaultdict[str, list], height: np.ndarray) -> pd.DataFrame:
+    df = pd.DataFrame({"height": height, **{key: np.concatenate(value) for key, value in columns.items()}})
 
     apply_variable_descriptions(df)
 
     return df
 
+def _nan_moments(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Mean and standard deviation of each row of a 2D array, ignoring NaNs, with the arithmetic of np.nanmean
+    and np.nanstd (sums in the array dtype, divisions by the count in float64).
+    """
+    nan = np.isnan(values)
+    count = values.shape[1] - np.count_nonzero(nan, axis=1)
+    zeroed = np.where(nan, 0, values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (zeroed.sum(axis=1) / count).astype(values.dtype)
+        np.subtract(zeroed, mean[:, None], out=zeroed)
+        zeroed[nan] = 0
+        np.multiply(zeroed, zeroed, out=zeroed)
+        std = np.sqrt((zeroed.sum(axis=1) / count).astype(values.dtype))
+    return mean, std
+
+def _grouped_nan_moments(values: np.ndarray, starts: np.ndarray, sizes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Mean and standard deviation of the groups of consecutive columns (starting at starts) of each row of a 2D
+    array, ignoring NaNs, as (rows, groups) arrays. Sums are accumulated in float64.
+    """
+    nan = np.isnan(values)
+    count = np.add.reduceat(~nan, starts, axis=1, dtype=np.intp)
+    zeroed = np.where(nan, 0, values)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (np.add.reduceat(zeroed, starts, axis=1, dtype=np.float64) / count).astype(values.dtype)
+        np.subtract(zeroed, np.repeat(mean, sizes, axis=1), out=zeroed)
+        zeroed[nan] = 0
+        np.multiply(zeroed, zeroed, out=zeroed)
+        std = np.sqrt((np.add.reduceat(zeroed, starts, axis=1, dtype=np.float64) / count).astype(values.dtype))
+    return mean, std
+
+def _nan_extrema_entropy(values: np.ndarray, excluded: int = 0) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Minimum and maximum of each row of a 2D array, ignoring NaNs, and the Shannon entropy (in bits) of its
+    distinct values (NaNs counting as one value, as skimage.measure.shannon_entropy), from a single sort.
+    Each row stands for a slice with excluded more pixels (e.g. outside its footprint) counted as NaNs.
+    """
+    n, width = values.shape
+    size = width + excluded
+    if excluded:
+        # A trailing NaN column gives every row a NaN run to which the excluded pixels are added
+        width += 1
+        ordered = np.empty((n, width), dtype=values.dtype)
+        ordered[:, :-1] = values
+        ordered[:, -1] = np.nan
+        ordered.sort(axis=1)
+    else:
+        ordered = np.sort(values, axis=1)  # NaNs last
+    nan = np.isnan(ordered)
+    count = width - np.count_nonzero(nan, axis=1)
+    minimum = ordered[:, 0]
+    maximum = ordered[np.arange(n), np.maximum(count - 1, 0)]
+    maximum = np.where(count > 0, maximum, np.nan).astype(values.dtype)
+
+    # Runs of equal values (and of NaNs) in the sorted rows
+    start = np.ones((n, width), dtype=bool)
+    np.not_equal(ordered[:, 1:], ordered[:, :-1], out=start[:, 1:])
+    start[:, 1:] &= ~nan[:, :-1]
+    starts = np.flatnonzero(start)
+    runs = np.empty_like(starts)
+    np.subtract(starts[1:], starts[:-1], out=runs[:-1])
+    runs[-1] = n * width - starts[-1]
+    rows = np.searchsorted(starts, np.arange(1, n) * width)
+    if excluded:
+        runs[np.append(rows, runs.size) - 1] += excluded - 1
+    entropy = entr(runs / size)
+
+    # Sum per row (as np.sum over each row's runs)
+    return minimum, maximum, np.array([np.sum(e) for e in np.split(entropy, rows)]) / math.log(2)
+
 # RR estimation
 def estimaterr(tomogram, NNL=1, ds=1, tolerance=1E-2, npar=os.cpu_count()):
     if isinstance(ds, (list, tuple, np.ndarray)) and any(np.array(ds) > 1):